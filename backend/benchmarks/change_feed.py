@@ -0,0 +1,107 @@
+"""Benchmark the change feed against polling the list routes.
+
+Run with ``python -m backend.benchmarks.change_feed [subscribers]`` (default
+100). Loads 500 tasks, then:
+
+* times 10k ``create_task`` calls on the event loop with no subscribers and
+  with ``subscribers`` of them draining their queues, to show what the feed
+  costs writers;
+* compares the bytes a minute of traffic costs when every subscriber polls
+  ``GET /tasks/`` every 5 seconds with what the same clients receive as
+  Server-Sent Events frames when one task changes per second.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+from backend.models.data_models import TaskCreate, TaskRead, TaskUpdate
+from backend.routers.changes import _frame
+from backend.store.changes import Subscription
+from backend.store.memory_store import InMemoryStore
+
+BASE = datetime(2025, 1, 1)
+TASKS = 500
+WRITES = 10_000
+CHUNK = 100
+POLL_SECONDS = 5
+MINUTE = 60
+
+_TASK_LIST = TypeAdapter(List[TaskRead])
+
+
+def _store() -> InMemoryStore:
+    store = InMemoryStore()
+    store.create_many(
+        "tasks",
+        [TaskCreate(title=f"Task {i}", due_date=BASE + timedelta(hours=i)) for i in range(TASKS)],
+    )
+    return store
+
+
+async def _drain(subscription: Subscription, received: List[int]) -> None:
+    while not subscription.shed:
+        batch = await subscription.next_batch(timeout=1)
+        received[0] += len(batch)
+
+
+async def _write_seconds(subscribers: int) -> float:
+    store = _store()
+    feed = store.change_feed()
+    received = [0]
+    drains = [
+        asyncio.create_task(_drain(feed.subscribe()[0], received)) for _ in range(subscribers)
+    ]
+    payload = TaskCreate(title="New", due_date=BASE)
+    started = time.perf_counter()
+    for _ in range(WRITES // CHUNK):
+        for _ in range(CHUNK):
+            store.create_task(payload)
+        # Let the subscribers take their share of the loop, as requests would.
+        await asyncio.sleep(0)
+    while received[0] < WRITES * subscribers:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    for drain in drains:
+        drain.cancel()
+    return elapsed
+
+
+async def _pushed_bytes(store: InMemoryStore) -> int:
+    feed = store.change_feed()
+    subscription, _ = feed.subscribe()
+    for i in range(MINUTE):
+        store.update_task(i + 1, TaskUpdate(title=f"Changed {i}"))
+    changes = await subscription.next_batch()
+    return sum(len(_frame(feed, change)) for change in changes)
+
+
+def main(subscribers: int = 100) -> None:
+    """Print write cost with and without subscribers, and traffic per minute."""
+
+    alone = asyncio.run(_write_seconds(0))
+    watched = asyncio.run(_write_seconds(subscribers))
+    print(f"{WRITES} creates on the event loop")
+    print(f"  no subscribers     {alone / WRITES * 1e6:7.2f} us per write")
+    print(
+        f"  {subscribers:4d} subscribers   {watched / WRITES * 1e6:7.2f} us per write"
+        " (including delivery)"
+    )
+
+    store = _store()
+    page = len(_TASK_LIST.dump_json(store.list_tasks(limit=TASKS)))
+    polled = subscribers * (MINUTE // POLL_SECONDS) * page
+    pushed = subscribers * asyncio.run(_pushed_bytes(store))
+    print(f"{subscribers} clients, {MINUTE} changes in a minute")
+    print(f"  polling every {POLL_SECONDS}s   {polled / 1e6:8.2f} MB")
+    print(f"  change stream      {pushed / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
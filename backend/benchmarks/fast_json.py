@@ -0,0 +1,106 @@
+"""Benchmark GET /events/?limit=1000 with and without the fast JSON path.
+
+Run with ``python -m backend.benchmarks.fast_json [seconds]`` (default 3 per
+run). Loads 10k events into each store, then issues the same full-page
+request back to back through the ASGI test client, first on the regular
+validated path and then with ``use_fast_json`` overridden to ``True``, and
+prints requests per second for each. For the in-memory store it also times
+building that page's body without HTTP: serializing field dicts against
+joining the fragments of its per-record JSON cache.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from backend.dependencies import get_store, use_fast_json
+from backend.main import app
+from backend.models.data_models import EventCreate
+from backend.store.memory_store import InMemoryStore
+from backend.store.sqlite_store import SqliteStore
+
+BASE = datetime(2025, 1, 1)
+EVENTS = 10_000
+PATH = "/events/?limit=1000"
+ROWS = TypeAdapter(List[Dict[str, Any]])
+
+
+def _rate(client: TestClient, seconds: float) -> float:
+    client.get(PATH)
+    requests = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        assert len(client.get(PATH).content) > 1000
+        requests += 1
+    return requests / (time.perf_counter() - started)
+
+
+def _per_page(build: Any, seconds: float) -> float:
+    build()
+    pages = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        build()
+        pages += 1
+    return (time.perf_counter() - started) / pages
+
+
+def _bodies(store: InMemoryStore, seconds: float) -> None:
+    snapshot = store.snapshot()
+    dicts = _per_page(
+        lambda: ROWS.dump_json(snapshot.list_events(limit=1000, raw=True)), seconds
+    )
+    cached = _per_page(lambda: store.list_events(limit=1000, raw=True).json(), seconds)
+    print(
+        f"  {'body':8} {dicts * 1e3:8.2f} ms dicts     {cached * 1e3:8.2f} ms cached"
+        f" ({dicts / cached:.1f}x), hit rate {store.json_cache_stats()['hit_rate']:.2f}"
+    )
+
+
+def _compare(label: str, store: Any, seconds: float) -> None:
+    store.create_many(
+        "events",
+        [
+            EventCreate(
+                name=f"Event {i}",
+                type="Work",
+                start_time=BASE + timedelta(minutes=i),
+                end_time=BASE + timedelta(minutes=i + 30),
+            )
+            for i in range(EVENTS)
+        ],
+    )
+    app.dependency_overrides[get_store] = lambda: store
+    client = TestClient(app)
+    validated = _rate(client, seconds)
+    app.dependency_overrides[use_fast_json] = lambda: True
+    fast = _rate(client, seconds)
+    app.dependency_overrides.clear()
+    print(
+        f"  {label:8} {validated:8.0f} req/s validated"
+        f" {fast:8.0f} req/s fast ({fast / validated:.1f}x)"
+    )
+
+
+def main(seconds: float = 3.0) -> None:
+    """Print requests per second for both paths on both stores."""
+
+    print(f"GET {PATH} over {EVENTS} events")
+    store = InMemoryStore()
+    _compare("memory", store, seconds)
+    _bodies(store, seconds)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteStore(f"{tmp}/bench.db")
+        _compare("sqlite", store, seconds)
+        store.close()
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
@@ -0,0 +1,84 @@
+"""Benchmark GET /homepage with and without its response cache.
+
+Run with ``python -m backend.benchmarks.homepage_cache [rows]`` (default 10k
+tasks and 10k events due over the coming year). Times a render (what every
+load cost before the cache), a cache hit, and a whole cached request through
+the ASGI test client.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=protected-access
+
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, List
+
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_store
+from backend.main import app
+from backend.models.data_models import EventCreate, TaskCreate
+from backend.routers import homepage
+from backend.store.memory_store import InMemoryStore
+
+REPEATS = 200
+
+
+def _time_ms(func: Callable[[], object], repeats: int = REPEATS) -> float:
+    samples: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return median(samples)
+
+
+def main(rows: int = 10_000) -> None:
+    """Print median dashboard latencies."""
+
+    store = InMemoryStore()
+    now = datetime.now()
+    for i in range(rows):
+        when = now + timedelta(minutes=(i * 7919) % 525_600)
+        store.create_task(TaskCreate(title=f"Task {i}", due_date=when))
+        store.create_event(
+            EventCreate(
+                name=f"Event {i}",
+                type="Work",
+                start_time=when,
+                end_time=when + timedelta(hours=1),
+            )
+        )
+    app.dependency_overrides[get_store] = lambda: store
+    client = TestClient(app)
+    snapshot = store.snapshot()
+    cache = homepage._caches.for_store(store)
+    key = ("benchmark", snapshot.write_version("tasks"), snapshot.write_version("events"))
+
+    bucket = homepage._time_bucket(now)
+
+    def _build() -> homepage._Page:
+        return homepage._build_page(snapshot, bucket, 7, 10, 10)
+
+    def _render() -> bytes:
+        page = _build()
+        return page.render(page.window(now, 7, 10))
+
+    def _hit() -> bytes:
+        page = cache.get_or_build(key, _build)
+        return page.render(page.window(now, 7, 10))
+
+    print(f"{rows} tasks and {rows} events")
+    print(f"  render (every load before)  {_time_ms(_render):8.3f} ms")
+    hit = _time_ms(_hit)
+    print(f"  cache hit                   {hit:8.4f} ms")
+    print(f"  full request, cached        {_time_ms(lambda: client.get('/homepage')):8.3f} ms")
+    print(f"  cache stats                 {client.get('/homepage/cache-stats').json()}")
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
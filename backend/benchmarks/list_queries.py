@@ -0,0 +1,79 @@
+"""Benchmark list-query latency as the event collection grows.
+
+Run with ``python -m backend.benchmarks.list_queries [max_rows]``. The store is
+grown in steps (1k, 10k, ... up to ``max_rows``, default 1M) and at each step a
+one-day ``start_after``/``start_before`` window and a filtered first page are
+timed, along with the next 100 rows after a fixed date. With the sorted time
+index every column stays flat regardless of size.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, List
+
+from backend.models.data_models import EventCreate
+from backend.store.memory_store import InMemoryStore
+
+BASE = datetime(2020, 1, 1)
+TYPES = ("Work", "School", "Self Care", "Other")
+REPEATS = 50
+
+
+def _fill(store: InMemoryStore, start: int, stop: int) -> None:
+    for i in range(start, stop):
+        # Spread events ~15 minutes apart in a scrambled order so inserts land
+        # throughout the index, not only at its tail.
+        slot = (i * 7919) % 10_000_019
+        begin = BASE + timedelta(minutes=15 * slot)
+        store.create_event(
+            EventCreate(
+                name=f"Event {i}",
+                type=TYPES[i % len(TYPES)],
+                start_time=begin,
+                end_time=begin + timedelta(minutes=30),
+            )
+        )
+
+
+def _time_ms(func: Callable[[], object]) -> float:
+    samples: List[float] = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return median(samples)
+
+
+def main(max_rows: int = 1_000_000) -> None:
+    """Print median list latencies for each collection size."""
+
+    store = InMemoryStore()
+    day_start = BASE + timedelta(days=30)
+    day_end = day_start + timedelta(days=1)
+
+    print(
+        f"{'rows':>10}  {'one-day window':>15}  {'next 100 rows':>14}"
+        f"  {'type filter page':>17}"
+    )
+    size = 0
+    target = 1_000
+    while target <= max_rows:
+        _fill(store, size, target)
+        size = target
+        window = _time_ms(
+            lambda: store.list_events(start_after=day_start, start_before=day_end)
+        )
+        page = _time_ms(lambda: store.list_events(start_after=day_start, limit=100))
+        filtered = _time_ms(lambda: store.list_events(type_="School", limit=100))
+        print(
+            f"{size:>10}  {window:>12.3f} ms  {page:>11.3f} ms  {filtered:>14.3f} ms"
+        )
+        target *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,130 @@
+"""Benchmark write throughput with per-collection vs a single shared lock.
+
+Run with ``python -m backend.benchmarks.lock_contention [ops_per_thread]``.
+For 1, 2, 4 and 8 writer threads, each thread creates and then updates records
+in its own collection (threads are spread round-robin across tasks, events,
+homework and time entries). The same workload runs against the store as
+shipped and against a variant where every collection shares one lock, which is
+how the store behaved before per-collection locking.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from statistics import quantiles
+from threading import Lock
+from typing import Callable, List, Type
+
+from backend.models.data_models import (
+    EventCreate,
+    EventUpdate,
+    HomeworkCreate,
+    HomeworkUpdate,
+    TaskCreate,
+    TaskUpdate,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from backend.store.memory_store import InMemoryStore
+
+BASE = datetime(2025, 1, 1)
+
+
+class GlobalLockStore(InMemoryStore):
+    """Baseline store whose collections all share a single write lock."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        shared = Lock()
+        # reset() would deadlock on the shared lock; the benchmark never calls it.
+        self._locks = dict.fromkeys(self.COLLECTIONS, shared)
+
+
+def _workload(store: InMemoryStore, collection: int, ops: int) -> Callable[[], None]:
+    start = BASE + timedelta(hours=collection)
+    end = start + timedelta(hours=1)
+
+    def _run() -> None:
+        for i in range(ops):
+            if collection == 0:
+                task = store.create_task(TaskCreate(title=f"Task {i}", due_date=start))
+                store.update_task(task.id, TaskUpdate(completed=True))
+            elif collection == 1:
+                event = store.create_event(
+                    EventCreate(name=f"Event {i}", type="Work", start_time=start, end_time=end)
+                )
+                store.update_event(event.id, EventUpdate(completed=True))
+            elif collection == 2:
+                hw = store.create_homework(
+                    HomeworkCreate(course="Math", due_date=start.date(), description=f"HW {i}")
+                )
+                store.update_homework(hw.id, HomeworkUpdate(completed=True))
+            else:
+                entry = store.create_time_entry(
+                    TimeEntryCreate(type="Work", start_time=start, end_time=end)
+                )
+                store.update_time_entry(entry.id, TimeEntryUpdate(note="done"))
+
+    return _run
+
+
+def _throughput(store_cls: Type[InMemoryStore], threads: int, ops: int) -> float:
+    store = store_cls()
+    workers = [
+        threading.Thread(target=_workload(store, i % 4, ops)) for i in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * ops * 2 / (time.perf_counter() - started)
+
+
+def _task_latency_p99(store_cls: Type[InMemoryStore], ops: int) -> float:
+    """p99 latency (ms) of task completions during a time-entry insert burst."""
+
+    store = store_cls()
+    stop = threading.Event()
+    start = BASE
+    end = BASE + timedelta(hours=1)
+
+    def _burst() -> None:
+        while not stop.is_set():
+            store.create_time_entry(TimeEntryCreate(type="Work", start_time=start, end_time=end))
+
+    bursts = [threading.Thread(target=_burst) for _ in range(4)]
+    for burst in bursts:
+        burst.start()
+    samples: List[float] = []
+    for i in range(ops):
+        task = store.create_task(TaskCreate(title=f"Task {i}", due_date=start))
+        began = time.perf_counter()
+        store.update_task(task.id, TaskUpdate(completed=True))
+        samples.append((time.perf_counter() - began) * 1000)
+    stop.set()
+    for burst in bursts:
+        burst.join()
+    return quantiles(samples, n=100)[98]
+
+
+def main(ops: int = 5_000) -> None:
+    """Print write throughput for both locking schemes."""
+
+    print(f"{'threads':>7}  {'global lock':>14}  {'per-collection':>14}")
+    for threads in (1, 2, 4, 8):
+        baseline = _throughput(GlobalLockStore, threads, ops)
+        striped = _throughput(InMemoryStore, threads, ops)
+        print(f"{threads:>7}  {baseline:>10.0f} op/s  {striped:>10.0f} op/s")
+
+    print()
+    print("task completion p99 during a 4-thread time-entry burst:")
+    print(f"  global lock:    {_task_latency_p99(GlobalLockStore, ops // 5):.3f} ms")
+    print(f"  per-collection: {_task_latency_p99(InMemoryStore, ops // 5):.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
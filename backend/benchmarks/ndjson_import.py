@@ -0,0 +1,105 @@
+"""Benchmark streaming NDJSON imports through POST /import.
+
+Run with ``python -m backend.benchmarks.ndjson_import [lines]`` (default
+200k). Streams a generated body of mixed events and time entries to the ASGI
+app in 64 KiB pieces (the test client would buffer the whole body first), so
+the body never exists in full on either side, and reports the
+throughput and the import's transient memory: the traced peak minus what is
+still allocated afterwards (mostly the imported records). The transient part
+should stay at a few chunks' worth however many lines are sent.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from backend.dependencies import get_store
+from backend.main import app
+from backend.store.memory_store import InMemoryStore
+
+BASE = datetime(2024, 1, 1)
+PIECE_BYTES = 64 * 1024
+
+
+def _body(lines: int) -> Iterator[bytes]:
+    pending = bytearray()
+    for i in range(lines):
+        start = BASE + timedelta(minutes=i * 37 % 525_600)
+        end = (start + timedelta(minutes=45)).isoformat()
+        if i % 2:
+            record = {"type": "Work", "start_time": start.isoformat(), "end_time": end}
+            line = {"kind": "time_entry", "record": record}
+        else:
+            line = {
+                "kind": "event",
+                "record": {
+                    "name": f"Event {i}",
+                    "type": "Work",
+                    "start_time": start.isoformat(),
+                    "end_time": end,
+                },
+            }
+        pending += json.dumps(line).encode() + b"\n"
+        if len(pending) >= PIECE_BYTES:
+            yield bytes(pending)
+            pending.clear()
+    yield bytes(pending)
+
+
+async def _post_stream(path: str, pieces: Iterator[bytes]) -> Dict[str, Any]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 80),
+    }
+    body: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        piece = next(pieces, None)
+        return {"type": "http.request", "body": piece or b"", "more_body": piece is not None}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return json.loads(b"".join(body))
+
+
+def main(lines: int = 200_000) -> None:
+    """Print import throughput and transient memory."""
+
+    store = InMemoryStore()
+    app.dependency_overrides[get_store] = lambda: store
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = asyncio.run(_post_stream("/import", _body(lines)))
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    app.dependency_overrides.clear()
+
+    print(f"{lines} lines in {elapsed:.2f} s ({lines / elapsed:,.0f} lines/s, traced)")
+    print(f"  created           {result['created']}")
+    print(f"  retained          {current / 1e6:8.1f} MB")
+    print(f"  transient peak    {(peak - current) / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,133 @@
+"""Benchmark overlap queries on the time entry interval index.
+
+Run with ``python -m backend.benchmarks.overlap_queries [entries]`` (default 1M).
+Loads ``entries`` time entries (mostly short, with a tail of multi-day ones)
+into a time entry collection and answers windows of growing width with the
+interval index, checking every answer against a brute-force scan of all
+entries. Query time should track the number of matches ``k``, not ``entries``.
+
+The same windows are then run against a ``SqliteStore`` holding the same
+entries, next to the plain ``sort_key < ? AND end_key > ?`` query the store
+used before it bounded the scan by the longest stored span. SQLite's time
+tracks the rows starting within one longest span (here a week) of the
+window, so it stays well above the interval index but no longer grows with
+how far into the table the window sits.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from backend.models.data_models import TimeEntryCreate
+from backend.store.indexes import sort_key
+from backend.store.memory_store import _empty_snapshot
+from backend.store.records import TimeEntryRecord
+from backend.store.sqlite_store import SqliteStore
+
+BASE = datetime(2024, 1, 1)
+YEAR_MINUTES = 525_600
+WINDOWS = (1, 15, 60, 24 * 60, 7 * 24 * 60)
+
+
+def _entries(count: int) -> List[TimeEntryRecord]:
+    rng = random.Random(1)
+    records = []
+    for i in range(1, count + 1):
+        start = BASE + timedelta(minutes=rng.randrange(0, YEAR_MINUTES))
+        minutes = rng.randint(5, 240) if rng.random() < 0.99 else rng.randint(1440, 10_080)
+        records.append(
+            TimeEntryRecord(i, "Work", start, start + timedelta(minutes=minutes), None)
+        )
+    return records
+
+
+def main(count: int = 1_000_000, queries: int = 20) -> None:
+    """Print per-query timings for each window width."""
+
+    records = _entries(count)
+    started = time.perf_counter()
+    collection = _empty_snapshot(0).time_entries.rebuilt({r.id: r for r in records})
+    print(f"{count} time entries, index built in {time.perf_counter() - started:.1f} s")
+    print(f"  {'window':>10} {'avg k':>9} {'index':>10} {'brute force':>12}")
+
+    rng = random.Random(2)
+    for minutes in WINDOWS:
+        indexed = brute = 0.0
+        matches = 0
+        for _ in range(queries):
+            low = BASE + timedelta(minutes=rng.randrange(0, YEAR_MINUTES))
+            high = low + timedelta(minutes=minutes)
+
+            started = time.perf_counter()
+            window = collection.by_time.overlapping(sort_key(low), sort_key(high))
+            found = [entry[1] for entry in window]
+            indexed += time.perf_counter() - started
+
+            started = time.perf_counter()
+            expected = [r.id for r in records if r.start_time < high and r.end_time > low]
+            brute += time.perf_counter() - started
+
+            assert sorted(found) == sorted(expected)
+            matches += len(found)
+        print(
+            f"  {minutes:>7} min {matches / queries:>9.0f}"
+            f" {indexed / queries * 1000:>7.2f} ms {brute / queries * 1000:>9.1f} ms"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _sqlite(SqliteStore(f"{tmp}/bench.db"), records, queries)
+
+
+def _sqlite(store: SqliteStore, records: List[TimeEntryRecord], queries: int) -> None:
+    """Time the same windows as overlap listings on a ``SqliteStore``."""
+
+    started = time.perf_counter()
+    store.create_many(
+        "time_entries",
+        [
+            TimeEntryCreate(type=r.type, start_time=r.start_time, end_time=r.end_time)
+            for r in records
+        ],
+    )
+    print(f"sqlite: loaded in {time.perf_counter() - started:.1f} s")
+    print(f"  {'window':>10} {'avg k':>9} {'bounded':>10} {'unbounded':>12}")
+
+    conn = store._conn()  # pylint: disable=protected-access
+    rng = random.Random(2)
+    for minutes in WINDOWS:
+        bounded = unbounded = 0.0
+        matches = 0
+        for _ in range(queries):
+            low = BASE + timedelta(minutes=rng.randrange(0, YEAR_MINUTES))
+            high = low + timedelta(minutes=minutes)
+
+            started = time.perf_counter()
+            found = store.list_time_entries(
+                overlaps_start=low, overlaps_end=high, limit=len(records), raw=True
+            )
+            bounded += time.perf_counter() - started
+
+            started = time.perf_counter()
+            expected = conn.execute(
+                "SELECT id FROM time_entries WHERE sort_key < ? AND end_key > ?"
+                " ORDER BY sort_key, id",
+                (sort_key(high), sort_key(low)),
+            ).fetchall()
+            unbounded += time.perf_counter() - started
+
+            assert [row["id"] for row in found] == [row[0] for row in expected]
+            matches += len(found)
+        print(
+            f"  {minutes:>7} min {matches / queries:>9.0f}"
+            f" {bounded / queries * 1000:>7.2f} ms {unbounded / queries * 1000:>9.1f} ms"
+        )
+    store.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
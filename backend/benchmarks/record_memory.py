@@ -0,0 +1,62 @@
+"""Report heap bytes per stored event: Pydantic models vs compact records.
+
+Run with ``python -m backend.benchmarks.record_memory [records]`` (default 1M).
+Events are parsed from JSON the way the API and the write-ahead log receive
+them, so each one arrives with its own copy of its ``type`` string. They are
+loaded into an events collection, indexes included, once holding the
+``EventRead`` models themselves (how the store used to keep them) and once as
+``EventRecord`` tuples. The traced heap growth is divided by the record count.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+from backend.models.data_models import EventRead
+from backend.store.memory_store import _empty_snapshot
+from backend.store.records import from_model
+
+TYPES = ("Work", "School", "Self Care", "Other")
+
+
+def _payload(i: int) -> bytes:
+    minute = i * 15
+    start = f"2020-{1 + minute // 40_320 % 12:02d}-{1 + minute // 1440 % 28:02d}"
+    return (
+        f'{{"id": {i}, "name": "Event {i}", "type": "{TYPES[i % len(TYPES)]}",'
+        f' "start_time": "{start}T{minute // 60 % 24:02d}:{minute % 60:02d}:00",'
+        f' "end_time": "{start}T{minute // 60 % 24:02d}:{minute % 60 + 10:02d}:00"}}'
+    ).encode()
+
+
+def _bytes_per_record(records: int, convert: Callable[[EventRead], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    loaded = {}
+    for i in range(1, records + 1):
+        loaded[i] = convert(EventRead.model_validate_json(_payload(i)))
+    collection = _empty_snapshot(0).events.rebuilt(loaded)
+    del loaded
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del collection
+    return size / records
+
+
+def main(records: int = 1_000_000) -> None:
+    """Print heap usage for both representations."""
+
+    before = _bytes_per_record(records, lambda model: model)
+    after = _bytes_per_record(records, lambda model: from_model("events", model))
+    print(f"{records} events, collection with indexes")
+    print(f"  EventRead models: {before:7.0f} B/record  {before * records / 2**20:8.1f} MiB")
+    print(f"  EventRecord:      {after:7.0f} B/record  {after * records / 2**20:8.1f} MiB")
+    print(f"  saved:            {1 - after / before:7.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
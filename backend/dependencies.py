@@ -2,12 +2,128 @@
 
 from __future__ import annotations
 
+import os
+import sys
+from typing import AsyncIterator, Optional, Union
+
+from fastapi import Depends, Header
+from fastapi.concurrency import run_in_threadpool
+
+from backend.store.async_store import AsyncStore
 from backend.store.memory_store import InMemoryStore
+from backend.store.persistence import DurableStore
+from backend.store.registry import (
+    USER_ID_PATTERN,
+    durable_registry,
+    memory_registry,
+    sqlite_registry,
+)
+from backend.store.sqlite_store import SqliteStore
+
+# BACKEND_DATABASE selects the SQLite store at that path. Otherwise the
+# in-memory store is used, optionally made durable by BACKEND_DATA_DIR
+# (write-ahead log + snapshots).
+_DATABASE = os.environ.get("BACKEND_DATABASE")
+_DATA_DIR = os.environ.get("BACKEND_DATA_DIR")
+# BACKEND_FAST_JSON=1 opts the list routes into serializing store records
+# straight to JSON; see backend.routers.fast_json.
+_FAST_JSON = os.environ.get("BACKEND_FAST_JSON", "") == "1"
+# Requests with an X-User-Id header use that user's own store, of the same
+# kind as the shared one, kept under BACKEND_USER_DATA_DIR (by default beside
+# the shared store; in-memory stores spill to a temporary directory unless it
+# is set). At most BACKEND_MAX_RESIDENT_USERS of them stay open; see
+# backend.store.registry.
+_USER_DATA_DIR = os.environ.get("BACKEND_USER_DATA_DIR")
+_MAX_RESIDENT_USERS = int(os.environ.get("BACKEND_MAX_RESIDENT_USERS", "64"))
+
+
+def _worker_count() -> int:
+    """How many server worker processes this one is part of.
+
+    uvicorn's (and ``fastapi run``'s) ``--workers`` defaults to
+    ``WEB_CONCURRENCY``. Its worker processes are spawned with the server's
+    ``sys.argv``, so a flag given on the command line is seen here too.
+    """
+
+    argv = sys.argv
+    for position, arg in enumerate(argv):
+        if arg == "--workers" and position + 1 < len(argv):
+            return int(argv[position + 1])
+        if arg.startswith("--workers="):
+            return int(arg.partition("=")[2])
+    return int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+
+# Each server worker is a separate process with its own copy of this module.
+# Only the SQLite store is shared between them: its ids, write versions and
+# instance id live in the database, so every worker sees the others' writes
+# and their ETags and caches stay valid. In-memory stores would silently
+# diverge, and a second DurableStore fails on the data directory's lock.
+_WORKERS = _worker_count()
+
+_STORE: Union[InMemoryStore, SqliteStore]
+if _DATABASE:
+    _STORE = SqliteStore(_DATABASE)
+elif _WORKERS > 1:
+    raise RuntimeError(
+        f"{_WORKERS} server workers would each get a private store: set BACKEND_DATABASE "
+        "to share one. Workers are counted from --workers or WEB_CONCURRENCY, which is "
+        "how start_backend_server.sh passes them."
+    )
+elif _DATA_DIR:
+    _STORE = DurableStore(_DATA_DIR)
+else:
+    _STORE = InMemoryStore()
+
+if _DATABASE:
+    _USERS = sqlite_registry(_USER_DATA_DIR or _DATABASE + ".users", _MAX_RESIDENT_USERS)
+elif _DATA_DIR:
+    _USERS = durable_registry(
+        _USER_DATA_DIR or os.path.join(_DATA_DIR, "users"), _MAX_RESIDENT_USERS
+    )
+else:
+    _USERS = memory_registry(_USER_DATA_DIR, _MAX_RESIDENT_USERS)
+
+
+# Dependencies are coroutines so FastAPI resolves them on the event loop
+# instead of sending each one to its threadpool.
+async def get_user_id(
+    x_user_id: Optional[str] = Header(default=None, pattern=USER_ID_PATTERN),
+) -> Optional[str]:
+    """Return the request's ``X-User-Id``, or ``None`` for the shared store."""
+
+    return x_user_id
+
+
+async def get_store(
+    x_user_id: Optional[str] = Depends(get_user_id),
+) -> AsyncIterator[Union[InMemoryStore, SqliteStore]]:
+    """Yield the requesting user's store, or the shared one without ``X-User-Id``.
+
+    The user's store stays pinned open until the response has been sent.
+    """
+
+    if x_user_id is None:
+        yield _STORE
+        return
+    store = _USERS.pin(x_user_id)
+    if store is None:
+        store = await run_in_threadpool(_USERS.open, x_user_id)
+    try:
+        yield store
+    finally:
+        _USERS.release(x_user_id)
+
+
+async def get_async_store(
+    store: Union[InMemoryStore, SqliteStore] = Depends(get_store),
+) -> AsyncStore:
+    """Return an ``AsyncStore`` over the request's store."""
 
-_STORE = InMemoryStore()
+    return AsyncStore(store)
 
 
-def get_store() -> InMemoryStore:
-    """Return the shared in-memory store instance."""
+async def use_fast_json() -> bool:
+    """Whether list routes should take the fast JSON path."""
 
-    return _STORE
+    return _FAST_JSON
@@ -3,7 +3,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.routers import events, homepage, homework, tasks, time_entries
+from backend.routers import (
+    changes,
+    events,
+    exports,
+    fast_json,
+    homepage,
+    homework,
+    imports,
+    sync,
+    tasks,
+    time_entries,
+)
+from backend.routers.conditional import ETAG_HEADER
+from backend.routers.pagination import NEXT_CURSOR_HEADER
 
 app = FastAPI()
 
@@ -13,6 +26,11 @@ app.include_router(events.router)
 app.include_router(homework.router)
 app.include_router(time_entries.router)
 app.include_router(homepage.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
+app.include_router(fast_json.router)
+app.include_router(changes.router)
+app.include_router(sync.router)
 
 # Enabled CORS for front-end access
 app.add_middleware(
@@ -21,4 +39,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
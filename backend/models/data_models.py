@@ -6,7 +6,7 @@ These models are used for request validation and consistent responses.
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -84,6 +84,14 @@ class EventRead(EventBase):
     id: int
 
 
+class EventConflictGroup(BaseModel):
+    """Events whose times overlap one another, returned by `GET /events/conflicts`."""
+
+    start_time: datetime = Field(description="Earliest start in the group.")
+    end_time: datetime = Field(description="Latest end in the group.")
+    events: List[EventRead]
+
+
 class HomeworkBase(BaseModel):
     """Shared homework fields used in requests/responses."""
 
@@ -157,6 +165,69 @@ class TimeEntryRead(TimeEntryBase):
     id: int
 
 
+class TimeEntryAnalytics(BaseModel):
+    """Aggregated time-tracking report returned by `GET /time-entries/analytics`."""
+
+    entries: int
+    total_minutes_by_type: Dict[str, float]
+    hour_of_day_minutes: Dict[str, List[float]] = Field(
+        description="Minutes per hour of day (index 0-23) for each type."
+    )
+    duration_bin_minutes: int
+    duration_histogram: List[int] = Field(
+        description="Entry counts per duration bin; the last bin is open-ended."
+    )
+
+
+class TimeEntryRollup(BaseModel):
+    """Time tracked for one type in one period, returned by `GET /time-entries/rollups`."""
+
+    type: str
+    period_start: date = Field(description="First day of the day, ISO week or month.")
+    minutes: float
+    entries: int = Field(description="Entries with time inside the period.")
+
+
+class BatchError(BaseModel):
+    """Validation errors for one item of a `POST /{resource}/batch` request."""
+
+    index: int = Field(description="Position of the item in the submitted array.")
+    errors: List[Dict[str, Any]]
+
+
+class BatchResult(BaseModel):
+    """Outcome of a `POST /{resource}/batch` request.
+
+    Created records get the contiguous ids ``first_id`` to
+    ``first_id + created - 1``, in the order they were submitted.
+    """
+
+    created: int
+    first_id: Optional[int] = None
+    errors: List[BatchError] = Field(
+        default_factory=list, description="Items skipped in best_effort mode."
+    )
+
+
+class ImportLineError(BaseModel):
+    """Validation errors for one line of a `POST /import` body."""
+
+    line: int = Field(description="1-based line number in the NDJSON body.")
+    errors: List[Dict[str, Any]]
+
+
+class ImportResult(BaseModel):
+    """Progress or outcome of a `POST /import` request."""
+
+    lines: int = Field(description="Non-blank lines read so far.")
+    created: Dict[str, int] = Field(description="Records committed per kind.")
+    failed: int = Field(description="Lines rejected so far.")
+    errors: List[ImportLineError] = Field(
+        description="The first rejected lines; ``failed`` counts all of them."
+    )
+    done: bool
+
+
 class HomepageData(BaseModel):
     """Aggregate dashboard data returned by `GET /homepage`."""
 
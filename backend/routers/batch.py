@@ -0,0 +1,128 @@
+"""Shared handling for the ``POST /{resource}/batch`` bulk create routes.
+
+The request body is a JSON array of the resource's create payloads. It is
+validated in one pass by a ``TypeAdapter`` over the whole list and handed to
+the store's ``create_many()``, which takes the collection lock once, assigns
+contiguous ids and updates the indexes in bulk.
+
+Bodies over ``MAX_BATCH_BYTES`` are refused (413) from their
+``Content-Length``, or as soon as that many bytes have arrived, and arrays
+of more than ``MAX_BATCH_SIZE`` items before any item is validated.
+
+``mode=atomic`` (the default) creates nothing if any item is invalid and
+answers 422 with every item's errors. ``mode=best_effort`` creates the valid
+items and reports the rejected ones in ``BatchResult.errors``.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import from_json
+
+from backend.models.data_models import BatchError, BatchResult
+from backend.store.async_store import AsyncStore
+
+MAX_BATCH_SIZE = 100_000
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+MODE_PATTERN = "^(atomic|best_effort)$"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])  # type: ignore[valid-type]
+
+
+def validation_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    """``exc``'s errors as JSON-serializable dicts, for error responses."""
+
+    # Inputs and contexts can hold values that are not JSON serializable.
+    return exc.errors(include_url=False, include_context=False, include_input=False)
+
+
+def _rejected(exc: ValidationError) -> Optional[List[BatchError]]:
+    """Group ``exc``'s errors by array index; ``None`` if the body is not an array."""
+
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    for error in validation_errors(exc):
+        index = error["loc"][0] if error["loc"] else None
+        if not isinstance(index, int):
+            return None
+        error["loc"] = error["loc"][1:]
+        grouped.setdefault(index, []).append(error)
+    return [BatchError(index=index, errors=errors) for index, errors in sorted(grouped.items())]
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+async def _read_body(request: Request) -> bytes:
+    """Return ``request``'s body, refusing it once it exceeds ``MAX_BATCH_BYTES``."""
+
+    too_large = _too_large(f"Batch bodies are limited to {MAX_BATCH_BYTES} bytes")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BATCH_BYTES:
+        raise too_large
+    chunks: List[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BATCH_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _create(store: Any, name: str, model: type, body: bytes, mode: str) -> BatchResult:
+    adapter = _list_adapter(model)
+    try:
+        items = from_json(body)
+    except ValueError:
+        # Not JSON; validate_json() below reports it like any other error.
+        items = None
+    if isinstance(items, list) and len(items) > MAX_BATCH_SIZE:
+        raise _too_large(f"Batches are limited to {MAX_BATCH_SIZE} items")
+    rejected: List[BatchError] = []
+    try:
+        if items is None:
+            payloads = adapter.validate_json(body)
+        else:
+            payloads = adapter.validate_python(items)
+    except ValidationError as exc:
+        grouped = _rejected(exc)
+        if grouped is None:
+            raise HTTPException(status_code=422, detail=validation_errors(exc)) from exc
+        if mode == "atomic":
+            raise HTTPException(
+                status_code=422,
+                detail=[error.model_dump() for error in grouped],
+            ) from exc
+        rejected = grouped
+        skipped = {error.index for error in grouped}
+        payloads = [
+            model.model_validate(item)
+            for index, item in enumerate(items)  # type: ignore[arg-type]
+            if index not in skipped
+        ]
+    created = store.create_many(name, payloads)
+    return BatchResult(
+        created=len(created),
+        first_id=created[0].id if created else None,
+        errors=rejected,
+    )
+
+
+async def create_batch(
+    request: Request, store: AsyncStore, name: str, model: type[BaseModel], mode: str
+) -> BatchResult:
+    """Create ``name`` records from the JSON array in ``request``'s body."""
+
+    body = await _read_body(request)
+    # Validation and the store write are CPU bound; keep them off the event loop.
+    return await store.write(
+        (name,), _create, store.store, name, model, body, mode, offload=True
+    )
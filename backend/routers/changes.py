@@ -0,0 +1,98 @@
+"""Server-Sent Events feed of every committed write.
+
+``GET /changes/stream`` keeps the connection open and sends one event per
+create, update or delete, in commit order, so pages can follow changes
+instead of polling the list routes::
+
+    id: 3f9c1a2b-42
+    event: update
+    data: {"resource":"tasks","id":7,"version":118,"payload":{...}}
+
+``resource`` is the URL name of the collection, ``version`` its write
+version after the change (``payload`` is ``null`` for deletes). A ``reset``
+event (``data: {"version": N}``) means the client cannot tell what it missed
+and should reload everything.
+
+Browsers' ``EventSource`` reconnects by itself and sends the last ``id`` it
+saw as ``Last-Event-ID``; the stream then replays the changes since that
+point from the store's ring buffer (see ``backend.store.changes``). A client
+too slow to keep up is disconnected and catches up the same way.
+
+Only the in-memory stores, which keep a ``ChangeFeed``, serve the stream.
+"""
+
+from __future__ import annotations
+
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from backend.dependencies import get_store
+from backend.routers.exports import RESOURCES
+from backend.store.changes import RESET, Change, ChangeFeed, Subscription
+from backend.store.memory_store import InMemoryStore
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+# A comment is sent after this long without changes, so proxies keep the
+# connection open and a vanished client is noticed.
+KEEPALIVE_SECONDS = 15.0
+# How long EventSource waits before reconnecting, in milliseconds.
+RETRY_MS = 1000
+
+_RESOURCE_OF = {name: resource for resource, name in RESOURCES.items()}
+
+
+def _frame(feed: ChangeFeed, change: Change) -> bytes:
+    if change.op == RESET:
+        data = b'{"version":%d}' % change.version
+    else:
+        data = b'{"resource":"%s","id":%d,"version":%d,"payload":%s}' % (
+            _RESOURCE_OF[change.name].encode(),  # type: ignore[index]
+            change.record_id,
+            change.version,
+            change.record_json(),
+        )
+    event_id = feed.resume_point(change.seq).encode()
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id, change.op.encode(), data)
+
+
+async def _events(
+    feed: ChangeFeed, subscription: Subscription, backlog: List[Change]
+) -> AsyncIterator[bytes]:
+    try:
+        opening = b"retry: %d\n\n" % RETRY_MS
+        if backlog:
+            yield opening + b"".join(_frame(feed, change) for change in backlog)
+        else:
+            # An id without data only moves the client's resume point here.
+            yield opening + b"id: %s\n\n" % feed.resume_point(subscription.last_seq).encode()
+        while True:
+            batch = await subscription.next_batch(KEEPALIVE_SECONDS)
+            if subscription.shed:
+                return
+            if batch:
+                yield b"".join(_frame(feed, change) for change in batch)
+            else:
+                yield b": keepalive\n\n"
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(
+    last_event_id: Optional[str] = Header(default=None),
+    store: InMemoryStore = Depends(get_store),
+) -> StreamingResponse:
+    """Stream creates, updates and deletes as Server-Sent Events."""
+
+    if not isinstance(store, InMemoryStore):
+        raise HTTPException(status_code=404, detail="Store publishes no change feed")
+    feed = store.change_feed()
+    subscription, backlog = feed.subscribe(last_event_id)
+    return StreamingResponse(
+        _events(feed, subscription, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
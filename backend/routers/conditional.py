@@ -0,0 +1,82 @@
+"""Strong ETags and ``If-None-Match`` handling for GET routes.
+
+ETags are built from store versions rather than response bodies: a list's tag
+is its collection's ``write_version()`` and an item's tag is its
+``record_version()``, both prefixed with the store's ``instance_id``. Routes
+check the request's validators before reading any data, so a ``304 Not
+Modified`` costs a version lookup and nothing is serialized.
+
+Versions must be read before the data they describe. A write racing the read
+can then only pair newer data with an older tag, which the next request
+replaces, never serve stale data under a current tag.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response, status
+
+from backend.store.async_store import AsyncStore
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts: Any) -> str:
+    """Return a strong entity tag made of ``parts``."""
+
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds ``etag``.
+
+    Otherwise set the ``ETag`` header on ``response`` and return ``None`` so
+    the route carries on and renders the body.
+    """
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
+    response.headers[ETAG_HEADER] = etag
+    return None
+
+
+async def read_with_etag(
+    request: Request,
+    response: Response,
+    store: AsyncStore,
+    name: str,
+    fn: Callable[[Any], Any],
+    record_id: Optional[int] = None,
+) -> Any:
+    """Return ``fn(sync store)``, or a 304 response if the client's copy is current.
+
+    The tag is collection ``name``'s write version or, given ``record_id``,
+    that record's version; a record that does not exist gives ``None``
+    without calling ``fn``. The version and the data are read together, which
+    costs one threadpool trip at most.
+    """
+
+    def _read(sync: Any) -> Any:
+        if record_id is None:
+            version = sync.write_version(name)
+        else:
+            version = sync.record_version(name, record_id)
+            if version is None:
+                return None
+        cached = not_modified(request, response, make_etag(sync.instance_id, version))
+        if cached is not None:
+            return cached
+        return fn(sync)
+
+    return await store.read(_read, store.store)
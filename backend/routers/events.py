@@ -4,89 +4,207 @@ from __future__ import annotations
 
 # pylint: disable=too-many-arguments,too-many-positional-arguments
 
+import sys
 from datetime import datetime
-from typing import List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-
-from backend.dependencies import get_store
-from backend.models.data_models import EventCreate, EventRead, EventUpdate
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from backend.dependencies import get_async_store, get_store, use_fast_json
+from backend.models.data_models import (
+    BatchResult,
+    EventConflictGroup,
+    EventCreate,
+    EventRead,
+    EventUpdate,
+)
+from backend.routers.batch import MODE_PATTERN, create_batch
+from backend.routers.conditional import read_with_etag
+from backend.routers.fast_json import json_response
+from backend.routers.pagination import decode_cursor, set_next_cursor
+from backend.store.async_store import AsyncStore
+from backend.store.conflicts import conflict_groups
+from backend.store.indexes import sort_key
 from backend.store.memory_store import InMemoryStore
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
 DEFAULT_LIMIT = 100
+CONFLICTS_HEADER = "X-Event-Conflicts"
+MAX_REPORTED_CONFLICTS = 100
+
+
+async def _report_conflicts(response: Response, event: EventRead, store: AsyncStore) -> None:
+    """Set ``X-Event-Conflicts`` to the ids of events overlapping ``event``.
+
+    Uses the overlap index, so only events that actually collide are read.
+    The header is omitted when there are none.
+    """
+
+    overlapping = await store.list_events(
+        overlaps_start=event.start_time,
+        overlaps_end=event.end_time,
+        limit=MAX_REPORTED_CONFLICTS + 1,
+    )
+    ids = [str(other.id) for other in overlapping if other.id != event.id]
+    if ids:
+        response.headers[CONFLICTS_HEADER] = ",".join(ids[:MAX_REPORTED_CONFLICTS])
+
 
 @router.get("/", response_model=List[EventRead])
-def list_events(
+async def list_events(
+    request: Request,
+    response: Response,
     type_: Optional[str] = Query(default=None, alias="type"),
     completed: Optional[bool] = None,
     start_after: Optional[datetime] = None,
     start_before: Optional[datetime] = None,
+    overlaps_start: Optional[datetime] = None,
+    overlaps_end: Optional[datetime] = None,
     limit: int = Query(default=DEFAULT_LIMIT, ge=0, le=1000),
     offset: int = Query(default=0, ge=0),
-    store: InMemoryStore = Depends(get_store),
+    cursor: Optional[str] = None,
+    store: AsyncStore = Depends(get_async_store),
+    fast_json: bool = Depends(use_fast_json),
 ) -> List[EventRead]:
-    """List events with optional filters."""
-
-    return store.list_events(
-        type_=type_,
-        completed=completed,
-        start_after=start_after,
-        start_before=start_before,
-        limit=limit,
-        offset=offset,
-    )
+    """List events with optional filters.
+
+    ``overlaps_start``/``overlaps_end`` keep only events that intersect that
+    window (``start_time < overlaps_end`` and ``end_time > overlaps_start``);
+    either side may be omitted.
+
+    Offset paging is kept for compatibility; for deep pages pass the previous
+    response's ``X-Next-Cursor`` header back as ``cursor``.
+    """
+
+    def _page(sync: InMemoryStore) -> Any:
+        return sync.list_events(
+            type_=type_,
+            completed=completed,
+            start_after=start_after,
+            start_before=start_before,
+            overlaps_start=overlaps_start,
+            overlaps_end=overlaps_end,
+            limit=limit,
+            offset=offset,
+            after=decode_cursor(cursor, datetime.fromisoformat),
+            raw=fast_json,
+        )
+
+    events = await read_with_etag(request, response, store, "events", _page)
+    if isinstance(events, Response):
+        return events
+    set_next_cursor(response, events, limit, "start_time")
+    if fast_json:
+        return json_response(response, events)
+    return events
 
 
 @router.post("/", response_model=EventRead, status_code=status.HTTP_201_CREATED)
-def create_event(
+async def create_event(
     payload: EventCreate,
-    store: InMemoryStore = Depends(get_store),
+    response: Response,
+    check_conflicts: bool = False,
+    store: AsyncStore = Depends(get_async_store),
 ) -> EventRead:
-    """Create an event."""
+    """Create an event.
+
+    With ``check_conflicts=true`` the ids of events overlapping the new one
+    are returned in the ``X-Event-Conflicts`` header.
+    """
 
-    return store.create_event(payload)
+    event = await store.create_event(payload)
+    if check_conflicts:
+        await _report_conflicts(response, event, store)
+    return event
+
+
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_events_batch(
+    request: Request,
+    mode: str = Query(default="atomic", pattern=MODE_PATTERN),
+    store: AsyncStore = Depends(get_async_store),
+) -> BatchResult:
+    """Create events from a JSON array of create payloads; see ``batch``."""
+
+    return await create_batch(request, store, "events", EventCreate, mode)
+
+
+@router.get("/conflicts", response_model=List[EventConflictGroup])
+def list_event_conflicts(
+    start: datetime,
+    end: datetime,
+    store: InMemoryStore = Depends(get_store),
+) -> List[EventConflictGroup]:
+    """Groups of overlapping events among those intersecting ``[start, end)``."""
+
+    if end <= start:
+        raise HTTPException(status_code=422, detail="end must be after start")
+    events = store.list_events(overlaps_start=start, overlaps_end=end, limit=sys.maxsize)
+    return [
+        EventConflictGroup(
+            start_time=group[0].start_time,
+            end_time=max((event.end_time for event in group), key=sort_key),
+            events=group,
+        )
+        for group in conflict_groups(events)
+    ]
 
 
 @router.get("/{event_id}", response_model=EventRead)
-def get_event(
+async def get_event(
     event_id: int,
-    store: InMemoryStore = Depends(get_store),
+    request: Request,
+    response: Response,
+    store: AsyncStore = Depends(get_async_store),
 ) -> EventRead:
     """Fetch a single event by id."""
 
-    event = store.get_event(event_id)
+    event = await read_with_etag(
+        request,
+        response,
+        store,
+        "events",
+        lambda sync: sync.get_event(event_id),
+        record_id=event_id,
+    )
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
     return event
 
 
 @router.patch("/{event_id}", response_model=EventRead)
-def update_event(
+async def update_event(
     event_id: int,
     payload: EventUpdate,
-    store: InMemoryStore = Depends(get_store),
+    response: Response,
+    check_conflicts: bool = False,
+    store: AsyncStore = Depends(get_async_store),
 ) -> EventRead:
-    """Partially update an event by id."""
+    """Partially update an event by id.
+
+    ``check_conflicts=true`` reports overlapping events as in ``POST /events/``.
+    """
 
     try:
-        updated = store.update_event(event_id, payload)
+        updated = await store.update_event(event_id, payload)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     if updated is None:
         raise HTTPException(status_code=404, detail="Event not found")
+    if check_conflicts:
+        await _report_conflicts(response, updated, store)
     return updated
 
 
 @router.delete("/{event_id}")
-def delete_event(
+async def delete_event(
     event_id: int,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> dict:
     """Delete an event by id."""
 
-    deleted = store.delete_event(event_id)
+    deleted = await store.delete_event(event_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Event not found")
     return {"deleted": True}
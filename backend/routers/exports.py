@@ -0,0 +1,131 @@
+"""Streaming export of whole collections.
+
+``GET /export/{resource}`` streams every record of one resource and
+``GET /export`` every record of all of them, tagged with the same kinds
+``POST /import`` reads, so an export can be imported into another store as
+is. Records come from the store's ``export_records()``, which reads one
+consistent snapshot, and are serialized straight from their field dicts:
+no response model is built or validated, and only ``FLUSH_BYTES`` of output
+is buffered at a time, so memory stays flat however many records there are.
+
+``format=ndjson`` (the default) writes one JSON object per line;
+``format=json`` writes a JSON array (for ``/export``, an object of arrays
+keyed by resource URL name, such as ``time-entries``).
+"""
+
+from __future__ import annotations
+
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterator, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from backend.dependencies import get_store
+from backend.routers.imports import KINDS
+from backend.store.memory_store import InMemoryStore
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+FLUSH_BYTES = 64 * 1024
+FORMAT_PATTERN = "^(ndjson|json)$"
+
+# URL names of the resources and their store collections.
+RESOURCES = {
+    "tasks": "tasks",
+    "events": "events",
+    "homework": "homework",
+    "time-entries": "time_entries",
+}
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+_KIND_OF = {name: kind for kind, name in KINDS.items()}
+_RESOURCE_OF = {name: resource for resource, name in RESOURCES.items()}
+# Serializes datetimes, dates and the rest exactly as the API models do.
+_FIELDS = TypeAdapter(Dict[str, Any])
+
+
+def _buffered(pieces: Iterator[bytes]) -> Iterator[bytes]:
+    """Join small pieces into writes of about ``FLUSH_BYTES``.
+
+    The first piece goes out on its own, so clients see data at once.
+    """
+
+    first = next(pieces, None)
+    if first is not None:
+        yield first
+    pending = bytearray()
+    for piece in pieces:
+        pending += piece
+        if len(pending) >= FLUSH_BYTES:
+            yield bytes(pending)
+            pending.clear()
+    if pending:
+        yield bytes(pending)
+
+
+def _ndjson(records: Iterator[Tuple[str, Dict[str, Any]]], tagged: bool) -> Iterator[bytes]:
+    dump = _FIELDS.dump_json
+    for name, fields in records:
+        line = {"kind": _KIND_OF[name], "record": fields} if tagged else fields
+        yield dump(line) + b"\n"
+
+
+def _array(records: Iterator[Tuple[str, Dict[str, Any]]]) -> Iterator[bytes]:
+    dump = _FIELDS.dump_json
+    separator = b"["
+    for _, fields in records:
+        yield separator + dump(fields)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def _json(records: Iterator[Tuple[str, Dict[str, Any]]], names: Sequence[str]) -> Iterator[bytes]:
+    if len(names) == 1:
+        yield from _array(records)
+        return
+    # Records arrive one collection after another; empty ones never show up.
+    separator = b"{"
+    seen = set()
+    for name, group in groupby(records, key=itemgetter(0)):
+        yield separator + b'"%s":' % _RESOURCE_OF[name].encode()
+        yield from _array(group)
+        separator = b","
+        seen.add(name)
+    for name in names:
+        if name not in seen:
+            yield separator + b'"%s":[]' % _RESOURCE_OF[name].encode()
+            separator = b","
+    yield b"}"
+
+
+def _stream(store: Any, names: Sequence[str], fmt: str, tagged: bool) -> StreamingResponse:
+    records = store.export_records(names)
+    pieces = _ndjson(records, tagged) if fmt == "ndjson" else _json(records, names)
+    return StreamingResponse(_buffered(pieces), media_type=_MEDIA_TYPES[fmt])
+
+
+@router.get("", response_class=StreamingResponse)
+def export_all(
+    fmt: str = Query(default="ndjson", alias="format", pattern=FORMAT_PATTERN),
+    store: InMemoryStore = Depends(get_store),
+) -> StreamingResponse:
+    """Stream every record of every resource from one snapshot."""
+
+    return _stream(store, tuple(KINDS.values()), fmt, tagged=True)
+
+
+@router.get("/{resource}", response_class=StreamingResponse)
+def export_resource(
+    resource: str,
+    fmt: str = Query(default="ndjson", alias="format", pattern=FORMAT_PATTERN),
+    store: InMemoryStore = Depends(get_store),
+) -> StreamingResponse:
+    """Stream every record of one resource in ``(time, id)`` order."""
+
+    name = RESOURCES.get(resource)
+    if name is None:
+        raise HTTPException(status_code=404, detail="Unknown resource")
+    return _stream(store, (name,), fmt, tagged=False)
@@ -0,0 +1,52 @@
+"""Opt-in fast path for serializing list responses.
+
+A route that returns models makes FastAPI validate them again against its
+``response_model`` and then serialize them, on top of the store building
+those models from its records in the first place. With the fast path
+(``BACKEND_FAST_JSON=1``, read through ``use_fast_json()``) the list routes
+ask the store for ``raw=True`` field dicts and return them from
+``json_response()``, serialized in one pydantic-core call. The
+``response_model`` stays declared, so the OpenAPI schema does not change.
+
+The bytes match the regular path's values; only the order of keys inside
+each object may differ.
+
+The in-memory store also keeps each record's JSON in a ``RecordJsonCache``
+and hands back ``JsonRows``, whose page is a join of those fragments, so a
+hot list costs little more than copying bytes. Its counters are served by
+``GET /fast-json/cache-stats``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+
+from backend.dependencies import get_store
+from backend.store.json_cache import JsonRows
+from backend.store.memory_store import InMemoryStore
+
+router = APIRouter(tags=["Fast JSON"])
+
+# Serializes datetimes, dates and the rest exactly as the API models do.
+_ROWS = TypeAdapter(List[Dict[str, Any]])
+
+
+def json_response(response: Response, rows: Sequence[Dict[str, Any]]) -> Response:
+    """Return ``rows`` as a JSON array, keeping headers already set on ``response``."""
+
+    body = rows.json() if isinstance(rows, JsonRows) else _ROWS.dump_json(rows)
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+@router.get("/fast-json/cache-stats")
+def get_json_cache_stats(
+    store: InMemoryStore = Depends(get_store),
+) -> Dict[str, Any]:
+    """Hit rate, size and eviction counters of the per-record JSON cache."""
+
+    if not isinstance(store, InMemoryStore):
+        raise HTTPException(status_code=404, detail="Store keeps no JSON cache")
+    return store.json_cache_stats()
@@ -1,18 +1,36 @@
-"""Homepage aggregation routes."""
+"""Homepage aggregation routes.
+
+Dashboards are cached per ``(days, tasks_limit, events_limit, time bucket)``
+together with the tasks and events write versions, so repeated loads between
+writes are a dictionary lookup. Only the cache key is rounded to a
+``TIME_BUCKET_SECONDS`` bucket: each cached page covers every load in its
+bucket and is cut down to the real current time when served, so an event that
+has already started is never listed as upcoming.
+"""
 
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Sequence, Tuple
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from backend.dependencies import get_store
+from backend.dependencies import get_async_store, get_store
 from backend.models.data_models import HomepageData
+from backend.routers.conditional import ETAG_HEADER, make_etag, not_modified
+from backend.routers.response_cache import StoreCaches
+from backend.store.async_store import AsyncStore
+from backend.store.indexes import sort_key
 from backend.store.memory_store import InMemoryStore
 
 router = APIRouter()
 
+TIME_BUCKET_SECONDS = 60
+CACHE_SIZE = 256
+
+_caches = StoreCaches(CACHE_SIZE)
+
+
 def _build_notifications(tasks, events) -> List[str]:
     """Create a small list of human-readable dashboard notifications."""
 
@@ -26,23 +44,122 @@ def _build_notifications(tasks, events) -> List[str]:
     return notifications[:10]
 
 
+def _time_bucket(now: datetime) -> int:
+    return int(now.timestamp() // TIME_BUCKET_SECONDS)
+
+
+def _pin(store) -> Tuple[Any, int, int]:
+    snapshot = store.snapshot()
+    return snapshot, snapshot.write_version("tasks"), snapshot.write_version("events")
+
+
+class _Page:
+    """Tasks and events that any load within one time bucket may show.
+
+    ``tasks`` stops at the latest horizon in the bucket; ``events`` starts at
+    the bucket's first instant and holds enough extra rows to still fill
+    ``events_limit`` once the ones that started earlier in the bucket are cut.
+    Rendered bodies are kept per visible slice.
+    """
+
+    def __init__(self, tasks: Sequence[Any], events: Sequence[Any]) -> None:
+        self.tasks = tasks
+        self.events = events
+        self.bodies: Dict[Tuple[int, int, int], bytes] = {}
+
+    def window(
+        self, now: datetime, days: int, events_limit: int
+    ) -> Tuple[int, int, int]:
+        """Return ``(tasks_end, events_start, events_end)`` visible at ``now``."""
+
+        now_key = sort_key(now)
+        horizon_key = sort_key(now + timedelta(days=days))
+        tasks_end = sum(1 for task in self.tasks if sort_key(task.due_date) <= horizon_key)
+        events_start = sum(1 for event in self.events if sort_key(event.start_time) < now_key)
+        events_end = events_start
+        while (
+            events_end < len(self.events)
+            and events_end - events_start < events_limit
+            and sort_key(self.events[events_end].start_time) <= horizon_key
+        ):
+            events_end += 1
+        return tasks_end, events_start, events_end
+
+    def render(self, window: Tuple[int, int, int]) -> bytes:
+        """Return the JSON body showing ``window``, rendering it on first use."""
+
+        body = self.bodies.get(window)
+        if body is None:
+            tasks_end, events_start, events_end = window
+            tasks = list(self.tasks[:tasks_end])
+            events = list(self.events[events_start:events_end])
+            notifications = _build_notifications(tasks, events)
+            data = HomepageData(tasks=tasks, events=events, notifications=notifications)
+            body = self.bodies[window] = data.model_dump_json().encode()
+        return body
+
+
+def _build_page(
+    snapshot, bucket: int, days: int, tasks_limit: int, events_limit: int
+) -> _Page:
+    first = datetime.fromtimestamp(bucket * TIME_BUCKET_SECONDS)
+    last = datetime.fromtimestamp((bucket + 1) * TIME_BUCKET_SECONDS)
+    tasks = snapshot.list_tasks(
+        completed=False, due_before=last + timedelta(days=days), limit=tasks_limit, offset=0
+    )
+    # Events starting within the bucket may have begun by the time a load is
+    # served, so fetch past events_limit by as many of them as the page holds.
+    limit, last_key = events_limit, sort_key(last)
+    while True:
+        events = snapshot.list_events(
+            start_after=first, start_before=last + timedelta(days=days), limit=limit, offset=0
+        )
+        in_bucket = sum(1 for event in events if sort_key(event.start_time) < last_key)
+        if len(events) < limit or limit >= events_limit + in_bucket:
+            break
+        limit = events_limit + in_bucket
+    return _Page(tasks, events)
+
+
 @router.get("/homepage", response_model=HomepageData)
 async def get_homepage(
+    request: Request,
+    response: Response,
     days: int = Query(default=7, ge=0, le=365),
     tasks_limit: int = Query(default=10, ge=0, le=100),
     events_limit: int = Query(default=10, ge=0, le=100),
-    store: InMemoryStore = Depends(get_store),
-) -> HomepageData:
+    store: AsyncStore = Depends(get_async_store),
+) -> Response:
     """Return dashboard data scoped to the next N days."""
 
     now = datetime.now()
-    horizon = now + timedelta(days=days)
+    bucket = _time_bucket(now)
 
-    tasks = store.list_tasks(
-        completed=False, due_before=horizon, limit=tasks_limit, offset=0
+    # Read both collections from one snapshot so they reflect the same version.
+    # Versions are read before the data, so a racing write can only file newer
+    # data under an older key, never the reverse.
+    snapshot, *versions = await store.read(_pin, store.store)
+    key = (days, tasks_limit, events_limit, bucket, *versions)
+    page = await store.read(
+        _caches.for_store(store.store).get_or_build,
+        key,
+        lambda: _build_page(snapshot, bucket, days, tasks_limit, events_limit),
     )
-    events = store.list_events(
-        start_after=now, start_before=horizon, limit=events_limit, offset=0
+    window = page.window(now, days, events_limit)
+    etag = make_etag(store.instance_id, *key[3:], *window)
+    cached = not_modified(request, response, etag)
+    if cached is not None:
+        return cached
+
+    return Response(
+        content=page.render(window), media_type="application/json", headers={ETAG_HEADER: etag}
     )
-    notifications = _build_notifications(tasks, events)
-    return HomepageData(tasks=tasks, events=events, notifications=notifications)
+
+
+@router.get("/homepage/cache-stats")
+def get_homepage_cache_stats(
+    store: InMemoryStore = Depends(get_store),
+) -> Dict[str, int]:
+    """Hit, miss and eviction counters of the dashboard cache."""
+
+    return _caches.for_store(store).stats()
@@ -5,12 +5,17 @@ from __future__ import annotations
 # pylint: disable=too-many-arguments,too-many-positional-arguments
 
 from datetime import date
-from typing import List, Optional
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from backend.dependencies import get_store
-from backend.models.data_models import HomeworkCreate, HomeworkRead, HomeworkUpdate
+from backend.dependencies import get_async_store, use_fast_json
+from backend.models.data_models import BatchResult, HomeworkCreate, HomeworkRead, HomeworkUpdate
+from backend.routers.batch import MODE_PATTERN, create_batch
+from backend.routers.conditional import read_with_etag
+from backend.routers.fast_json import json_response
+from backend.routers.pagination import decode_cursor, set_next_cursor
+from backend.store.async_store import AsyncStore
 from backend.store.memory_store import InMemoryStore
 
 router = APIRouter(prefix="/homework", tags=["Homework"])
@@ -19,72 +24,111 @@ DEFAULT_LIMIT = 100
 
 
 @router.get("/", response_model=List[HomeworkRead])
-def list_homework(
+async def list_homework(
+    request: Request,
+    response: Response,
     course: Optional[str] = None,
     due_before: Optional[date] = None,
     due_after: Optional[date] = None,
     completed: Optional[bool] = None,
     limit: int = Query(default=DEFAULT_LIMIT, ge=0, le=1000),
     offset: int = Query(default=0, ge=0),
-    store: InMemoryStore = Depends(get_store),
+    cursor: Optional[str] = None,
+    store: AsyncStore = Depends(get_async_store),
+    fast_json: bool = Depends(use_fast_json),
 ) -> List[HomeworkRead]:
-    """List homework items with optional filters."""
-
-    return store.list_homework(
-        course=course,
-        due_before=due_before,
-        due_after=due_after,
-        completed=completed,
-        limit=limit,
-        offset=offset,
-    )
+    """List homework items with optional filters.
+
+    Offset paging is kept for compatibility; for deep pages pass the previous
+    response's ``X-Next-Cursor`` header back as ``cursor``.
+    """
+
+    def _page(sync: InMemoryStore) -> Any:
+        return sync.list_homework(
+            course=course,
+            due_before=due_before,
+            due_after=due_after,
+            completed=completed,
+            limit=limit,
+            offset=offset,
+            after=decode_cursor(cursor, date.fromisoformat),
+            raw=fast_json,
+        )
+
+    items = await read_with_etag(request, response, store, "homework", _page)
+    if isinstance(items, Response):
+        return items
+    set_next_cursor(response, items, limit, "due_date")
+    if fast_json:
+        return json_response(response, items)
+    return items
 
 
 @router.post("/", response_model=HomeworkRead, status_code=status.HTTP_201_CREATED)
-def create_homework(
+async def create_homework(
     payload: HomeworkCreate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> HomeworkRead:
     """Create a homework item."""
 
-    return store.create_homework(payload)
+    return await store.create_homework(payload)
+
+
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_homework_batch(
+    request: Request,
+    mode: str = Query(default="atomic", pattern=MODE_PATTERN),
+    store: AsyncStore = Depends(get_async_store),
+) -> BatchResult:
+    """Create homework from a JSON array of create payloads; see ``batch``."""
+
+    return await create_batch(request, store, "homework", HomeworkCreate, mode)
 
 
 @router.get("/{homework_id}", response_model=HomeworkRead)
-def get_homework(
+async def get_homework(
     homework_id: int,
-    store: InMemoryStore = Depends(get_store),
+    request: Request,
+    response: Response,
+    store: AsyncStore = Depends(get_async_store),
 ) -> HomeworkRead:
     """Fetch a homework item by id."""
 
-    item = store.get_homework(homework_id)
+    item = await read_with_etag(
+        request,
+        response,
+        store,
+        "homework",
+        lambda sync: sync.get_homework(homework_id),
+        record_id=homework_id,
+    )
     if item is None:
         raise HTTPException(status_code=404, detail="Homework not found")
     return item
 
 
 @router.patch("/{homework_id}", response_model=HomeworkRead)
-def update_homework(
+async def update_homework(
     homework_id: int,
     payload: HomeworkUpdate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> HomeworkRead:
     """Partially update a homework item by id."""
 
-    updated = store.update_homework(homework_id, payload)
+    updated = await store.update_homework(homework_id, payload)
     if updated is None:
         raise HTTPException(status_code=404, detail="Homework not found")
     return updated
 
 
 @router.delete("/{homework_id}")
-def delete_homework(
+async def delete_homework(
     homework_id: int,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> dict:
     """Delete a homework item by id."""
 
-    deleted = store.delete_homework(homework_id)
+    deleted = await store.delete_homework(homework_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Homework not found")
     return {"deleted": True}
@@ -0,0 +1,225 @@
+"""Streaming NDJSON import of mixed resources.
+
+``POST /import`` takes an ``application/x-ndjson`` body with one record per
+line, tagged with its kind (``task``, ``event``, ``homework`` or
+``time_entry``)::
+
+    {"kind": "event", "record": {"name": "Standup", "type": "Work", ...}}
+
+The body is read as it arrives. Up to ``CHUNK_LINES`` lines are buffered,
+then validated and committed with one ``create_many()`` per kind before any
+more of the body is read, so memory stays flat however large the upload is.
+Lines are validated before any write lock is taken; the locks of the kinds
+in the chunk are only held for the ``create_many()`` calls.
+Each chunk commits on its own: if an upload breaks off, every chunk before
+the break stays imported.
+
+Invalid lines are skipped and reported by line number (the first
+``MAX_REPORTED_ERRORS`` of them). Passing ``import_id`` lets another client
+of the same user (``X-User-Id``) follow a running import with
+``GET /import/{import_id}``; other users' imports are not found.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=too-few-public-methods
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Annotated, Any, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from backend.dependencies import get_async_store, get_user_id
+from backend.models.data_models import (
+    EventCreate,
+    HomeworkCreate,
+    ImportLineError,
+    ImportResult,
+    TaskCreate,
+    TimeEntryCreate,
+)
+from backend.routers.batch import validation_errors
+from backend.store.async_store import AsyncStore
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+CHUNK_LINES = 5_000
+MAX_LINE_BYTES = 1 << 20
+MAX_REPORTED_ERRORS = 100
+MAX_TRACKED_IMPORTS = 64
+
+# Line kinds and the store collections they are created in.
+KINDS = {
+    "task": "tasks",
+    "event": "events",
+    "homework": "homework",
+    "time_entry": "time_entries",
+}
+
+
+class _TaskLine(BaseModel):
+    kind: Literal["task"]
+    record: TaskCreate
+
+
+class _EventLine(BaseModel):
+    kind: Literal["event"]
+    record: EventCreate
+
+
+class _HomeworkLine(BaseModel):
+    kind: Literal["homework"]
+    record: HomeworkCreate
+
+
+class _TimeEntryLine(BaseModel):
+    kind: Literal["time_entry"]
+    record: TimeEntryCreate
+
+
+_LINE = TypeAdapter(
+    Annotated[
+        Union[_TaskLine, _EventLine, _HomeworkLine, _TimeEntryLine],
+        Field(discriminator="kind"),
+    ]
+)
+
+# Keyed by (X-User-Id, import_id); the shared store's user id is None.
+_progress: "OrderedDict[Tuple[Optional[str], str], ImportResult]" = OrderedDict()
+_progress_lock = Lock()
+
+
+def _track(key: Tuple[Optional[str], str], result: ImportResult) -> None:
+    with _progress_lock:
+        _progress[key] = result
+        _progress.move_to_end(key)
+        while len(_progress) > MAX_TRACKED_IMPORTS:
+            _progress.popitem(last=False)
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """Yield the lines of a streamed body; ``None`` replaces an over-long line.
+
+    At most ``MAX_LINE_BYTES`` of an unfinished line are kept; the rest of a
+    longer line is dropped as it arrives.
+    """
+
+    pending = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        *complete, tail = chunk.split(b"\n")
+        for piece in complete:
+            if skipping or len(pending) + len(piece) > MAX_LINE_BYTES:
+                yield None
+            else:
+                pending += piece
+                yield bytes(pending)
+            pending.clear()
+            skipping = False
+        if not skipping:
+            pending += tail
+            if len(pending) > MAX_LINE_BYTES:
+                pending.clear()
+                skipping = True
+    if skipping:
+        yield None
+    elif pending:
+        yield bytes(pending)
+
+
+def _validate(
+    lines: List[Tuple[int, Optional[bytes]]],
+) -> Tuple[Dict[str, List[Any]], List[ImportLineError]]:
+    """Split one chunk of numbered lines into create models per kind and errors."""
+
+    payloads: Dict[str, List[Any]] = {}
+    rejected: List[ImportLineError] = []
+    for number, line in lines:
+        if line is None:
+            error = {"type": "too_long", "loc": [], "msg": f"Longer than {MAX_LINE_BYTES} bytes"}
+            rejected.append(ImportLineError(line=number, errors=[error]))
+            continue
+        try:
+            parsed = _LINE.validate_json(line)
+        except ValidationError as exc:
+            rejected.append(ImportLineError(line=number, errors=validation_errors(exc)))
+            continue
+        payloads.setdefault(parsed.kind, []).append(parsed.record)
+    return payloads, rejected
+
+
+def _create(store: Any, payloads: Dict[str, List[Any]]) -> Dict[str, int]:
+    return {
+        kind: len(store.create_many(KINDS[kind], records)) for kind, records in payloads.items()
+    }
+
+
+async def _flush(
+    store: AsyncStore, lines: List[Tuple[int, Optional[bytes]]], result: ImportResult
+) -> None:
+    if not lines:
+        return
+    payloads, rejected = await run_in_threadpool(_validate, lines)
+    created: Dict[str, int] = {}
+    if payloads:
+        names = tuple(KINDS[kind] for kind in payloads)
+        created = await store.write(names, _create, store.store, payloads, offload=True)
+    result.lines += len(lines)
+    for kind, count in created.items():
+        result.created[kind] += count
+    result.failed += len(rejected)
+    result.errors.extend(rejected[: MAX_REPORTED_ERRORS - len(result.errors)])
+
+
+@router.post(
+    "",
+    response_model=ImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_records(
+    request: Request,
+    import_id: Optional[str] = None,
+    store: AsyncStore = Depends(get_async_store),
+    user_id: Optional[str] = Depends(get_user_id),
+) -> ImportResult:
+    """Import an NDJSON stream of tagged records, committing as it is read."""
+
+    result = ImportResult(
+        lines=0, created={kind: 0 for kind in KINDS}, failed=0, errors=[], done=False
+    )
+    if import_id is not None:
+        _track((user_id, import_id), result)
+    chunk: List[Tuple[int, Optional[bytes]]] = []
+    number = 0
+    async for line in _lines(request.stream()):
+        number += 1
+        if line is not None and not line.strip():
+            continue
+        chunk.append((number, line))
+        if len(chunk) >= CHUNK_LINES:
+            await _flush(store, chunk, result)
+            chunk = []
+    await _flush(store, chunk, result)
+    result.done = True
+    return result
+
+
+@router.get("/{import_id}", response_model=ImportResult)
+async def get_import(
+    import_id: str, user_id: Optional[str] = Depends(get_user_id)
+) -> ImportResult:
+    """Progress of a running or recently finished import started with ``import_id``."""
+
+    with _progress_lock:
+        result = _progress.get((user_id, import_id))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return result
@@ -0,0 +1,58 @@
+"""Keyset (cursor) pagination helpers shared by the list routes.
+
+A cursor is an opaque, URL-safe token encoding the ``(time_key, id)`` of the
+last row on a page. Passing it back as ``cursor`` resumes the scan from that
+position in the store's time index, so deep pages cost the same as the first.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(key: Any, item_id: int) -> str:
+    """Encode a ``(time_key, id)`` position as an opaque cursor token."""
+
+    # Raw SQLite rows already hold the key in its ISO form.
+    text = key if isinstance(key, str) else key.isoformat()
+    raw = json.dumps([text, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: Optional[str], parse_key: Callable[[str], Any]
+) -> Optional[Tuple[Any, int]]:
+    """Decode a cursor token, raising a 400 error if it is malformed."""
+
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return parse_key(key), int(item_id)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def set_next_cursor(
+    response: Response, page: Sequence[Any], limit: int, time_key: str
+) -> None:
+    """Expose the cursor for the following page when this page is full.
+
+    ``page`` holds API models, or field dicts from a ``raw=True`` listing.
+    """
+
+    if limit and len(page) == limit:
+        last = page[-1]
+        if isinstance(last, dict):
+            key, item_id = last[time_key], last["id"]
+        else:
+            key, item_id = getattr(last, time_key), last.id
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key, item_id)
@@ -0,0 +1,78 @@
+"""Bounded LRU cache for rendered responses, keyed by store write versions.
+
+Callers put the ``write_version()`` of every collection a response reads into
+its key. A write bumps that version, so later lookups use a new key and the
+stale entry is never served again; it simply ages out of the LRU order.
+Caches are kept per store instance, so swapping the store (as the tests do)
+never serves another store's data.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, TypeVar
+from weakref import WeakKeyDictionary
+
+T = TypeVar("T")
+
+
+class ResponseCache:
+    """Thread-safe LRU mapping with hit, miss and eviction counters."""
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Return the value cached under ``key``, building and storing it on a miss.
+
+        ``build`` runs outside the lock; if two requests miss at once both
+        build, and the second value wins.
+        """
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            self._misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+class StoreCaches:
+    """One ``ResponseCache`` per store, dropped with the store."""
+
+    def __init__(self, max_size: int = 256) -> None:
+        self.max_size = max_size
+        self._lock = Lock()
+        self._caches: "WeakKeyDictionary[Any, ResponseCache]" = WeakKeyDictionary()
+
+    def for_store(self, store: Any) -> ResponseCache:
+        with self._lock:
+            cache = self._caches.get(store)
+            if cache is None:
+                cache = self._caches[store] = ResponseCache(self.max_size)
+            return cache
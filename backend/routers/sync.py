@@ -0,0 +1,76 @@
+"""Delta sync: everything that changed since a client last synced.
+
+``GET /sync?since=<version>&instance=<instance id>`` returns the records
+created or updated and the ids deleted after store version ``since``, across
+every resource::
+
+    {"version": 812, "instance_id": "5be0c7d41f2a9e36", "full": false,
+     "changes": {"tasks": [...], "events": [...], "homework": [...],
+                 "time-entries": [...]},
+     "deleted": {"tasks": [4], "events": [], ...}}
+
+Clients keep ``version`` and ``instance_id`` and send them back next time.
+Without ``since``, without ``instance`` or with another instance's id (the
+store was reset or the server restarted, and its versions started over), or
+with a ``since`` older than the store's write log reaches (see
+``backend.store.sync_log``), the answer is a full snapshot: ``full`` is
+true, ``changes`` holds every record and the client should drop whatever it
+had. The versions are the same ones ``GET /changes/stream`` reports, so a
+client can sync and then follow the stream.
+
+Only the in-memory stores, which keep a write log, serve this route.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+
+from backend.dependencies import get_store
+from backend.routers.exports import RESOURCES
+from backend.store.memory_store import InMemoryStore
+
+router = APIRouter(tags=["Sync"])
+
+# Serializes datetimes, dates and the rest exactly as the API models do.
+_BODY = TypeAdapter(Dict[str, Any])
+
+
+@router.get("/sync")
+def get_sync(
+    since: Optional[int] = Query(default=None, ge=0),
+    instance: Optional[str] = Query(default=None),
+    store: InMemoryStore = Depends(get_store),
+) -> Response:
+    """Return the records changed and the ids deleted since version ``since``."""
+
+    if not isinstance(store, InMemoryStore):
+        raise HTTPException(status_code=404, detail="Store keeps no write log")
+    # Read before the snapshot: if a reset comes in between, the client holds
+    # the old id with the new data, and its next sync is a full one.
+    instance_id = store.instance_id
+    # A version only means something together with the instance that issued it.
+    if since is None or instance != instance_id:
+        snapshot, changes = store.snapshot(), None
+    else:
+        snapshot, changes = store.changes_since(since)
+
+    if changes is None:
+        changed = {
+            resource: [record._asdict() for record in getattr(snapshot, name).ordered()]
+            for resource, name in RESOURCES.items()
+        }
+        deleted: Dict[str, Any] = {resource: [] for resource in RESOURCES}
+    else:
+        changed = {resource: changes[name][0] for resource, name in RESOURCES.items()}
+        deleted = {resource: changes[name][1] for resource, name in RESOURCES.items()}
+    body = {
+        "version": snapshot.version,
+        "instance_id": instance_id,
+        "full": changes is None,
+        "changes": changed,
+        "deleted": deleted,
+    }
+    return Response(_BODY.dump_json(body), media_type="application/json")
@@ -5,12 +5,17 @@ from __future__ import annotations
 # pylint: disable=too-many-arguments,too-many-positional-arguments
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
-from backend.dependencies import get_store
-from backend.models.data_models import TaskCreate, TaskRead, TaskUpdate
+from backend.dependencies import get_async_store, use_fast_json
+from backend.models.data_models import BatchResult, TaskCreate, TaskRead, TaskUpdate
+from backend.routers.batch import MODE_PATTERN, create_batch
+from backend.routers.conditional import read_with_etag
+from backend.routers.fast_json import json_response
+from backend.routers.pagination import decode_cursor, set_next_cursor
+from backend.store.async_store import AsyncStore
 from backend.store.memory_store import InMemoryStore
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
@@ -18,82 +23,121 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
 DEFAULT_LIMIT = 100
 
 @router.get("/", response_model=List[TaskRead])
-def list_tasks(
+async def list_tasks(
+    request: Request,
+    response: Response,
     completed: Optional[bool] = None,
     due_before: Optional[datetime] = None,
     due_after: Optional[datetime] = None,
     limit: int = Query(default=DEFAULT_LIMIT, ge=0, le=1000),
     offset: int = Query(default=0, ge=0),
-    store: InMemoryStore = Depends(get_store),
+    cursor: Optional[str] = None,
+    store: AsyncStore = Depends(get_async_store),
+    fast_json: bool = Depends(use_fast_json),
 ) -> List[TaskRead]:
-    """List tasks with optional filters."""
-
-    return store.list_tasks(
-        completed=completed,
-        due_before=due_before,
-        due_after=due_after,
-        limit=limit,
-        offset=offset,
-    )
+    """List tasks with optional filters.
+
+    Offset paging is kept for compatibility; for deep pages pass the previous
+    response's ``X-Next-Cursor`` header back as ``cursor``.
+    """
+
+    def _page(sync: InMemoryStore) -> Any:
+        return sync.list_tasks(
+            completed=completed,
+            due_before=due_before,
+            due_after=due_after,
+            limit=limit,
+            offset=offset,
+            after=decode_cursor(cursor, datetime.fromisoformat),
+            raw=fast_json,
+        )
+
+    tasks = await read_with_etag(request, response, store, "tasks", _page)
+    if isinstance(tasks, Response):
+        return tasks
+    set_next_cursor(response, tasks, limit, "due_date")
+    if fast_json:
+        return json_response(response, tasks)
+    return tasks
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     payload: TaskCreate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> TaskRead:
     """Create a task."""
 
-    return store.create_task(payload)
+    return await store.create_task(payload)
+
+
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_tasks_batch(
+    request: Request,
+    mode: str = Query(default="atomic", pattern=MODE_PATTERN),
+    store: AsyncStore = Depends(get_async_store),
+) -> BatchResult:
+    """Create tasks from a JSON array of create payloads; see ``batch``."""
+
+    return await create_batch(request, store, "tasks", TaskCreate, mode)
 
 
 @router.get("/{task_id}", response_model=TaskRead)
-def get_task(
+async def get_task(
     task_id: int,
-    store: InMemoryStore = Depends(get_store),
+    request: Request,
+    response: Response,
+    store: AsyncStore = Depends(get_async_store),
 ) -> TaskRead:
     """Fetch a single task by id."""
 
-    task = store.get_task(task_id)
+    task = await read_with_etag(
+        request,
+        response,
+        store,
+        "tasks",
+        lambda sync: sync.get_task(task_id),
+        record_id=task_id,
+    )
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
 
 @router.patch("/{task_id}", response_model=TaskRead)
-def update_task(
+async def update_task(
     task_id: int,
     payload: TaskUpdate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> TaskRead:
     """Partially update a task by id."""
 
-    updated = store.update_task(task_id, payload)
+    updated = await store.update_task(task_id, payload)
     if updated is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return updated
 
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> dict:
     """Delete a task by id."""
 
-    deleted = store.delete_task(task_id)
+    deleted = await store.delete_task(task_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"deleted": True}
 
 
 @router.patch("/{task_id}/complete", response_model=TaskRead)
-def complete_task(
+async def complete_task(
     task_id: int,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> TaskRead:
     """Mark a task completed."""
 
-    updated = store.update_task(task_id, TaskUpdate(completed=True))
+    updated = await store.update_task(task_id, TaskUpdate(completed=True))
     if updated is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return updated
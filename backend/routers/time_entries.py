@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
-# pylint: disable=too-many-arguments,too-many-positional-arguments,duplicate-code
-
-from datetime import datetime
-from typing import List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-
-from backend.dependencies import get_store
-from backend.models.data_models import TimeEntryCreate, TimeEntryRead, TimeEntryUpdate
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+
+from datetime import date, datetime
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from backend.dependencies import get_async_store, get_store, use_fast_json
+from backend.models.data_models import (
+    BatchResult,
+    TimeEntryAnalytics,
+    TimeEntryCreate,
+    TimeEntryRead,
+    TimeEntryRollup,
+    TimeEntryUpdate,
+)
+from backend.routers.batch import MODE_PATTERN, create_batch
+from backend.routers.conditional import read_with_etag
+from backend.routers.fast_json import json_response
+from backend.routers.pagination import decode_cursor, set_next_cursor
+from backend.store.async_store import AsyncStore
 from backend.store.memory_store import InMemoryStore
 
 router = APIRouter(prefix="/time-entries", tags=["Time Entries"])
@@ -19,58 +31,157 @@ DEFAULT_LIMIT = 100
 
 
 @router.get("/", response_model=List[TimeEntryRead])
-def list_time_entries(
+async def list_time_entries(
+    request: Request,
+    response: Response,
     type_: Optional[str] = Query(default=None, alias="type"),
     start_after: Optional[datetime] = None,
     start_before: Optional[datetime] = None,
+    overlaps_start: Optional[datetime] = None,
+    overlaps_end: Optional[datetime] = None,
     limit: int = Query(default=DEFAULT_LIMIT, ge=0, le=1000),
     offset: int = Query(default=0, ge=0),
-    store: InMemoryStore = Depends(get_store),
+    cursor: Optional[str] = None,
+    store: AsyncStore = Depends(get_async_store),
+    fast_json: bool = Depends(use_fast_json),
 ) -> List[TimeEntryRead]:
-    """List time entries with optional filters."""
-
-    return store.list_time_entries(
-        type_=type_,
-        start_after=start_after,
-        start_before=start_before,
-        limit=limit,
-        offset=offset,
-    )
+    """List time entries with optional filters.
+
+    ``overlaps_start``/``overlaps_end`` keep only time entries that intersect that
+    window (``start_time < overlaps_end`` and ``end_time > overlaps_start``);
+    either side may be omitted.
+
+    Offset paging is kept for compatibility; for deep pages pass the previous
+    response's ``X-Next-Cursor`` header back as ``cursor``.
+    """
+
+    def _page(sync: InMemoryStore) -> Any:
+        return sync.list_time_entries(
+            type_=type_,
+            start_after=start_after,
+            start_before=start_before,
+            overlaps_start=overlaps_start,
+            overlaps_end=overlaps_end,
+            limit=limit,
+            offset=offset,
+            after=decode_cursor(cursor, datetime.fromisoformat),
+            raw=fast_json,
+        )
+
+    entries = await read_with_etag(request, response, store, "time_entries", _page)
+    if isinstance(entries, Response):
+        return entries
+    set_next_cursor(response, entries, limit, "start_time")
+    if fast_json:
+        return json_response(response, entries)
+    return entries
 
 
 @router.post("/", response_model=TimeEntryRead, status_code=status.HTTP_201_CREATED)
-def create_time_entry(
+async def create_time_entry(
     payload: TimeEntryCreate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> TimeEntryRead:
     """Create a time entry."""
 
-    return store.create_time_entry(payload)
+    return await store.create_time_entry(payload)
+
+
+@router.post("/batch", response_model=BatchResult, status_code=status.HTTP_201_CREATED)
+async def create_time_entries_batch(
+    request: Request,
+    mode: str = Query(default="atomic", pattern=MODE_PATTERN),
+    store: AsyncStore = Depends(get_async_store),
+) -> BatchResult:
+    """Create time entries from a JSON array of create payloads; see ``batch``."""
+
+    return await create_batch(request, store, "time_entries", TimeEntryCreate, mode)
+
+
+@router.get("/analytics", response_model=TimeEntryAnalytics)
+def get_time_entry_analytics(
+    type_: Optional[str] = Query(default=None, alias="type"),
+    start_after: Optional[datetime] = None,
+    start_before: Optional[datetime] = None,
+    bin_minutes: int = Query(default=15, ge=1, le=1440),
+    max_minutes: int = Query(default=480, ge=1, le=10080),
+    store: InMemoryStore = Depends(get_store),
+) -> TimeEntryAnalytics:
+    """Summarize time entries: minutes per type, per hour of day, and durations.
+
+    Filters match ``GET /time-entries/``. Durations are grouped into
+    ``bin_minutes``-wide bins, with one final bin for everything lasting
+    ``max_minutes`` or more.
+    """
+
+    frame = store.time_entry_frame().filtered(
+        type_=type_, start_after=start_after, start_before=start_before
+    )
+    return TimeEntryAnalytics(
+        entries=len(frame),
+        total_minutes_by_type=frame.total_minutes_by_type(),
+        hour_of_day_minutes=frame.hour_of_day_minutes(),
+        duration_bin_minutes=bin_minutes,
+        duration_histogram=frame.duration_histogram(bin_minutes, max_minutes),
+    )
+
+
+@router.get("/rollups", response_model=List[TimeEntryRollup])
+def get_time_entry_rollups(
+    period: str = Query(default="week", pattern="^(day|week|month)$"),
+    type_: Optional[str] = Query(default=None, alias="type"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    store: InMemoryStore = Depends(get_store),
+) -> List[TimeEntryRollup]:
+    """Minutes tracked per type for each day, ISO week (from Monday) or month.
+
+    Entries crossing midnight are split between the days they cover. Only
+    periods whose first day lies within ``[start, end]`` are returned.
+    """
+
+    return [
+        TimeEntryRollup(
+            type=type_name, period_start=first_day, minutes=seconds / 60, entries=entries
+        )
+        for type_name, first_day, seconds, entries in store.time_entry_rollups(
+            period, type_=type_, start=start, end=end
+        )
+    ]
 
 
 @router.get("/{entry_id}", response_model=TimeEntryRead)
-def get_time_entry(
+async def get_time_entry(
     entry_id: int,
-    store: InMemoryStore = Depends(get_store),
+    request: Request,
+    response: Response,
+    store: AsyncStore = Depends(get_async_store),
 ) -> TimeEntryRead:
     """Fetch a time entry by id."""
 
-    entry = store.get_time_entry(entry_id)
+    entry = await read_with_etag(
+        request,
+        response,
+        store,
+        "time_entries",
+        lambda sync: sync.get_time_entry(entry_id),
+        record_id=entry_id,
+    )
     if entry is None:
         raise HTTPException(status_code=404, detail="Time entry not found")
     return entry
 
 
 @router.patch("/{entry_id}", response_model=TimeEntryRead)
-def update_time_entry(
+async def update_time_entry(
     entry_id: int,
     payload: TimeEntryUpdate,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> TimeEntryRead:
     """Partially update a time entry by id."""
 
     try:
-        updated = store.update_time_entry(entry_id, payload)
+        updated = await store.update_time_entry(entry_id, payload)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     if updated is None:
@@ -79,13 +190,13 @@ def update_time_entry(
 
 
 @router.delete("/{entry_id}")
-def delete_time_entry(
+async def delete_time_entry(
     entry_id: int,
-    store: InMemoryStore = Depends(get_store),
+    store: AsyncStore = Depends(get_async_store),
 ) -> dict:
     """Delete a time entry by id."""
 
-    deleted = store.delete_time_entry(entry_id)
+    deleted = await store.delete_time_entry(entry_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Time entry not found")
     return {"deleted": True}
@@ -0,0 +1,149 @@
+"""Awaitable facade over the synchronous stores.
+
+``AsyncStore`` lets ``async def`` routes use a store without Starlette
+running every request in its threadpool. Each store class says which of its
+operations may block the thread: ``BLOCKING_READS`` and ``BLOCKING_WRITES``.
+Operations that cannot block (reads of the in-memory stores, which only walk
+an immutable snapshot, and writes of the plain ``InMemoryStore``) run inline
+on the event loop; the others (SQLite queries, ``DurableStore``'s fsyncs) are
+sent to the threadpool.
+
+Writes that touch many records (``create_many()``, imports) always run in
+the threadpool, and on the in-memory store they hold a per-collection
+``asyncio.Lock`` while they do. Inline writes to that collection queue on
+the lock as cheap coroutines, so they never block the loop waiting for the
+store's own lock held by a pool thread.
+
+Every public ``list_*``, ``get_*``, ``create_*``, ``update_*`` and
+``delete_*`` method of the store, plus ``write_version()``,
+``record_version()`` and ``snapshot()``, is available as a coroutine with
+the same arguments.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence
+from weakref import WeakKeyDictionary
+
+from fastapi.concurrency import run_in_threadpool
+
+# Singular names used in the store's method names, and their collections.
+_COLLECTIONS = {
+    "task": "tasks",
+    "event": "events",
+    "homework": "homework",
+    "time_entry": "time_entries",
+}
+_WRITES = {
+    f"{verb}_{kind}": name
+    for kind, name in _COLLECTIONS.items()
+    for verb in ("create", "update", "delete")
+}
+_READS = frozenset(
+    [f"get_{kind}" for kind in _COLLECTIONS]
+    + [f"list_{name}" for name in _COLLECTIONS.values()]
+    + ["write_version", "record_version", "snapshot"]
+)
+
+
+# Write locks per store, then per event loop (asyncio locks belong to one
+# loop, and tests run several).
+_LOCKS: "WeakKeyDictionary[Any, WeakKeyDictionary[Any, Dict[str, asyncio.Lock]]]"
+_LOCKS = WeakKeyDictionary()
+
+
+class AsyncStore:
+    """Coroutine versions of a store's methods; see the module docstring.
+
+    Facades are cheap and may be built per request: all facades of one store
+    share its write locks.
+    """
+
+    def __init__(self, store: Any) -> None:
+        self.store = store
+        self._blocking_reads: bool = store.BLOCKING_READS
+        self._blocking_writes: bool = store.BLOCKING_WRITES
+
+    @property
+    def instance_id(self) -> str:
+        """The store's ``instance_id``; reading it never blocks."""
+
+        return self.store.instance_id
+
+    def _locks_of(self, names: Sequence[str]) -> List[asyncio.Lock]:
+        loops = _LOCKS.setdefault(self.store, WeakKeyDictionary())
+        locks = loops.setdefault(asyncio.get_running_loop(), {})
+        return [locks.get(name) or locks.setdefault(name, asyncio.Lock()) for name in names]
+
+    @asynccontextmanager
+    async def writing(self, names: Sequence[str]) -> AsyncIterator[None]:
+        """Hold the write locks of collections ``names``, taken in sorted order."""
+
+        async with AsyncExitStack() as stack:
+            for lock in self._locks_of(sorted(set(names))):
+                await stack.enter_async_context(lock)
+            yield
+
+    async def read(
+        self, fn: Callable[..., Any], *args: Any, offload: bool = False, **kwargs: Any
+    ) -> Any:
+        """Call ``fn(*args, **kwargs)``, in the threadpool if the store's reads block.
+
+        A route that makes several store calls (a version, then the data it
+        describes) can make them all in one ``fn`` and so cost at most one
+        trip to the threadpool.
+        """
+
+        if offload or self._blocking_reads:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def write(
+        self,
+        names: Sequence[str],
+        fn: Callable[..., Any],
+        *args: Any,
+        offload: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """Call ``fn(*args, **kwargs)``, a write to collections ``names``.
+
+        On stores whose writes block it simply runs in the threadpool: the
+        store's own locks order it, and ``DurableStore`` needs concurrent
+        writers to batch their fsyncs. Otherwise it runs inline, or in the
+        threadpool under the write locks of ``names`` if ``offload`` is set.
+        """
+
+        if self._blocking_writes:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        if not offload and not any(lock.locked() for lock in self._locks_of(names)):
+            # Nothing else runs on the loop before a call that never awaits returns.
+            return fn(*args, **kwargs)
+        async with self.writing(names):
+            if offload:
+                return await run_in_threadpool(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+
+    async def create_many(self, name: str, payloads: Sequence[Any]) -> Any:
+        """Bulk-create ``payloads`` in collection ``name``, always off the loop."""
+
+        return await self.write((name,), self.store.create_many, name, payloads, offload=True)
+
+    def __getattr__(self, attr: str) -> Callable[..., Any]:
+        if attr in _WRITES:
+            names = (_WRITES[attr],)
+
+            async def write(*args: Any, **kwargs: Any) -> Any:
+                return await self.write(names, getattr(self.store, attr), *args, **kwargs)
+
+            return write
+        if attr in _READS:
+
+            async def read(*args: Any, **kwargs: Any) -> Any:
+                return await self.read(getattr(self.store, attr), *args, **kwargs)
+
+            return read
+        raise AttributeError(attr)
+
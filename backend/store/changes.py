@@ -0,0 +1,255 @@
+"""Feed of committed writes, for pushing changes to clients as they happen.
+
+The in-memory store stages every create, update and delete on its
+``ChangeFeed`` while the write is being applied, and commits them when the
+new collection version is published (discarding them if the write fails),
+so subscribers only ever see writes readers can already observe, in the
+order their versions were published.
+
+Each change gets a sequence number, which counts every change the feed has
+committed. The last ``history`` changes are kept in a ring buffer so a
+client that reconnects can resume after the last number it saw. A client
+that fell further behind, or whose number comes from another feed (a
+restarted process), is told to start over with a ``reset`` change.
+
+Subscribers live on an event loop. Each has its own queue of at most
+``queue_size`` undelivered changes; a subscriber that lets it fill up is
+shed (``Subscription.shed``) rather than slowing writers or growing without
+bound, and can resume from the ring buffer like any other reconnect.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import uuid
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+HISTORY = 4096
+QUEUE_SIZE = 1024
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+# Everything may have changed (reset(), a snapshot attached, or a resume
+# point the feed no longer has): subscribers should reload from scratch.
+RESET = "reset"
+
+
+class Change:
+    """One committed write: ``op`` on record ``record_id`` of collection ``name``.
+
+    ``version`` is the store version that published it (the collection's
+    ``write_version()`` right after the write) and ``record`` the API model
+    written, or ``None`` for deletes and resets.
+    """
+
+    __slots__ = ("seq", "op", "name", "record_id", "version", "record", "_json")
+
+    def __init__(
+        self,
+        seq: int,
+        op: str,
+        name: Optional[str],
+        record_id: Optional[int],
+        version: int,
+        record: Optional[Any],
+    ) -> None:
+        self.seq = seq
+        self.op = op
+        self.name = name
+        self.record_id = record_id
+        self.version = version
+        self.record = record
+        self._json: Optional[bytes] = None
+
+    def record_json(self) -> bytes:
+        """The record as JSON (``null`` without one), serialized once for all readers."""
+
+        if self._json is None:
+            record = self.record
+            self._json = b"null" if record is None else record.model_dump_json().encode()
+        return self._json
+
+
+class Subscription:
+    """Changes waiting for one subscriber; read them with ``next_batch()``."""
+
+    def __init__(self, feed: "ChangeFeed", loop: asyncio.AbstractEventLoop) -> None:
+        self.feed = feed
+        self.loop = loop
+        # Sequence number of the last change queued; later deliveries of
+        # changes up to it (already replayed from history) are skipped.
+        self.last_seq = 0
+        self.shed = False
+        self._pending: Deque[Change] = deque()
+        self._ready = asyncio.Event()
+
+    def _deliver(self, changes: Sequence[Change]) -> None:
+        if self.shed:
+            return
+        fresh = [change for change in changes if change.seq > self.last_seq]
+        if not fresh:
+            return
+        if len(self._pending) + len(fresh) > self.feed.queue_size:
+            self.shed = True
+            self._pending.clear()
+            self.feed.unsubscribe(self)
+        else:
+            self._pending.extend(fresh)
+            self.last_seq = fresh[-1].seq
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Change]:
+        """Wait for and return the queued changes, oldest first.
+
+        Returns an empty list after ``timeout`` seconds without changes, or
+        once the subscriber has been shed.
+        """
+
+        if not self._pending and not self.shed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        batch = list(self._pending)
+        self._pending.clear()
+        return batch
+
+
+class ChangeFeed:
+    """Staged and committed changes of one store; see the module docstring.
+
+    ``stage()`` and ``discard()`` for a collection must be called under that
+    collection's write lock, and ``commit()`` and ``commit_reset()`` under
+    the lock that orders the store's published versions.
+    """
+
+    def __init__(self, history: int = HISTORY, queue_size: int = QUEUE_SIZE) -> None:
+        # Identifies this feed in resume points, which mean nothing to another.
+        self.feed_id = uuid.uuid4().hex[:8]
+        self.queue_size = min(queue_size, history)
+        self._lock = Lock()
+        self._history: Deque[Change] = deque(maxlen=history)
+        self._last_seq = 0
+        # Per collection: changes of the write in progress (only as many as
+        # the history could hold) and how many were staged in all.
+        self._staged: Dict[str, Deque[Any]] = {}
+        self._staged_counts: Dict[str, int] = {}
+        self._loops: Dict[asyncio.AbstractEventLoop, Set[Subscription]] = {}
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the last committed change (0 before any)."""
+
+        return self._last_seq
+
+    def stage(self, name: str, op: str, record_id: int, record: Optional[Any]) -> None:
+        staged = self._staged.get(name)
+        if staged is None:
+            staged = self._staged[name] = deque(maxlen=self._history.maxlen)
+        staged.append((op, record_id, record))
+        self._staged_counts[name] = self._staged_counts.get(name, 0) + 1
+
+    def discard(self, name: str) -> None:
+        staged = self._staged.get(name)
+        if staged:
+            staged.clear()
+        self._staged_counts[name] = 0
+
+    def commit(self, name: str, version: int) -> None:
+        """Publish the changes staged for ``name`` as written at ``version``."""
+
+        count = self._staged_counts.get(name, 0)
+        if not count:
+            return
+        staged = self._staged[name]
+        with self._lock:
+            # A batch larger than the history only keeps its tail, numbered as
+            # if all of it had been kept.
+            first = self._last_seq + count - len(staged) + 1
+            changes = [
+                Change(first + offset, op, name, record_id, version, record)
+                for offset, (op, record_id, record) in enumerate(staged)
+            ]
+            self._last_seq += count
+            self._publish(changes, count)
+        staged.clear()
+        self._staged_counts[name] = 0
+
+    def commit_reset(self, version: int) -> None:
+        """Publish a ``reset``: all data was replaced at ``version``."""
+
+        with self._lock:
+            self._last_seq += 1
+            self._publish([Change(self._last_seq, RESET, None, None, version, None)], 1)
+
+    def _publish(self, changes: List[Change], count: int) -> None:
+        self._history.extend(changes)
+        if count > self.queue_size:
+            # Every subscriber would overflow; shed them all with one change
+            # they cannot queue.
+            changes = changes[-self.queue_size - 1 :]
+        closed = []
+        for loop, subscribers in self._loops.items():
+            try:
+                loop.call_soon_threadsafe(_fan_out, tuple(subscribers), changes)
+            except RuntimeError:
+                # The loop was closed under its subscribers; nobody is reading.
+                closed.append(loop)
+        for loop in closed:
+            del self._loops[loop]
+
+    def subscribe(self, after: Optional[str] = None) -> Tuple[Subscription, List[Change]]:
+        """Register a subscriber on the running loop.
+
+        ``after`` is a resume point from ``resume_point()``. Returns the new
+        subscription and the changes it missed since then, or a single
+        ``reset`` change if the feed cannot tell which ones those were.
+        """
+
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            seq = self._resumed_seq(after)
+            if seq is None:
+                backlog = [Change(self._last_seq, RESET, None, None, 0, None)]
+            else:
+                backlog = [change for change in self._history if change.seq > seq]
+            subscription.last_seq = self._last_seq
+            self._loops.setdefault(subscription.loop, set()).add(subscription)
+        return subscription, backlog
+
+    def _resumed_seq(self, after: Optional[str]) -> Optional[int]:
+        if after is None:
+            return self._last_seq
+        feed_id, _, seq = after.partition("-")
+        if feed_id != self.feed_id or not seq.isdigit() or int(seq) > self._last_seq:
+            return None
+        oldest = self._history[0].seq if self._history else self._last_seq + 1
+        return int(seq) if int(seq) >= oldest - 1 else None
+
+    def resume_point(self, seq: int) -> str:
+        """Opaque resume point for a subscriber that has seen changes up to ``seq``."""
+
+        return f"{self.feed_id}-{seq}"
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._loops.get(subscription.loop)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._loops[subscription.loop]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._loops.values())
+
+
+def _fan_out(subscribers: Sequence[Subscription], changes: Sequence[Change]) -> None:
+    for subscription in subscribers:
+        subscription._deliver(changes)  # pylint: disable=protected-access
@@ -0,0 +1,244 @@
+"""Columnar NumPy mirror of time entries for analytics.
+
+``TimeEntryColumns`` keeps one growable array per field: ``int64`` start and
+end times in epoch seconds, an ``int32`` code into the table of entry types
+and an ``int32`` index into the table of distinct notes (``-1`` for none).
+The in-memory store creates the mirror on the first analytics request and
+then updates it on every time entry write, so reports never walk Python
+objects.
+
+Reports run on a ``TimeEntryFrame``: a copy of the live columns taken under
+the mirror's lock, so a report over millions of entries only holds up writers
+for the copy itself. As with ``sort_key()``, naive datetimes are read as UTC,
+so their hour of day is the hour as written.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+HOURS = 24
+
+_DAY = 86_400
+_HOUR = 3_600
+_SECOND = timedelta(seconds=1)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Whole seconds since the epoch; like ``sort_key()``, naive values count as UTC."""
+
+    epoch = _NAIVE_EPOCH if value.tzinfo is None else _UTC_EPOCH
+    return (value - epoch) // _SECOND
+
+
+class TimeEntryColumns:
+    """Growable, id-addressable columns mirroring the time entry collection.
+
+    Rows are kept dense: removing an entry moves the last row into its slot.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._lock = Lock()
+        self._size = 0
+        self._ids = np.empty(capacity, np.int64)
+        self._start = np.empty(capacity, np.int64)
+        self._end = np.empty(capacity, np.int64)
+        self._type = np.empty(capacity, np.int32)
+        self._note = np.empty(capacity, np.int32)
+        self._rows: Dict[int, int] = {}
+        self._type_codes: Dict[str, int] = {}
+        self._note_codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> "TimeEntryColumns":
+        """Build the columns for ``records`` (store records or API models)."""
+
+        columns = cls()
+        type_code = columns._type_codes.setdefault
+        note_code = columns._note_codes.setdefault
+        ids: List[int] = []
+        starts: List[int] = []
+        ends: List[int] = []
+        types: List[int] = []
+        notes: List[int] = []
+        for record in records:
+            ids.append(record.id)
+            starts.append(epoch_seconds(record.start_time))
+            ends.append(epoch_seconds(record.end_time))
+            types.append(type_code(record.type, len(columns._type_codes)))
+            note = record.note
+            notes.append(-1 if note is None else note_code(note, len(columns._note_codes)))
+
+        columns._size = len(ids)
+        columns._ids = np.array(ids, np.int64)
+        columns._start = np.array(starts, np.int64)
+        columns._end = np.array(ends, np.int64)
+        columns._type = np.array(types, np.int32)
+        columns._note = np.array(notes, np.int32)
+        columns._rows = {record_id: row for row, record_id in enumerate(ids)}
+        return columns
+
+    def _code(self, codes: Dict[str, int], value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def _grow(self) -> None:
+        capacity = max(2 * len(self._ids), 1024)
+        for attr in ("_ids", "_start", "_end", "_type", "_note"):
+            old = getattr(self, attr)
+            new = np.empty(capacity, old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, attr, new)
+
+    def put(self, record: Any) -> None:
+        """Insert ``record`` or overwrite the row holding its id."""
+
+        with self._lock:
+            row = self._rows.get(record.id)
+            if row is None:
+                if self._size == len(self._ids):
+                    self._grow()
+                row = self._rows[record.id] = self._size
+                self._size += 1
+            self._ids[row] = record.id
+            self._start[row] = epoch_seconds(record.start_time)
+            self._end[row] = epoch_seconds(record.end_time)
+            self._type[row] = self._code(self._type_codes, record.type)
+            self._note[row] = self._code(self._note_codes, record.note)
+
+    def remove(self, record_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(record_id, None)
+            if row is None:
+                return
+            last = self._size - 1
+            if row != last:
+                for column in (self._ids, self._start, self._end, self._type, self._note):
+                    column[row] = column[last]
+                self._rows[int(self._ids[row])] = row
+            self._size = last
+
+    def frame(self) -> "TimeEntryFrame":
+        """Return a consistent copy of the current columns."""
+
+        with self._lock:
+            size = self._size
+            return TimeEntryFrame(
+                start=self._start[:size].copy(),
+                end=self._end[:size].copy(),
+                type_code=self._type[:size].copy(),
+                note=self._note[:size].copy(),
+                types=tuple(self._type_codes),
+                notes=tuple(self._note_codes),
+            )
+
+
+@dataclass(frozen=True)
+class TimeEntryFrame:
+    """Immutable columns of a set of time entries, with vectorized reports."""
+
+    start: np.ndarray
+    end: np.ndarray
+    type_code: np.ndarray
+    note: np.ndarray
+    types: Tuple[str, ...]
+    notes: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def filtered(
+        self,
+        *,
+        type_: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        start_before: Optional[datetime] = None,
+    ) -> "TimeEntryFrame":
+        """Return the entries matching the same filters as ``list_time_entries``."""
+
+        mask = np.ones(len(self), bool)
+        if type_ is not None:
+            if type_ not in self.types:
+                mask[:] = False
+            else:
+                mask &= self.type_code == self.types.index(type_)
+        if start_after is not None:
+            mask &= self.start >= epoch_seconds(start_after)
+        if start_before is not None:
+            mask &= self.start <= epoch_seconds(start_before)
+        if mask.all():
+            return self
+        return TimeEntryFrame(
+            start=self.start[mask],
+            end=self.end[mask],
+            type_code=self.type_code[mask],
+            note=self.note[mask],
+            types=self.types,
+            notes=self.notes,
+        )
+
+    def _present(self) -> List[Tuple[int, str]]:
+        """``(code, type)`` for every type with at least one entry in the frame."""
+
+        counts = np.bincount(self.type_code, minlength=len(self.types))
+        return [(code, name) for code, name in enumerate(self.types) if counts[code]]
+
+    def total_minutes_by_type(self) -> Dict[str, float]:
+        minutes = (self.end - self.start) / 60
+        totals = np.bincount(self.type_code, weights=minutes, minlength=len(self.types))
+        return {name: float(totals[code]) for code, name in self._present()}
+
+    def _hour_profile(self, times: np.ndarray) -> np.ndarray:
+        """Per type and hour of day, total seconds of ``[epoch, t)`` in that hour.
+
+        Every whole day before ``t`` contributes a full hour to each hour of
+        the day; within ``t``'s own day, hours before ``t``'s hour are full,
+        its own hour is partial and later hours are untouched.
+        """
+
+        days, into_day = np.divmod(times, _DAY)
+        hour, into_hour = np.divmod(into_day, _HOUR)
+        slot = self.type_code.astype(np.int64) * HOURS + hour
+        size = len(self.types) * HOURS
+        counts = np.bincount(slot, minlength=size).reshape(-1, HOURS)
+        partial = np.bincount(slot, weights=into_hour, minlength=size).reshape(-1, HOURS)
+        at_or_after = counts[:, ::-1].cumsum(axis=1)[:, ::-1]
+        whole_days = np.bincount(self.type_code, weights=days, minlength=len(self.types))
+        return (at_or_after - counts) * _HOUR + partial + whole_days[:, None] * _HOUR
+
+    def hour_of_day_minutes(self) -> Dict[str, List[float]]:
+        """Minutes spent in each hour of the day (0-23), per type.
+
+        Entries are split across every hour they overlap, including entries
+        that run past midnight or for several days.
+        """
+
+        totals = (self._hour_profile(self.end) - self._hour_profile(self.start)) / 60
+        return {name: totals[code].tolist() for code, name in self._present()}
+
+    def duration_histogram(self, bin_minutes: int, max_minutes: int) -> List[int]:
+        """Count entries per ``bin_minutes``-wide duration bin.
+
+        The last bin counts every entry lasting ``max_minutes`` or longer.
+        """
+
+        bins = max(max_minutes // bin_minutes, 1)
+        durations = (self.end - self.start) // 60
+        index = np.minimum(durations // bin_minutes, bins)
+        return np.bincount(index, minlength=bins + 1).tolist()
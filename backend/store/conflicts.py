@@ -0,0 +1,42 @@
+"""Sweep-line detection of overlapping events.
+
+Events are swept in start order while tracking the latest end seen so far in
+the current group. An event that starts before that end overlaps some event
+already in the group (the one ending last), so it joins it; otherwise the
+group is closed and a new one starts. Each closed group with two or more
+events is a set of mutually chained double-bookings. Sorting dominates, so a
+sweep over ``n`` events costs ``O(n log n)`` (``O(n)`` when they arrive
+sorted, as store listings do).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, List
+
+from backend.store.indexes import sort_key
+
+
+def conflict_groups(events: Iterable[Any]) -> List[List[Any]]:
+    """Group ``events`` (anything with ``start_time``/``end_time``) that overlap.
+
+    Intervals are half-open, so an event ending exactly when another starts is
+    not a conflict. Groups are returned in start order, each sorted by
+    ``(start_time, id)``; events that overlap nothing are left out.
+    """
+
+    ordered = sorted(events, key=lambda event: (sort_key(event.start_time), event.id))
+    groups: List[List[Any]] = []
+    group: List[Any] = []
+    group_end = 0
+    for event in ordered:
+        start, end = sort_key(event.start_time), sort_key(event.end_time)
+        if group and start < group_end:
+            group.append(event)
+            group_end = max(group_end, end)
+            continue
+        if len(group) > 1:
+            groups.append(group)
+        group, group_end = [event], end
+    if len(group) > 1:
+        groups.append(group)
+    return groups
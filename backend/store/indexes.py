@@ -0,0 +1,515 @@
+"""Copy-on-write index structures used by the in-memory store.
+
+The store keeps every collection sorted by its time key so that list queries
+can bisect straight to the requested window instead of scanning and sorting the
+whole collection on every call.
+
+Both structures here are split into small chunks so they can be versioned
+cheaply: ``copy()`` only duplicates the top-level chunk table, and a chunk is
+duplicated the first time the copy writes to it. Writers edit a copy and then
+publish it, while readers keep using the version they already hold without
+taking a lock.
+
+A ``ChunkedMap`` may also sit on top of a read-only *base* mapping (such as a
+memory-mapped snapshot); the chunks then only hold records written since the
+base was taken, plus tombstones for base records that were deleted.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring,protected-access
+
+from bisect import bisect_left, insort
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_Entry = Tuple[Any, int]
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MISSING = object()
+_TOMBSTONE = object()
+
+DEFAULT_LOAD = 256
+CHUNK_BITS = 10
+
+
+def sort_key(value: Any) -> int:
+    """Map a datetime/date to an integer that sorts like the value itself.
+
+    Naive datetimes are treated as UTC so that they keep their wall-clock order.
+    """
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        delta = value - _EPOCH
+        return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    if isinstance(value, date):
+        return value.toordinal()
+    raise TypeError(f"unsupported sort value: {value!r}")
+
+
+class SortedIndex:
+    """Sorted ``(key, id)`` pairs stored in bounded buckets.
+
+    Entries live in a list of buckets that are each kept sorted and hold at most
+    ``2 * load`` pairs, with ``_maxes`` tracking the last entry of every bucket.
+    Inserts and removals therefore only shift one small bucket, and range scans
+    bisect to the first matching entry and walk forward lazily, so a caller that
+    stops early pays for the rows it consumes rather than for the collection.
+
+    An index must not be modified once it has been handed to readers; writers
+    call ``copy()`` and modify the copy instead.
+    """
+
+    def __init__(self, load: int = DEFAULT_LOAD) -> None:
+        self._load = load
+        self._buckets: List[List[_Entry]] = []
+        self._maxes: List[_Entry] = []
+        self._len = 0
+        # ids of the buckets this instance created and may therefore mutate.
+        self._owned: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self._len
+
+    @classmethod
+    def from_entries(
+        cls, entries: List[_Entry], load: int = DEFAULT_LOAD
+    ) -> "SortedIndex":
+        """Build an index from ``(key, id)`` pairs with one sort."""
+
+        index = cls(load)
+        entries.sort()
+        index._buckets = [
+            index._own(entries[i : i + load]) for i in range(0, len(entries), load)
+        ]
+        index._maxes = [bucket[-1] for bucket in index._buckets]
+        index._len = len(entries)
+        return index
+
+    def copy(self) -> "SortedIndex":
+        """Return a writable copy that shares all buckets with this index."""
+
+        clone = self.__class__(self._load)
+        clone._buckets = list(self._buckets)
+        clone._maxes = list(self._maxes)
+        clone._len = self._len
+        return clone
+
+    def _own(self, bucket: List[_Entry]) -> List[_Entry]:
+        self._owned.add(id(bucket))
+        return bucket
+
+    def _writable(self, pos: int) -> List[_Entry]:
+        bucket = self._buckets[pos]
+        if id(bucket) not in self._owned:
+            bucket = self._buckets[pos] = self._own(list(bucket))
+        return bucket
+
+    def add(self, key: Any, item_id: int) -> None:
+        """Insert ``item_id`` under ``key``."""
+
+        self._insert((key, item_id))
+
+    def _insert(self, entry: Tuple[Any, ...]) -> int:
+        """Insert ``entry`` and return the position of the bucket it went into.
+
+        If that bucket had to be split, the two halves are at the returned
+        position and the one after it.
+        """
+
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append(self._own([entry]))
+            self._maxes.append(entry)
+            return 0
+
+        pos = bisect_left(self._maxes, entry)
+        if pos == len(self._maxes):
+            # Appending past the current maximum is the common case for ids and
+            # timestamps that arrive in order, so skip the inner bisect.
+            pos -= 1
+            bucket = self._writable(pos)
+            bucket.append(entry)
+            self._maxes[pos] = entry
+        else:
+            bucket = self._writable(pos)
+            insort(bucket, entry)
+
+        if len(bucket) > 2 * self._load:
+            half = len(bucket) // 2
+            low, high = self._own(bucket[:half]), self._own(bucket[half:])
+            self._owned.discard(id(bucket))
+            self._buckets[pos : pos + 1] = [low, high]
+            self._maxes[pos : pos + 1] = [low[-1], high[-1]]
+        return pos
+
+    def remove(self, key: Any, item_id: int) -> bool:
+        """Remove ``item_id`` stored under ``key``; return whether it was present."""
+
+        return self._discard((key, item_id)) is not None
+
+    def _discard(self, entry: Tuple[Any, ...]) -> Optional[int]:
+        """Remove ``entry``; return the position of its bucket, or ``None``.
+
+        An emptied bucket is dropped, so the returned position may then hold
+        the following bucket (or be past the end).
+        """
+
+        pos = bisect_left(self._maxes, entry)
+        if pos == len(self._maxes):
+            return None
+        idx = bisect_left(self._buckets[pos], entry)
+        if idx == len(self._buckets[pos]) or self._buckets[pos][idx] != entry:
+            return None
+
+        bucket = self._writable(pos)
+        del bucket[idx]
+        self._len -= 1
+        if not bucket:
+            self._owned.discard(id(bucket))
+            del self._buckets[pos]
+            del self._maxes[pos]
+        elif idx == len(bucket):
+            self._maxes[pos] = bucket[-1]
+        return pos
+
+    def irange(
+        self,
+        lower: Optional[Any] = None,
+        upper: Optional[Any] = None,
+        *,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> Iterator[_Entry]:
+        """Yield entries whose key lies in ``[lower, upper]``, in ``(key, id)`` order.
+
+        Either bound may be ``None`` to leave that side of the range open.
+        ``after`` resumes a previous scan strictly after that ``(key, id)``
+        entry, which is how keyset pagination continues without re-walking
+        earlier pages.
+        """
+
+        if after is not None and (lower is None or after[0] >= lower):
+            # Ids are integers, so the first entry past ``after`` is the first
+            # one at or above ``(key, id + 1)``, however long the entries are.
+            probe: Optional[Tuple[Any, ...]] = (after[0], after[1] + 1)
+        elif lower is not None:
+            probe = (lower,)
+        else:
+            probe = None
+
+        if probe is None:
+            pos, idx = 0, 0
+        else:
+            pos = bisect_left(self._maxes, probe)
+            if pos == len(self._maxes):
+                return
+            idx = bisect_left(self._buckets[pos], probe)
+
+        for bucket in self._buckets[pos:]:
+            for entry in bucket[idx:] if idx else bucket:
+                if upper is not None and entry[0] > upper:
+                    return
+                yield entry
+            idx = 0
+
+
+NO_END = -(2**63)
+
+
+def build_max_tree(values: List[int]) -> Tuple[List[int], int]:
+    """Build a max segment tree over ``values``; return ``(tree, leaves)``.
+
+    ``tree[1]`` is the root, node ``i`` has children ``2i`` and ``2i + 1`` and
+    leaf ``j`` is ``tree[leaves + j]``. Padding leaves hold ``NO_END``.
+    """
+
+    leaves = 1
+    while leaves < len(values):
+        leaves *= 2
+    tree = [NO_END] * (2 * leaves)
+    tree[leaves : leaves + len(values)] = values
+    for node in range(leaves - 1, 0, -1):
+        left, right = tree[2 * node], tree[2 * node + 1]
+        tree[node] = left if left > right else right
+    return tree, leaves
+
+
+def max_tree_leaves(
+    tree: Any, leaves: int, first: int, last: int, threshold: Optional[int]
+) -> Iterator[int]:
+    """Yield, in order, the leaves in ``[first, last]`` whose value exceeds ``threshold``.
+
+    Subtrees whose maximum is at most ``threshold`` are skipped whole, so
+    finding ``k`` leaves costs ``O((k + 1) log leaves)``. A ``None`` threshold
+    yields every leaf in range.
+    """
+
+    if threshold is None:
+        yield from range(first, last + 1)
+        return
+    stack = [(1, 0, leaves)]
+    while stack:
+        node, low, high = stack.pop()
+        if high <= first or low > last or tree[node] <= threshold:
+            continue
+        if high - low == 1:
+            yield low
+            continue
+        mid = (low + high) // 2
+        stack.append((2 * node + 1, mid, high))
+        stack.append((2 * node, low, mid))
+
+
+class IntervalIndex(SortedIndex):
+    """``SortedIndex`` of intervals that also answers overlap queries.
+
+    Entries are ``(start_key, id, end_key)``, both keys being ``sort_key()``
+    values, so intervals with naive and aware times order together.
+    Besides the buckets' last entries, the index tracks the largest end of
+    every bucket in a max segment tree. An overlap query bisects to the last
+    bucket that can start before the window closes and then descends only
+    into subtrees holding an interval that ends after the window opens, so it
+    costs ``O(log n + k)`` bucket visits for ``k`` matching buckets.
+    """
+
+    def __init__(self, load: int = DEFAULT_LOAD) -> None:
+        super().__init__(load)
+        self._max_ends: List[int] = []
+        self._tree, self._leaves = build_max_tree([])
+        self._tree_owned = True
+
+    @classmethod
+    def from_entries(
+        cls, entries: List[_Entry], load: int = DEFAULT_LOAD
+    ) -> "IntervalIndex":
+        index = super().from_entries(entries, load)
+        index._max_ends = [max(e[2] for e in bucket) for bucket in index._buckets]
+        index._rebuild_tree()
+        return index
+
+    def copy(self) -> "IntervalIndex":
+        clone = super().copy()
+        clone._max_ends = list(self._max_ends)
+        clone._tree, clone._leaves = self._tree, self._leaves
+        clone._tree_owned = False
+        return clone
+
+    def _rebuild_tree(self) -> None:
+        self._tree, self._leaves = build_max_tree(self._max_ends)
+        self._tree_owned = True
+
+    def _set_max_end(self, pos: int, value: int) -> None:
+        self._max_ends[pos] = value
+        if not self._tree_owned:
+            self._tree = list(self._tree)
+            self._tree_owned = True
+        tree = self._tree
+        node = self._leaves + pos
+        tree[node] = value
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if left > right else right
+            node //= 2
+
+    # pylint: disable-next=arguments-differ
+    def add(self, key: int, item_id: int, end_key: int) -> None:
+        """Insert the interval ``[key, end_key)`` for ``item_id``."""
+
+        buckets = len(self._buckets)
+        pos = self._insert((key, item_id, end_key))
+        if len(self._buckets) == buckets:
+            if end_key > self._max_ends[pos]:
+                self._set_max_end(pos, end_key)
+            return
+        # A new bucket (first insert or a split): refresh the affected maxima.
+        replaced = 1 if buckets else 0
+        self._max_ends[pos : pos + replaced] = [
+            max(e[2] for e in self._buckets[i]) for i in range(pos, pos + replaced + 1)
+        ]
+        self._rebuild_tree()
+
+    # pylint: disable-next=arguments-differ
+    def remove(self, key: int, item_id: int, end_key: int) -> bool:
+        """Remove the interval stored for ``item_id``; return whether it was present."""
+
+        buckets = len(self._buckets)
+        pos = self._discard((key, item_id, end_key))
+        if pos is None:
+            return False
+        if len(self._buckets) < buckets:
+            del self._max_ends[pos]
+            self._rebuild_tree()
+        elif end_key == self._max_ends[pos]:
+            self._set_max_end(pos, max(e[2] for e in self._buckets[pos]))
+        return True
+
+    def overlapping(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        *,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[_Entry]:
+        """Yield entries with ``start < high`` and ``end > low``, in ``(start, id)`` order.
+
+        Bounds are ``sort_key()`` values; either may be ``None``. ``after`` resumes strictly after that
+        ``(start, id)`` entry, as in ``irange()``.
+        """
+
+        if not self._buckets:
+            return
+        if after is not None:
+            after = (after[0], after[1])
+        last = len(self._buckets) - 1
+        if high is not None:
+            last = min(bisect_left(self._maxes, (high,)), last)
+        first = 0 if after is None else bisect_left(self._maxes, after)
+        for pos in max_tree_leaves(self._tree, self._leaves, first, last, low):
+            for entry in self._buckets[pos]:
+                if high is not None and entry[0] >= high:
+                    return
+                if after is not None and (entry[0], entry[1]) <= after:
+                    continue
+                if low is None or entry[2] > low:
+                    yield entry
+
+
+class ChunkedMap:
+    """Integer-keyed mapping stored as chunks of ``2 ** CHUNK_BITS`` ids.
+
+    Store ids are allocated sequentially, so chunks stay dense and a copy only
+    has to duplicate the small chunk table. Like ``SortedIndex``, a published
+    map is never modified; writers work on ``copy()``.
+
+    ``base`` is an optional read-only mapping (``get``, ``__contains__``,
+    ``__len__`` and ``items()``) consulted for keys the chunks do not hold.
+    Writes never reach it: updates shadow the base entry and deletes leave a
+    tombstone behind.
+    """
+
+    def __init__(self, base: Optional[Any] = None) -> None:
+        self._chunks: Dict[int, Dict[int, Any]] = {}
+        self._base = base
+        self._len = len(base) if base is not None else 0
+        self._owned: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self._len
+
+    @classmethod
+    def from_dict(
+        cls, items: Dict[int, Optional[Any]], base: Optional[Any] = None
+    ) -> "ChunkedMap":
+        """Build a map holding every item of ``items`` on top of ``base``.
+
+        A ``None`` value marks a key deleted from ``base``.
+        """
+
+        mapping = cls(base)
+        for key, value in items.items():
+            in_base = base is not None and key in base
+            if value is None:
+                if not in_base:
+                    continue
+                value = _TOMBSTONE
+                mapping._len -= 1
+            elif not in_base:
+                mapping._len += 1
+            chunk = mapping._chunks.get(key >> CHUNK_BITS)
+            if chunk is None:
+                chunk = mapping._chunks[key >> CHUNK_BITS] = {}
+            chunk[key] = value
+        return mapping
+
+    @property
+    def base(self) -> Optional[Any]:
+        return self._base
+
+    def _raw(self, key: int) -> Any:
+        chunk = self._chunks.get(key >> CHUNK_BITS)
+        if chunk is None:
+            return _MISSING
+        return chunk.get(key, _MISSING)
+
+    def shadows(self, key: int) -> bool:
+        """Whether ``key`` was written (or deleted) on top of the base."""
+
+        return self._raw(key) is not _MISSING
+
+    def __contains__(self, key: int) -> bool:
+        value = self._raw(key)
+        if value is _MISSING:
+            return self._base is not None and key in self._base
+        return value is not _TOMBSTONE
+
+    def copy(self) -> "ChunkedMap":
+        """Return a writable copy that shares all chunks with this map."""
+
+        clone = ChunkedMap()
+        clone._chunks = dict(self._chunks)
+        clone._base = self._base
+        clone._len = self._len
+        return clone
+
+    def get(self, key: int, default: Any = None) -> Any:
+        value = self._raw(key)
+        if value is _MISSING:
+            return default if self._base is None else self._base.get(key, default)
+        return default if value is _TOMBSTONE else value
+
+    def values(self) -> Iterator[Any]:
+        if self._base is not None:
+            for key, value in self._base.items():
+                if self._raw(key) is _MISSING:
+                    yield value
+        for chunk in self._chunks.values():
+            for value in chunk.values():
+                if value is not _TOMBSTONE:
+                    yield value
+
+    def _writable(self, chunk_key: int) -> Dict[int, Any]:
+        chunk = self._chunks.get(chunk_key)
+        if chunk is None or id(chunk) not in self._owned:
+            chunk = self._chunks[chunk_key] = dict(chunk or {})
+            self._owned.add(id(chunk))
+        return chunk
+
+    def set(self, key: int, value: Any) -> None:
+        if key not in self:
+            self._len += 1
+        self._writable(key >> CHUNK_BITS)[key] = value
+
+    def add_many(self, items: Iterable[Tuple[int, Any]]) -> None:
+        """Set keys that are neither in the map nor in its base yet.
+
+        Consecutive keys share a chunk, so runs of new ids (a batch of
+        creates) look up each chunk once instead of once per key.
+        """
+
+        chunk_key, chunk = None, {}
+        added = 0
+        for key, value in items:
+            if key >> CHUNK_BITS != chunk_key:
+                chunk_key = key >> CHUNK_BITS
+                chunk = self._writable(chunk_key)
+            chunk[key] = value
+            added += 1
+        self._len += added
+
+    def pop(self, key: int, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        value = self.get(key)
+        chunk_key = key >> CHUNK_BITS
+        chunk = self._writable(chunk_key)
+        if self._base is not None and key in self._base:
+            chunk[key] = _TOMBSTONE
+        else:
+            del chunk[key]
+            if not chunk:
+                self._owned.discard(id(chunk))
+                del self._chunks[chunk_key]
+        self._len -= 1
+        return value
@@ -0,0 +1,121 @@
+"""Bounded cache of each record's serialized JSON.
+
+Most records are read far more often than they are written, so the
+in-memory store keeps the JSON object of every record it has served on the
+fast JSON path and assembles list pages by joining those fragments.
+
+Entries are keyed by ``(collection, id)`` and remember the record's stamp
+(see ``_Collection``), so a reader on an older snapshot never gets bytes for
+a newer version of a record, or the reverse; the store also drops an entry as
+soon as its record is written. The cache holds at most ``max_bytes`` of JSON
+plus a fixed per-entry allowance and evicts the least recently used entries
+beyond that.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+# Rough size of a key, an entry tuple and the OrderedDict links.
+ENTRY_OVERHEAD = 200
+
+# Serializes datetimes, dates and the rest exactly as the API models do.
+_FIELDS = TypeAdapter(Dict[str, Any])
+
+
+class RecordJsonCache:
+    """Thread-safe LRU of ``(collection, id) -> (stamp, JSON bytes)``."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[int, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def fragments(self, name: str, records: Sequence[Any], stamps: Any) -> List[bytes]:
+        """Return the JSON object of each of ``records``, serializing the misses.
+
+        ``stamps`` maps ids to the stamps of the snapshot ``records`` come
+        from (ids it lacks have stamp 0).
+        """
+
+        entries = self._entries
+        found: List[Optional[bytes]] = []
+        missing: List[int] = []
+        with self._lock:
+            for position, record in enumerate(records):
+                entry = entries.get((name, record.id))
+                if entry is not None and entry[0] == stamps.get(record.id, 0):
+                    entries.move_to_end((name, record.id))
+                    found.append(entry[1])
+                else:
+                    found.append(None)
+                    missing.append(position)
+            self._hits += len(records) - len(missing)
+            self._misses += len(missing)
+        if not missing:
+            return found  # type: ignore[return-value]
+
+        built = []
+        for position in missing:
+            record = records[position]
+            found[position] = data = _FIELDS.dump_json(record._asdict())
+            built.append(((name, record.id), (stamps.get(record.id, 0), data)))
+        with self._lock:
+            for key, entry in built:
+                previous = entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= len(previous[1]) + ENTRY_OVERHEAD
+                entries[key] = entry
+                self._bytes += len(entry[1]) + ENTRY_OVERHEAD
+            while self._bytes > self.max_bytes and entries:
+                _, (_, data) = entries.popitem(last=False)
+                self._bytes -= len(data) + ENTRY_OVERHEAD
+                self._evictions += 1
+        return found  # type: ignore[return-value]
+
+    def discard(self, name: str, record_id: int) -> None:
+        with self._lock:
+            entry = self._entries.pop((name, record_id), None)
+            if entry is not None:
+                self._bytes -= len(entry[1]) + ENTRY_OVERHEAD
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class JsonRows(list):
+    """Records of a ``raw=True`` page, with the JSON object of each one."""
+
+    def __init__(self, records: Sequence[Any], fragments: List[bytes]) -> None:
+        super().__init__(records)
+        self.fragments = fragments
+
+    def json(self) -> bytes:
+        """The page as a JSON array, joined from the cached fragments."""
+
+        return b"[" + b",".join(self.fragments) + b"]"
@@ -2,16 +2,33 @@
 
 This is the single source of truth for Tasks, Events, Homework, and Time Entries
 while we are in the in-memory phase.
+
+Records are stored as compact tuples (``backend.store.records``); the read
+and write methods convert to and from the API's Pydantic models at the edge.
+
+Reads never take a lock. All collections live in an immutable ``StoreSnapshot``;
+writers serialize per collection, build the next version of the collection they
+change (sharing every untouched chunk with the previous version) and publish it
+by swapping in a new snapshot. A reader that grabbed the old snapshot keeps a
+consistent view of every collection for as long as it holds on to it.
+
+A collection may also be layered over a read-only base (a memory-mapped
+snapshot, see ``backend.store.snapshot``). The in-memory indexes then only
+cover records written since the base was opened, and scans merge them with
+the base's own sorted columns.
 """
 
 from __future__ import annotations
 
 # pylint: disable=missing-function-docstring,too-many-instance-attributes,too-many-public-methods,too-many-arguments
 
+import heapq
+import uuid
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
 from datetime import date, datetime
 from threading import Lock
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 from backend.models.data_models import (
     EventCreate,
@@ -27,14 +44,28 @@ from backend.models.data_models import (
     TimeEntryRead,
     TimeEntryUpdate,
 )
+from backend.store.changes import CREATE, DELETE, UPDATE, ChangeFeed
+from backend.store.columns import TimeEntryColumns, TimeEntryFrame
+from backend.store.indexes import ChunkedMap, IntervalIndex, SortedIndex, sort_key
+from backend.store.json_cache import JsonRows, RecordJsonCache
+from backend.store.records import (
+    READ_MODELS,
+    check_time_order,
+    from_model,
+    patched,
+    read_models,
+    to_model,
+)
+from backend.store.rollups import Rollup, TimeEntryRollups
+from backend.store.sync_log import SyncLog, changed_since
 
 
-def _paginate(items: List, limit: int, offset: int) -> List:
-    """Return a paginated slice of a list."""
+def _optional_key(value: Optional[Any]) -> Optional[int]:
+    return None if value is None else sort_key(value)
 
-    offset = max(offset, 0)
-    limit = max(limit, 0)
-    return items[offset : offset + limit]
+
+# insert_many() rebuilds indexes once a batch is at least 1/8 of the collection.
+BULK_INDEX_RATIO = 8
 
 
 @dataclass(frozen=True)
@@ -42,28 +73,368 @@ class _IdSequence:
     start: int = 1
 
 
-class InMemoryStore:
-    """In-memory repository for all domain resources."""
+class _Collection:
+    """Records of one resource type plus the indexes kept in sync with them.
 
-    def __init__(self) -> None:
-        self._lock = Lock()
-        self._task_id_seq = _IdSequence()
-        self._event_id_seq = _IdSequence()
-        self._homework_id_seq = _IdSequence()
-        self._time_entry_id_seq = _IdSequence()
-        self.reset()
+    ``by_time`` orders every record by ``(time_key, id)``, with the time as its
+    ``sort_key()`` so naive and aware values order together; for collections
+    with an ``end_key`` it is an ``IntervalIndex`` that also answers overlap
+    queries on ``[time_key, end_key)``. Each field named in
+    ``indexed_fields`` additionally gets a hash index from field value to a
+    time-ordered index of just the matching ids, so equality filters only visit
+    rows that can match.
 
-    def reset(self) -> None:
-        """Reset all resources (intended for tests/dev)."""
-        with self._lock:
-            self._next_task_id = self._task_id_seq.start
-            self._next_event_id = self._event_id_seq.start
-            self._next_homework_id = self._homework_id_seq.start
-            self._next_time_entry_id = self._time_entry_id_seq.start
-            self._tasks_by_id: Dict[int, TaskRead] = {}
-            self._events_by_id: Dict[int, EventRead] = {}
-            self._homework_by_id: Dict[int, HomeworkRead] = {}
-            self._time_entries_by_id: Dict[int, TimeEntryRead] = {}
+    A collection reachable from a published snapshot is read-only; writers call
+    ``edit()`` and mutate the returned copy.
+
+    ``base`` is an optional ``SnapshotCollection`` holding records that are
+    not in the indexes above; ``by_id`` falls back to it and scans merge it in.
+
+    ``version`` is the store version at which the collection was last
+    written; the first ``StoreSnapshot`` that publishes it stamps it.
+    ``stamps`` maps each id written since the collection was built to a
+    per-collection counter value taken at its last write (other records
+    count as stamp 0), giving every record its own version.
+    """
+
+    def __init__(
+        self,
+        time_key: str,
+        indexed_fields: Tuple[str, ...] = (),
+        base: Optional[Any] = None,
+        end_key: Optional[str] = None,
+    ) -> None:
+        self.time_key = time_key
+        self.end_key = end_key
+        self.base = base
+        self.by_id = ChunkedMap(base)
+        self.by_time: SortedIndex = IntervalIndex() if end_key else SortedIndex()
+        self.by_field: Dict[str, Dict[Any, SortedIndex]] = {
+            field: {} for field in indexed_fields
+        }
+        self._owned_partitions: Set[int] = set()
+        self.version = -1
+        self.stamps = ChunkedMap()
+        self.next_stamp = 1
+
+    def rebuilt(
+        self, records: Dict[int, Optional[Any]], base: Optional[Any] = None
+    ) -> "_Collection":
+        """Return a collection like this one holding ``records`` over ``base``.
+
+        A ``None`` value deletes that id from ``base``. Indexes are built with
+        one sort per index instead of one insert per record, which is what
+        bulk loads and recovery want.
+        """
+
+        clone = _Collection(self.time_key, tuple(self.by_field), base, self.end_key)
+        clone.by_id = ChunkedMap.from_dict(records, base)
+        clone.index_bulk([record for record in records.values() if record is not None])
+        return clone
+
+    def edit(self) -> "_Collection":
+        """Return a writable copy that shares structure with this collection."""
+
+        clone = _Collection(self.time_key, base=self.base, end_key=self.end_key)
+        clone.by_id = self.by_id.copy()
+        clone.stamps = self.stamps.copy()
+        clone.next_stamp = self.next_stamp
+        clone.by_time = self.by_time.copy()
+        clone.by_field = {
+            field: dict(partitions) for field, partitions in self.by_field.items()
+        }
+        return clone
+
+    def _partition(self, field: str, value: Any) -> SortedIndex:
+        partitions = self.by_field[field]
+        partition = partitions.get(value)
+        if partition is not None and id(partition) in self._owned_partitions:
+            return partition
+        partition = partition.copy() if partition is not None else SortedIndex()
+        partitions[value] = partition
+        self._owned_partitions.add(id(partition))
+        return partition
+
+    def _time_entry(self, record: Any) -> Tuple[int, ...]:
+        key = sort_key(getattr(record, self.time_key))
+        if self.end_key:
+            return (key, record.id, sort_key(getattr(record, self.end_key)))
+        return (key, record.id)
+
+    def index_bulk(self, records: Sequence[Any]) -> None:
+        """Add ``records`` to the indexes with one sort per index touched.
+
+        Each index is rebuilt from its current entries plus the new ones, so
+        this only pays off when ``records`` is not much smaller than the index.
+        """
+
+        self.by_time = self.by_time.from_entries(
+            list(self.by_time.irange()) + [self._time_entry(record) for record in records]
+        )
+        time_key = self.time_key
+        for field, partitions in self.by_field.items():
+            groups: Dict[Any, List[Tuple[Any, int]]] = {}
+            for record in records:
+                groups.setdefault(getattr(record, field), []).append(
+                    (sort_key(getattr(record, time_key)), record.id)
+                )
+            for value, entries in groups.items():
+                partition = partitions.get(value)
+                if partition is not None:
+                    entries.extend(partition.irange())
+                partition = partitions[value] = SortedIndex.from_entries(entries)
+                self._owned_partitions.add(id(partition))
+
+    def _index(self, record: Any) -> None:
+        key = sort_key(getattr(record, self.time_key))
+        if self.end_key:
+            self.by_time.add(key, record.id, sort_key(getattr(record, self.end_key)))
+        else:
+            self.by_time.add(key, record.id)
+        for field in self.by_field:
+            self._partition(field, getattr(record, field)).add(key, record.id)
+
+    def _unindex(self, record: Any) -> None:
+        key = sort_key(getattr(record, self.time_key))
+        if self.end_key:
+            self.by_time.remove(key, record.id, sort_key(getattr(record, self.end_key)))
+        else:
+            self.by_time.remove(key, record.id)
+        for field, partitions in self.by_field.items():
+            value = getattr(record, field)
+            partition = self._partition(field, value)
+            partition.remove(key, record.id)
+            if not partition:
+                self._owned_partitions.discard(id(partition))
+                del partitions[value]
+
+    def _stamp(self, record_id: int) -> None:
+        self.stamps.set(record_id, self.next_stamp)
+        self.next_stamp += 1
+
+    def insert(self, record: Any) -> None:
+        self.by_id.set(record.id, record)
+        self._index(record)
+        self._stamp(record.id)
+
+    def insert_many(self, records: Sequence[Any]) -> None:
+        """Insert ``records``, none of whose ids are in the collection yet.
+
+        Small batches are indexed one record at a time; once a batch is at
+        least ``1 / BULK_INDEX_RATIO`` of the collection, re-sorting each
+        index once is cheaper than that many bisect-and-insert steps.
+        """
+
+        self.by_id.add_many((record.id, record) for record in records)
+        first_stamp = self.next_stamp
+        self.stamps.add_many(
+            (record.id, first_stamp + offset) for offset, record in enumerate(records)
+        )
+        self.next_stamp += len(records)
+        if len(records) * BULK_INDEX_RATIO < len(self.by_time):
+            for record in records:
+                self._index(record)
+        else:
+            self.index_bulk(records)
+
+    def replace(self, record: Any) -> None:
+        self._stamp(record.id)
+        if not self.by_id.shadows(record.id):
+            # The old version only lives in the base, which has no index entry
+            # to move; the new version joins the in-memory indexes.
+            self.by_id.set(record.id, record)
+            self._index(record)
+            return
+        existing = self.by_id.get(record.id)
+        keys = (self.time_key, self.end_key) if self.end_key else (self.time_key,)
+        changed = any(
+            getattr(existing, field) != getattr(record, field)
+            for field in (*keys, *self.by_field)
+        )
+        if changed:
+            self._unindex(existing)
+            self._index(record)
+        self.by_id.set(record.id, record)
+
+    def remove(self, record_id: int) -> bool:
+        indexed = self.by_id.shadows(record_id)
+        existing = self.by_id.pop(record_id)
+        if existing is None:
+            return False
+        self.stamps.pop(record_id)
+        if indexed:
+            self._unindex(existing)
+        return True
+
+    def ordered(self) -> Iterator[Any]:
+        """Yield every record in ``(time_key, id)`` order."""
+
+        base = None if self.base is None else self.base.entries(None, None)
+        return self._walk(self.by_time.irange(), base)
+
+    def _walk(
+        self, entries: Iterator[Any], base_entries: Optional[Iterator[Any]]
+    ) -> Iterator[Any]:
+        """Yield the records of index ``entries`` merged with ``base_entries``.
+
+        ``base_entries`` are the base's ``(key, id, position)`` rows in the
+        same order; rows whose id was rewritten or deleted since are skipped.
+        """
+
+        by_id = self.by_id
+        if base_entries is None:
+            for entry in entries:
+                yield by_id.get(entry[1])
+            return
+
+        overlay = ((entry[0], entry[1], -1) for entry in entries)
+        base = (entry for entry in base_entries if not by_id.shadows(entry[1]))
+        for _, record_id, pos in heapq.merge(overlay, base):
+            yield by_id.get(record_id) if pos < 0 else self.base.record(pos)
+
+    def scan(
+        self,
+        *,
+        lower: Optional[Any],
+        upper: Optional[Any],
+        match: Dict[str, Any],
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[Any, int]] = None,
+        overlaps: Optional[Tuple[Optional[Any], Optional[Any]]] = None,
+    ) -> List[Any]:
+        """Return one page of records ordered by ``(time_key, id)``.
+
+        ``match`` maps field names to required values; ``None`` values are
+        ignored. The scan walks the time index from ``lower`` (or from just past
+        the ``after`` keyset cursor) and stops as soon as ``offset + limit``
+        matching rows have been seen.
+
+        ``overlaps`` is a ``(start, end)`` window (either side may be ``None``)
+        that keeps only records with ``time_key < end`` and ``end_key > start``.
+        It is answered by the interval index, so only records overlapping the
+        window are visited.
+        """
+
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        page: List[Any] = []
+        if limit == 0:
+            return page
+        filters = [(field, value) for field, value in match.items() if value is not None]
+        base = self.base
+        # Indexes hold sort keys, so bounds are compared as sort keys too.
+        lower, upper = _optional_key(lower), _optional_key(upper)
+        after = None if after is None else (sort_key(after[0]), after[1])
+
+        if overlaps is not None:
+            low, high = _optional_key(overlaps[0]), _optional_key(overlaps[1])
+            entries = self.by_time.overlapping(low, high, after=after)
+            base_entries = None
+            if base is not None:
+                base_entries = base.overlapping(low, high, after=after)
+            time_key = self.time_key
+            records = (
+                record
+                for record in self._walk(entries, base_entries)
+                if (lower is None or sort_key(getattr(record, time_key)) >= lower)
+                and (upper is None or sort_key(getattr(record, time_key)) <= upper)
+            )
+        else:
+            # Walk the smallest index that already satisfies one of the filters.
+            index, positions, indexed_field = self.by_time, None, None
+            size = len(index) + (len(base) if base is not None else 0)
+            for field, value in filters:
+                if field not in self.by_field:
+                    continue
+                partition = self.by_field[field].get(value) or SortedIndex()
+                base_rows = base.partition(field, value) if base is not None else ()
+                if not partition and not base_rows:
+                    return page
+                if len(partition) + len(base_rows) < size:
+                    index, positions, indexed_field = partition, base_rows, field
+                    size = len(partition) + len(base_rows)
+            filters = [(field, value) for field, value in filters if field != indexed_field]
+            base_entries = None
+            if base is not None:
+                base_entries = base.entries(lower, upper, after=after, positions=positions)
+            records = self._walk(index.irange(lower, upper, after=after), base_entries)
+
+        for record in records:
+            if any(getattr(record, field) != value for field, value in filters):
+                continue
+            if offset:
+                offset -= 1
+                continue
+            page.append(record)
+            if len(page) == limit:
+                break
+        return page
+
+
+class _StoreReads:
+    """Read methods shared by the live store and its snapshots.
+
+    The ``list_*`` methods take ``raw=True`` to skip building API models, for
+    callers that serialize the page straight to JSON: they then return each
+    record's fields as a plain dict or, when the store keeps a
+    ``RecordJsonCache``, a ``JsonRows`` of records with their cached JSON.
+    """
+
+    _json_cache: Optional[RecordJsonCache] = None
+
+    def _view(self) -> "StoreSnapshot":
+        raise NotImplementedError
+
+    def _get(self, name: str, record_id: int) -> Optional[Any]:
+        record = getattr(self._view(), name).by_id.get(record_id)
+        return None if record is None else to_model(name, record)
+
+    def _scan(self, name: str, raw: bool = False, **query: Any) -> List[Any]:
+        collection = getattr(self._view(), name)
+        records = collection.scan(**query)
+        if raw and self._json_cache is not None:
+            return JsonRows(
+                records, self._json_cache.fragments(name, records, collection.stamps)
+            )
+        if raw:
+            return [record._asdict() for record in records]
+        return [to_model(name, record) for record in records]
+
+    def export_records(self, names: Sequence[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(name, fields)`` for every record of each collection in ``names``.
+
+        Records come from the snapshot current when this is called, in
+        ``(time_key, id)`` order, as plain field dicts: no API model is built,
+        and nothing is materialized beyond the record being yielded.
+        """
+
+        view = self._view()
+        return (
+            (name, record._asdict()) for name in names for record in getattr(view, name).ordered()
+        )
+
+    def write_version(self, name: str) -> int:
+        """Version of the last write to collection ``name``.
+
+        It changes on every create, update or delete in that collection (and
+        on ``reset()``) and never repeats, so it can key caches of anything
+        derived from the collection.
+        """
+
+        return getattr(self._view(), name).version
+
+    def record_version(self, name: str, record_id: int) -> Optional[int]:
+        """Version of record ``record_id`` in ``name``, or ``None`` if it does not exist.
+
+        Together with ``InMemoryStore.instance_id`` it changes whenever the
+        record does.
+        """
+
+        collection = getattr(self._view(), name)
+        if record_id not in collection.by_id:
+            return None
+        return collection.stamps.get(record_id, 0)
 
     # ---- Tasks ----
     def list_tasks(
@@ -74,39 +445,22 @@ class InMemoryStore:
         due_after: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
     ) -> List[TaskRead]:
-        tasks = list(self._tasks_by_id.values())
-        if completed is not None:
-            tasks = [t for t in tasks if t.completed == completed]
-        if due_before is not None:
-            tasks = [t for t in tasks if t.due_date <= due_before]
-        if due_after is not None:
-            tasks = [t for t in tasks if t.due_date >= due_after]
-        tasks.sort(key=lambda t: (t.due_date, t.id))
-        return _paginate(tasks, limit=limit, offset=offset)
+        return self._scan(
+            "tasks",
+            lower=due_after,
+            upper=due_before,
+            match={"completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+        )
 
     def get_task(self, task_id: int) -> Optional[TaskRead]:
-        return self._tasks_by_id.get(task_id)
-
-    def create_task(self, payload: TaskCreate) -> TaskRead:
-        with self._lock:
-            task = TaskRead(id=self._next_task_id, **payload.model_dump())
-            self._tasks_by_id[task.id] = task
-            self._next_task_id += 1
-            return task
-
-    def update_task(self, task_id: int, payload: TaskUpdate) -> Optional[TaskRead]:
-        with self._lock:
-            existing = self._tasks_by_id.get(task_id)
-            if existing is None:
-                return None
-            updated = existing.model_copy(update=payload.model_dump(exclude_unset=True))
-            self._tasks_by_id[task_id] = updated
-            return updated
-
-    def delete_task(self, task_id: int) -> bool:
-        with self._lock:
-            return self._tasks_by_id.pop(task_id, None) is not None
+        return self._get("tasks", task_id)
 
     # ---- Events ----
     def list_events(
@@ -116,45 +470,30 @@ class InMemoryStore:
         completed: Optional[bool] = None,
         start_after: Optional[datetime] = None,
         start_before: Optional[datetime] = None,
+        overlaps_start: Optional[datetime] = None,
+        overlaps_end: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
     ) -> List[EventRead]:
-        events = list(self._events_by_id.values())
-        if type_ is not None:
-            events = [e for e in events if e.type == type_]
-        if completed is not None:
-            events = [e for e in events if e.completed == completed]
-        if start_after is not None:
-            events = [e for e in events if e.start_time >= start_after]
-        if start_before is not None:
-            events = [e for e in events if e.start_time <= start_before]
-        events.sort(key=lambda e: (e.start_time, e.id))
-        return _paginate(events, limit=limit, offset=offset)
+        overlaps = None
+        if overlaps_start is not None or overlaps_end is not None:
+            overlaps = (overlaps_start, overlaps_end)
+        return self._scan(
+            "events",
+            lower=start_after,
+            upper=start_before,
+            match={"type": type_, "completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+            overlaps=overlaps,
+        )
 
     def get_event(self, event_id: int) -> Optional[EventRead]:
-        return self._events_by_id.get(event_id)
-
-    def create_event(self, payload: EventCreate) -> EventRead:
-        with self._lock:
-            event = EventRead(id=self._next_event_id, **payload.model_dump())
-            self._events_by_id[event.id] = event
-            self._next_event_id += 1
-            return event
-
-    def update_event(self, event_id: int, payload: EventUpdate) -> Optional[EventRead]:
-        with self._lock:
-            existing = self._events_by_id.get(event_id)
-            if existing is None:
-                return None
-            updated = existing.model_copy(update=payload.model_dump(exclude_unset=True))
-            if updated.end_time <= updated.start_time:
-                raise ValueError("end_time must be after start_time")
-            self._events_by_id[event_id] = updated
-            return updated
-
-    def delete_event(self, event_id: int) -> bool:
-        with self._lock:
-            return self._events_by_id.pop(event_id, None) is not None
+        return self._get("events", event_id)
 
     # ---- Homework ----
     def list_homework(
@@ -166,43 +505,22 @@ class InMemoryStore:
         completed: Optional[bool] = None,
         limit: int = 100,
         offset: int = 0,
+        after: Optional[Tuple[date, int]] = None,
+        raw: bool = False,
     ) -> List[HomeworkRead]:
-        items = list(self._homework_by_id.values())
-        if course is not None:
-            items = [h for h in items if h.course == course]
-        if completed is not None:
-            items = [h for h in items if h.completed == completed]
-        if due_before is not None:
-            items = [h for h in items if h.due_date <= due_before]
-        if due_after is not None:
-            items = [h for h in items if h.due_date >= due_after]
-        items.sort(key=lambda h: (h.due_date, h.id))
-        return _paginate(items, limit=limit, offset=offset)
+        return self._scan(
+            "homework",
+            lower=due_after,
+            upper=due_before,
+            match={"course": course, "completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+        )
 
     def get_homework(self, homework_id: int) -> Optional[HomeworkRead]:
-        return self._homework_by_id.get(homework_id)
-
-    def create_homework(self, payload: HomeworkCreate) -> HomeworkRead:
-        with self._lock:
-            hw = HomeworkRead(id=self._next_homework_id, **payload.model_dump())
-            self._homework_by_id[hw.id] = hw
-            self._next_homework_id += 1
-            return hw
-
-    def update_homework(
-        self, homework_id: int, payload: HomeworkUpdate
-    ) -> Optional[HomeworkRead]:
-        with self._lock:
-            existing = self._homework_by_id.get(homework_id)
-            if existing is None:
-                return None
-            updated = existing.model_copy(update=payload.model_dump(exclude_unset=True))
-            self._homework_by_id[homework_id] = updated
-            return updated
-
-    def delete_homework(self, homework_id: int) -> bool:
-        with self._lock:
-            return self._homework_by_id.pop(homework_id, None) is not None
+        return self._get("homework", homework_id)
 
     # ---- Time Entries ----
     def list_time_entries(
@@ -211,42 +529,498 @@ class InMemoryStore:
         type_: Optional[str] = None,
         start_after: Optional[datetime] = None,
         start_before: Optional[datetime] = None,
+        overlaps_start: Optional[datetime] = None,
+        overlaps_end: Optional[datetime] = None,
         limit: int = 100,
         offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
     ) -> List[TimeEntryRead]:
-        entries = list(self._time_entries_by_id.values())
-        if type_ is not None:
-            entries = [e for e in entries if e.type == type_]
-        if start_after is not None:
-            entries = [e for e in entries if e.start_time >= start_after]
-        if start_before is not None:
-            entries = [e for e in entries if e.start_time <= start_before]
-        entries.sort(key=lambda e: (e.start_time, e.id))
-        return _paginate(entries, limit=limit, offset=offset)
+        overlaps = None
+        if overlaps_start is not None or overlaps_end is not None:
+            overlaps = (overlaps_start, overlaps_end)
+        return self._scan(
+            "time_entries",
+            lower=start_after,
+            upper=start_before,
+            match={"type": type_},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+            overlaps=overlaps,
+        )
 
     def get_time_entry(self, entry_id: int) -> Optional[TimeEntryRead]:
-        return self._time_entries_by_id.get(entry_id)
+        return self._get("time_entries", entry_id)
+
+
+@dataclass(frozen=True)
+class StoreSnapshot(_StoreReads):
+    """Immutable, consistent view of every collection at one store version."""
+
+    version: int
+    tasks: _Collection
+    events: _Collection
+    homework: _Collection
+    time_entries: _Collection
+
+    def __post_init__(self) -> None:
+        for collection in (self.tasks, self.events, self.homework, self.time_entries):
+            if collection.version < 0:
+                collection.version = self.version
+
+    def _view(self) -> "StoreSnapshot":
+        return self
 
+    def with_collection(self, name: str, collection: _Collection) -> "StoreSnapshot":
+        """Return the next version with ``name`` replaced by ``collection``."""
+
+        # Spelled out rather than using dataclasses.replace(), which is several
+        # times slower and sits on every write.
+        fields = {
+            "tasks": self.tasks,
+            "events": self.events,
+            "homework": self.homework,
+            "time_entries": self.time_entries,
+            name: collection,
+        }
+        return StoreSnapshot(version=self.version + 1, **fields)
+
+
+def _empty_snapshot(version: int) -> StoreSnapshot:
+    return StoreSnapshot(
+        version=version,
+        tasks=_Collection("due_date", ("completed",)),
+        events=_Collection("start_time", ("type", "completed"), end_key="end_time"),
+        homework=_Collection("due_date", ("course", "completed")),
+        time_entries=_Collection("start_time", ("type",), end_key="end_time"),
+    )
+
+
+def _patch_columns(
+    columns: TimeEntryColumns, record_id: int, _old: Optional[Any], new: Optional[Any]
+) -> None:
+    if new is None:
+        columns.remove(record_id)
+    else:
+        columns.put(new)
+
+
+def _patch_rollups(
+    rollups: TimeEntryRollups, _record_id: int, old: Optional[Any], new: Optional[Any]
+) -> None:
+    if old is not None:
+        rollups.remove(old)
+    if new is not None:
+        rollups.add(new)
+
+
+class InMemoryStore(_StoreReads):
+    """In-memory repository for all domain resources.
+
+    Each collection has its own write lock, so a burst of writes to one
+    resource never queues writes to another. Updates and deletes first take a
+    per-id stripe lock and build the replacement record there, holding the
+    collection lock only for the index edit. Publishing a new snapshot takes
+    ``_snapshot_lock`` just long enough to swap one attribute.
+
+    Locks are always acquired stripe -> collection -> snapshot, and ``reset()``
+    takes every collection lock in ``COLLECTIONS`` order.
+
+    ``instance_id`` is regenerated whenever the data is replaced wholesale
+    (``reset()``, ``attach_snapshot()``), so versions from ``write_version()``
+    and ``record_version()`` are only comparable under the same id.
+    """
+
+    COLLECTIONS = tuple(READ_MODELS)
+    LOCK_STRIPES = 16
+    JSON_CACHE_BYTES = 64 * 1024 * 1024
+    CHANGE_HISTORY = 4096
+    # Whether reads and writes may block the calling thread on I/O; see
+    # backend.store.async_store.
+    BLOCKING_READS = False
+    BLOCKING_WRITES = False
+
+    def __init__(self) -> None:
+        self._locks = {name: Lock() for name in self.COLLECTIONS}
+        self._stripes = {
+            name: tuple(Lock() for _ in range(self.LOCK_STRIPES))
+            for name in self.COLLECTIONS
+        }
+        self._snapshot_lock = Lock()
+        self._id_seqs = {name: _IdSequence() for name in self.COLLECTIONS}
+        self._snapshot = _empty_snapshot(0)
+        self._time_columns: Optional[TimeEntryColumns] = None
+        self._time_rollups: Optional[TimeEntryRollups] = None
+        # (id, old, new) time entry writes waiting to reach the mirrors above.
+        self._mirror_writes: List[Tuple[int, Optional[Any], Optional[Any]]] = []
+        self._json_cache = RecordJsonCache(self.JSON_CACHE_BYTES)
+        self._changes = ChangeFeed(self.CHANGE_HISTORY)
+        self._sync_log = SyncLog(self.COLLECTIONS)
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all resources (intended for tests/dev)."""
+        with ExitStack() as stack:
+            for name in self.COLLECTIONS:
+                stack.enter_context(self._locks[name])
+            stack.enter_context(self._snapshot_lock)
+            self._on_publish(None)
+            self._next_ids = {name: seq.start for name, seq in self._id_seqs.items()}
+            self._snapshot = _empty_snapshot(self._snapshot.version + 1)
+            self.instance_id = uuid.uuid4().hex[:16]
+            self._on_reset()
+
+    def attach_snapshot(self, source: Any) -> None:
+        """Replace all data with the records of an opened snapshot file.
+
+        ``source`` is a ``backend.store.snapshot.SnapshotFile``. Its records
+        are decoded lazily when reads reach them, and later writes are kept in
+        memory on top of it; the file must stay open while the store is used.
+        """
+
+        with ExitStack() as stack:
+            for name in self.COLLECTIONS:
+                stack.enter_context(self._locks[name])
+            stack.enter_context(self._snapshot_lock)
+            empty = _empty_snapshot(self._snapshot.version + 1)
+            self._snapshot = StoreSnapshot(
+                version=empty.version,
+                **{
+                    name: getattr(empty, name).rebuilt({}, source.collection(name))
+                    for name in self.COLLECTIONS
+                },
+            )
+            self._next_ids.update(source.next_ids)
+            self.instance_id = uuid.uuid4().hex[:16]
+            self._time_columns = None
+            self._time_rollups = None
+            self._json_cache.clear()
+            self._changes.commit_reset(self._snapshot.version)
+            self._sync_log.reset(self._snapshot.version)
+
+    def snapshot(self) -> StoreSnapshot:
+        """Return the current consistent, read-only view of the store."""
+
+        return self._snapshot
+
+    def _view(self) -> StoreSnapshot:
+        return self._snapshot
+
+    @contextmanager
+    def _editing(self, name: str) -> Iterator[_Collection]:
+        """Yield a writable copy of one collection and publish it on success.
+
+        Callers must hold the collection's lock. If the block raises, the copy
+        is discarded and readers never observe a partial write.
+        """
+
+        collection = getattr(self._snapshot, name).edit()
+        try:
+            yield collection
+            self._on_publish(name)
+        except BaseException:
+            self._changes.discard(name)
+            self._sync_log.discard(name)
+            if name == "time_entries":
+                del self._mirror_writes[:]
+            raise
+        with self._snapshot_lock:
+            if name == "time_entries" and self._mirror_writes:
+                self._patch_time_entry_mirrors()
+            self._snapshot = self._snapshot.with_collection(name, collection)
+            self._changes.commit(name, self._snapshot.version)
+            self._sync_log.commit(name, self._snapshot.version)
+
+    def time_entry_frame(self) -> TimeEntryFrame:
+        """Return a copy of the time entry columns used for analytics.
+
+        The columnar mirror is built from the collection on first use (see
+        ``_time_entry_mirror()``) and patched with each write as it is
+        published from then on.
+        """
+
+        columns = self._time_columns
+        if columns is None:
+            columns = self._time_entry_mirror(
+                "_time_columns", TimeEntryColumns.from_records, _patch_columns
+            )
+        return columns.frame()
+
+    def time_entry_rollups(
+        self,
+        period: str,
+        *,
+        type_: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Rollup]:
+        """Return ``(type, period start, seconds, entries)`` time entry totals.
+
+        ``period`` is ``"day"``, ``"week"`` or ``"month"``. The counters are
+        built from the collection on first use and adjusted as writes are
+        published from then on; see ``TimeEntryRollups.rows()`` for the filters.
+        """
+
+        rollups = self._time_rollups
+        if rollups is None:
+            rollups = self._time_entry_mirror(
+                "_time_rollups", TimeEntryRollups.from_records, _patch_rollups
+            )
+        return rollups.rows(period, type_=type_, start=start, end=end)
+
+    def _time_entry_mirror(
+        self,
+        attr: str,
+        build: Callable[[Iterator[Any]], Any],
+        patch: Callable[[Any, int, Optional[Any], Optional[Any]], None],
+    ) -> Any:
+        """Build the time entry mirror stored in ``attr`` and install it.
+
+        The O(n) ``build`` runs on a snapshot without holding the collection
+        lock, so writers (including inline ones on the event loop) are not
+        stalled behind it. The writes published since that snapshot are then
+        replayed onto the result with ``patch(mirror, id, old, new)`` under
+        the lock, from the sync log; if the log no longer reaches back (a
+        reset in between), the build starts over from a newer snapshot.
+        """
+
+        while True:
+            base = self._snapshot
+            built = build(base.time_entries.ordered())
+            with self._locks["time_entries"]:
+                mirror = getattr(self, attr)
+                if mirror is not None:
+                    return mirror
+                with self._snapshot_lock:
+                    current = self._snapshot
+                    view = self._sync_log.view()
+                ids = changed_since(base.version, view)
+                if ids is None:
+                    continue
+                changed, deleted = ids["time_entries"]
+                for record_id in changed + deleted:
+                    patch(
+                        built,
+                        record_id,
+                        base.time_entries.by_id.get(record_id),
+                        current.time_entries.by_id.get(record_id),
+                    )
+                setattr(self, attr, built)
+                return built
+
+    def _on_write(self, name: str, record_id: int, record: Optional[Any]) -> None:
+        """Hook run for every create/update (``record``) or delete (``None``).
+
+        ``record`` is the API model returned to the caller, not the compact
+        form the collection stores.
+
+        It is called while the collection lock is held, after the write has
+        been applied to the new collection version but before that version is
+        published, so raising from it aborts the write. Overrides must call
+        ``super()._on_write()`` last, once nothing else can fail.
+        """
+
+        if name == "time_entries" and (
+            self._time_columns is not None or self._time_rollups is not None
+        ):
+            # The published snapshot still holds the version being replaced.
+            previous = self._snapshot.time_entries.by_id.get(record_id)
+            self._mirror_writes.append((record_id, previous, record))
+        self._json_cache.discard(name, record_id)
+        self._sync_log.stage(name, record_id, deleted=record is None)
+        if record is None:
+            self._changes.stage(name, DELETE, record_id, None)
+        else:
+            # Creates take ids the sequence has not handed out yet.
+            op = CREATE if record_id >= self._next_ids[name] else UPDATE
+            self._changes.stage(name, op, record_id, record)
+
+    def _patch_time_entry_mirrors(self) -> None:
+        """Apply the staged time entry writes to the mirrors that exist.
+
+        Runs under ``_snapshot_lock`` as the write is published, so the
+        mirrors never show a write that readers of the snapshot cannot see
+        yet, or one that was aborted.
+        """
+
+        writes, self._mirror_writes = self._mirror_writes, []
+        for attr, patch in (
+            ("_time_columns", _patch_columns),
+            ("_time_rollups", _patch_rollups),
+        ):
+            mirror = getattr(self, attr)
+            if mirror is not None:
+                for record_id, old, new in writes:
+                    patch(mirror, record_id, old, new)
+
+    def _on_publish(self, name: Optional[str]) -> None:
+        """Hook run once a write to ``name`` is complete, before it is published.
+
+        ``name`` is ``None`` for ``reset()``, which calls it before clearing
+        anything. It runs while the write's locks are held, after every
+        ``_on_write()`` of the write; raising from it aborts the write.
+        """
+
+    def _on_reset(self) -> None:
+        """Hook run by ``reset()`` while every lock is held."""
+
+        self._time_columns = None
+        self._time_rollups = None
+        self._json_cache.clear()
+        self._changes.commit_reset(self._snapshot.version)
+        self._sync_log.reset(self._snapshot.version)
+
+    def json_cache_stats(self) -> Dict[str, Any]:
+        """Counters of the per-record JSON cache behind ``raw=True`` listings."""
+
+        return self._json_cache.stats()
+
+    def change_feed(self) -> ChangeFeed:
+        """Feed of this store's committed writes; see ``backend.store.changes``."""
+
+        return self._changes
+
+    def changes_since(
+        self, since: int
+    ) -> Tuple[StoreSnapshot, Optional[Dict[str, Tuple[List[Dict[str, Any]], List[int]]]]]:
+        """Records written and ids deleted after store version ``since``.
+
+        Returns the snapshot the answer is consistent with, whose ``version``
+        is the ``since`` to ask with next time, and per collection the fields
+        of each record created or updated since then and the ids of those
+        deleted. The changes are ``None`` if the write log no longer reaches
+        back to ``since`` (see ``backend.store.sync_log``) or ``since`` is
+        newer than the store: the caller then needs the whole snapshot.
+        """
+
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            view = self._sync_log.view()
+        ids = changed_since(since, view) if since <= snapshot.version else None
+        if ids is None:
+            return snapshot, None
+        return snapshot, {
+            name: (
+                [getattr(snapshot, name).by_id.get(rid)._asdict() for rid in changed],
+                deleted,
+            )
+            for name, (changed, deleted) in ids.items()
+        }
+
+    def _create(self, name: str, build: Callable[[int], Any]) -> Any:
+        with self._locks[name], self._editing(name) as collection:
+            record = build(self._next_ids[name])
+            collection.insert(from_model(name, record))
+            self._on_write(name, record.id, record)
+            self._next_ids[name] += 1
+            return record
+
+    def create_many(self, name: str, payloads: Sequence[Any]) -> List[Any]:
+        """Create one ``name`` record per create model in ``payloads``.
+
+        The collection lock is taken once, the records get contiguous ids in
+        ``payloads`` order and the batch is published as a single collection
+        version, so readers see all of it or none of it.
+        """
+
+        if not payloads:
+            return []
+        with self._locks[name], self._editing(name) as collection:
+            first_id = self._next_ids[name]
+            created = read_models(name, first_id, payloads)
+            collection.insert_many([from_model(name, record) for record in created])
+            for record in created:
+                self._on_write(name, record.id, record)
+            self._next_ids[name] = first_id + len(created)
+            return created
+
+    def _update(
+        self, name: str, record_id: int, apply: Callable[[Any], Any]
+    ) -> Optional[Any]:
+        with self._stripes[name][record_id % self.LOCK_STRIPES]:
+            existing = getattr(self._snapshot, name).by_id.get(record_id)
+            if existing is None:
+                return None
+            updated = apply(to_model(name, existing))
+            with self._locks[name]:
+                # The stripe keeps other writers off this id; only reset() can
+                # have replaced the record while it was being rebuilt. Records
+                # still in a snapshot base are decoded afresh on every read, so
+                # those compare by value.
+                latest = getattr(self._snapshot, name).by_id.get(record_id)
+                if latest is not existing and latest != existing:
+                    return None
+                with self._editing(name) as collection:
+                    collection.replace(from_model(name, updated))
+                    self._on_write(name, record_id, updated)
+            return updated
+
+    def _delete(self, name: str, record_id: int) -> bool:
+        with self._stripes[name][record_id % self.LOCK_STRIPES], self._locks[name]:
+            if record_id not in getattr(self._snapshot, name).by_id:
+                return False
+            with self._editing(name) as collection:
+                collection.remove(record_id)
+                self._on_write(name, record_id, None)
+            return True
+
+    # ---- Tasks ----
+    def create_task(self, payload: TaskCreate) -> TaskRead:
+        return self._create(
+            "tasks", lambda task_id: TaskRead(id=task_id, **payload.model_dump())
+        )
+
+    def update_task(self, task_id: int, payload: TaskUpdate) -> Optional[TaskRead]:
+        return self._update("tasks", task_id, lambda task: patched(task, payload))
+
+    def delete_task(self, task_id: int) -> bool:
+        return self._delete("tasks", task_id)
+
+    # ---- Events ----
+    def create_event(self, payload: EventCreate) -> EventRead:
+        return self._create(
+            "events", lambda event_id: EventRead(id=event_id, **payload.model_dump())
+        )
+
+    def update_event(self, event_id: int, payload: EventUpdate) -> Optional[EventRead]:
+        return self._update(
+            "events", event_id, lambda event: check_time_order(patched(event, payload))
+        )
+
+    def delete_event(self, event_id: int) -> bool:
+        return self._delete("events", event_id)
+
+    # ---- Homework ----
+    def create_homework(self, payload: HomeworkCreate) -> HomeworkRead:
+        return self._create(
+            "homework", lambda hw_id: HomeworkRead(id=hw_id, **payload.model_dump())
+        )
+
+    def update_homework(
+        self, homework_id: int, payload: HomeworkUpdate
+    ) -> Optional[HomeworkRead]:
+        return self._update("homework", homework_id, lambda hw: patched(hw, payload))
+
+    def delete_homework(self, homework_id: int) -> bool:
+        return self._delete("homework", homework_id)
+
+    # ---- Time Entries ----
     def create_time_entry(self, payload: TimeEntryCreate) -> TimeEntryRead:
-        with self._lock:
-            entry = TimeEntryRead(id=self._next_time_entry_id, **payload.model_dump())
-            self._time_entries_by_id[entry.id] = entry
-            self._next_time_entry_id += 1
-            return entry
+        return self._create(
+            "time_entries",
+            lambda entry_id: TimeEntryRead(id=entry_id, **payload.model_dump()),
+        )
 
     def update_time_entry(
         self, entry_id: int, payload: TimeEntryUpdate
     ) -> Optional[TimeEntryRead]:
-        with self._lock:
-            existing = self._time_entries_by_id.get(entry_id)
-            if existing is None:
-                return None
-            updated = existing.model_copy(update=payload.model_dump(exclude_unset=True))
-            if updated.end_time <= updated.start_time:
-                raise ValueError("end_time must be after start_time")
-            self._time_entries_by_id[entry_id] = updated
-            return updated
+        return self._update(
+            "time_entries",
+            entry_id,
+            lambda entry: check_time_order(patched(entry, payload)),
+        )
 
     def delete_time_entry(self, entry_id: int) -> bool:
-        with self._lock:
-            return self._time_entries_by_id.pop(entry_id, None) is not None
+        return self._delete("time_entries", entry_id)
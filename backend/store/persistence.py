@@ -0,0 +1,391 @@
+"""Optional on-disk durability for the in-memory store.
+
+``DurableStore`` keeps the in-memory store's behaviour but appends every
+create/update/delete to a write-ahead log, and waits for it to be fsynced
+before the write becomes visible: readers, the change feed and the sync log
+never see a write a crash could lose. Appends are fsynced in batches by a
+background thread (group commit): writes that arrive while one fsync is in
+flight are flushed together by the next one. A writer waits while holding its
+collection's lock, so the batches gather writes to different collections and
+the records of one ``create_many()``.
+
+Every ``snapshot_every`` logged writes the store is compacted: the log rolls
+over to a new segment and a full snapshot of the previous state is written
+beside it, after which older segments are deleted. On startup the store maps
+the latest snapshot without decoding it (see ``backend.store.snapshot``) and
+replays the log segments written after it on top.
+
+Layout of ``data_dir``::
+
+    LOCK                 held (flock) by the one process using the directory
+    snapshot.bin         binary columnar snapshot
+    wal-000002.log       "<crc32> <op> <collection> <id> <json>" lines
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import threading
+import zlib
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+from backend.store.memory_store import READ_MODELS, InMemoryStore, StoreSnapshot
+from backend.store.records import from_model
+from backend.store.snapshot import SnapshotFile, write_snapshot
+
+SNAPSHOT_NAME = "snapshot.bin"
+LOCK_NAME = "LOCK"
+DEFAULT_SNAPSHOT_EVERY = 100_000
+
+_PUT = b"put"
+_DELETE = b"del"
+_RESET = b"reset"
+
+
+def _segment_path(data_dir: str, segment: int) -> str:
+    return os.path.join(data_dir, f"wal-{segment:06d}.log")
+
+
+def _segments(data_dir: str) -> List[int]:
+    segments = []
+    for name in os.listdir(data_dir):
+        if name.startswith("wal-") and name.endswith(".log"):
+            segments.append(int(name[4:-4]))
+    return sorted(segments)
+
+
+def encode_entry(op: bytes, name: str, record_id: int, payload: bytes = b"-") -> bytes:
+    """Encode one log entry as a checksummed line."""
+
+    body = b" ".join((op, name.encode(), str(record_id).encode(), payload))
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def read_entries(path: str) -> Iterator[Tuple[int, bytes, str, int, bytes]]:
+    """Yield ``(end_offset, op, collection, id, payload)`` for each valid entry.
+
+    Reading stops at the first torn or corrupt line, which is what a crash in
+    the middle of an append leaves behind.
+    """
+
+    offset = 0
+    with open(path, "rb") as handle:
+        for line in handle:
+            if not line.endswith(b"\n"):
+                return
+            body = line[9:-1]
+            try:
+                valid = int(line[:8], 16) == zlib.crc32(body)
+            except ValueError:
+                valid = False
+            if not valid:
+                return
+            op, name, record_id, payload = body.split(b" ", 3)
+            offset += len(line)
+            yield offset, op, name.decode(), int(record_id), payload
+
+
+class WriteAheadLog:
+    """Append-only log file with group-committed fsyncs."""
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="wal-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def append(self, entry: bytes) -> int:
+        """Queue an encoded entry and return its log sequence number."""
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-ahead log is closed")
+            self._pending.append(entry)
+            self._appended += 1
+            self._cond.notify_all()
+            return self._appended
+
+    @property
+    def appended(self) -> int:
+        """Sequence number of the most recently appended entry."""
+
+        return self._appended
+
+    def sync(self, lsn: Optional[int] = None) -> None:
+        """Block until ``lsn`` (default: everything appended so far) is on disk."""
+
+        with self._cond:
+            target = self._appended if lsn is None else lsn
+            while self._durable < target:
+                if self._error is not None:
+                    raise RuntimeError("write-ahead log flush failed") from self._error
+                self._cond.wait()
+
+    def rotate(self, path: str) -> None:
+        """Flush everything appended so far, then continue in a new file."""
+
+        self.sync()
+        with self._cond:
+            self._file.close()
+            self._file = open(path, "ab")  # pylint: disable=consider-using-with
+
+    def close(self) -> None:
+        """Flush outstanding entries and stop the flusher thread."""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+                lsn = self._appended
+                handle = self._file
+            try:
+                handle.write(b"".join(batch))
+                handle.flush()
+                os.fsync(handle.fileno())
+            except OSError as exc:  # pragma: no cover - disk failure
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = lsn
+                self._cond.notify_all()
+
+
+def _lock_data_dir(data_dir: str) -> Any:
+    """Lock ``data_dir`` for this process; a second user would corrupt the log.
+
+    Returns the open lock file, whose lock lasts until it is closed.
+    """
+
+    # pylint: disable-next=consider-using-with
+    lock_file = open(os.path.join(data_dir, LOCK_NAME), "a+b")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as exc:
+            lock_file.close()
+            raise RuntimeError(
+                f"{data_dir} is in use by another store; run a single process over a "
+                "data directory, or use BACKEND_DATABASE to share one between workers"
+            ) from exc
+    return lock_file
+
+
+class DurableStore(InMemoryStore):
+    """``InMemoryStore`` backed by a write-ahead log and periodic snapshots."""
+
+    # Writes wait for their log batch to be fsynced.
+    BLOCKING_WRITES = True
+
+    def __init__(self, data_dir: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY) -> None:
+        self._wal: Optional[WriteAheadLog] = None
+        self._base: Optional[SnapshotFile] = None
+        # Per collection, the sequence number of its last logged entry.
+        self._lsns: Dict[str, int] = {}
+        super().__init__()
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self._snapshot_lsn = 0
+        self._compacting = threading.Lock()
+        os.makedirs(data_dir, exist_ok=True)
+        self._lock_file = _lock_data_dir(data_dir)
+        # Recovery allocates millions of long-lived objects; pausing the cyclic
+        # collector stops it from repeatedly traversing them mid-load.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._segment = self._recover()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        # Recovered records were never logged as writes.
+        self._sync_log.reset(self._snapshot.version)
+        self._wal = WriteAheadLog(_segment_path(data_dir, self._segment))
+
+    # ---- Recovery ----
+    def _recover(self) -> int:
+        """Rebuild state from disk and return the log segment to append to."""
+
+        records: Dict[str, Dict[int, Optional[Any]]] = {name: {} for name in READ_MODELS}
+        first_segment = 1
+        snapshot_path = os.path.join(self.data_dir, SNAPSHOT_NAME)
+        if os.path.exists(snapshot_path):
+            self._base = SnapshotFile(snapshot_path)
+            first_segment = self._base.wal_segment
+            self._next_ids.update(self._base.next_ids)
+
+        segments = [s for s in _segments(self.data_dir) if s >= first_segment]
+        for segment in segments:
+            path = _segment_path(self.data_dir, segment)
+            valid_end = 0
+            for valid_end, op, name, record_id, payload in read_entries(path):
+                self._replay(records, op, name, record_id, payload)
+            if valid_end != os.path.getsize(path):
+                # Drop a torn tail so new appends start on a clean line.
+                with open(path, "r+b") as handle:
+                    handle.truncate(valid_end)
+                    os.fsync(handle.fileno())
+
+        base = self._base
+        empty = self._snapshot
+        self._snapshot = StoreSnapshot(
+            version=empty.version + 1,
+            **{
+                name: getattr(empty, name).rebuilt(
+                    records[name], base.collection(name) if base is not None else None
+                )
+                for name in READ_MODELS
+            },
+        )
+        return segments[-1] if segments else first_segment
+
+    def _replay(
+        self,
+        records: Dict[str, Dict[int, Optional[Any]]],
+        op: bytes,
+        name: str,
+        record_id: int,
+        payload: bytes,
+    ) -> None:
+        if op == _RESET:
+            for by_id in records.values():
+                by_id.clear()
+            # Everything before the reset, including the snapshot, is gone.
+            if self._base is not None:
+                self._base.close()
+                self._base = None
+            self._next_ids = {n: seq.start for n, seq in self._id_seqs.items()}
+        elif op == _DELETE:
+            records[name][record_id] = None
+        else:
+            model = READ_MODELS[name].model_validate_json(payload)
+            records[name][record_id] = from_model(name, model)
+            self._next_ids[name] = max(self._next_ids[name], record_id + 1)
+
+    # ---- Logging ----
+    def _log(self) -> WriteAheadLog:
+        if self._wal is None:
+            raise RuntimeError("store is still recovering")
+        return self._wal
+
+    def _on_write(self, name: str, record_id: int, record: Optional[Any]) -> None:
+        # The append is the step here that can fail (a closed log), so it
+        # comes before super(), which only stages the write and must run last.
+        # Nothing after it can abort the write short of _on_publish(), whose
+        # failure means the log could not be flushed.
+        if record is None:
+            entry = encode_entry(_DELETE, name, record_id)
+        else:
+            entry = encode_entry(_PUT, name, record_id, record.model_dump_json().encode())
+        self._lsns[name] = self._log().append(entry)
+        super()._on_write(name, record_id, record)
+
+    def _on_publish(self, name: Optional[str]) -> None:
+        if name is None:
+            # reset() also runs from InMemoryStore.__init__, before the log exists.
+            if self._wal is None:
+                return
+            lsn = self._wal.append(encode_entry(_RESET, "-", 0))
+        else:
+            lsn = self._lsns[name]
+        # One fsync covers every entry of the write, however many records.
+        self._log().sync(lsn)
+
+    def _compacting_after(self, result: Any) -> Any:
+        if self._log().appended - self._snapshot_lsn >= self.snapshot_every:
+            self._start_compaction()
+        return result
+
+    def _create(self, name: str, build: Callable[[int], Any]) -> Any:
+        return self._compacting_after(super()._create(name, build))
+
+    def create_many(self, name: str, payloads: Sequence[Any]) -> List[Any]:
+        return self._compacting_after(super().create_many(name, payloads))
+
+    def _update(
+        self, name: str, record_id: int, apply: Callable[[Any], Any]
+    ) -> Optional[Any]:
+        return self._compacting_after(super()._update(name, record_id, apply))
+
+    def _delete(self, name: str, record_id: int) -> bool:
+        return self._compacting_after(super()._delete(name, record_id))
+
+    # ---- Compaction ----
+    def _start_compaction(self) -> None:
+        if self._compacting.acquire(blocking=False):
+            threading.Thread(target=self._compact_locked, daemon=True).start()
+
+    def _compact_locked(self) -> None:
+        try:
+            self._compact()
+        finally:
+            self._compacting.release()
+
+    def compact(self) -> None:
+        """Write a snapshot of the current state and drop the log before it."""
+
+        with self._compacting:
+            self._compact()
+
+    def _compact(self) -> None:
+        wal = self._log()
+        with ExitStack() as stack:
+            for name in self.COLLECTIONS:
+                stack.enter_context(self._locks[name])
+            snapshot = self._snapshot
+            next_ids = dict(self._next_ids)
+            self._segment += 1
+            wal.rotate(_segment_path(self.data_dir, self._segment))
+            self._snapshot_lsn = wal.appended
+            segment = self._segment
+
+        # Writers continue in the new segment while the snapshot is written
+        # from the immutable view captured above.
+        write_snapshot(
+            os.path.join(self.data_dir, SNAPSHOT_NAME),
+            snapshot,
+            next_ids,
+            wal_segment=segment,
+        )
+        for old in _segments(self.data_dir):
+            if old < segment:
+                os.remove(_segment_path(self.data_dir, old))
+
+    def close(self) -> None:
+        """Flush the log and release the data directory; later calls will fail.
+
+        A compaction still running in the background finishes first, so the
+        next store to open the directory never races it for the files.
+        """
+
+        with self._compacting:
+            self._log().close()
+            if self._base is not None:
+                self._base.close()
+                self._base = None
+            self._lock_file.close()
@@ -0,0 +1,127 @@
+"""Compact record types held by the in-memory store.
+
+A Pydantic model instance carries an instance ``__dict__``, a fields-set and
+Pydantic's private slots, several hundred bytes on top of its field values.
+The store keeps one ``NamedTuple`` per record instead, with repeated category
+strings (event and time entry ``type``, homework ``course``) interned so all
+records share one copy. API models are built only when a record leaves the
+store (``to_model``) and turned back into records on the way in
+(``from_model``).
+
+The model-level helpers at the end (``read_models``, ``patched``,
+``check_time_order``) are shared by every store implementation.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+from backend.models.data_models import EventRead, HomeworkRead, TaskRead, TimeEntryRead
+
+READ_MODELS = {
+    "tasks": TaskRead,
+    "events": EventRead,
+    "homework": HomeworkRead,
+    "time_entries": TimeEntryRead,
+}
+
+_READ_LISTS = {name: TypeAdapter(List[model]) for name, model in READ_MODELS.items()}
+
+
+class TaskRecord(NamedTuple):
+    """Stored form of ``TaskRead``."""
+
+    id: int
+    title: str
+    due_date: datetime
+    completed: bool
+
+
+class EventRecord(NamedTuple):
+    """Stored form of ``EventRead``."""
+
+    id: int
+    name: str
+    type: str
+    start_time: datetime
+    end_time: datetime
+    completed: bool
+
+
+class HomeworkRecord(NamedTuple):
+    """Stored form of ``HomeworkRead``."""
+
+    id: int
+    course: str
+    due_date: date
+    description: str
+    completed: bool
+
+
+class TimeEntryRecord(NamedTuple):
+    """Stored form of ``TimeEntryRead``."""
+
+    id: int
+    type: str
+    start_time: datetime
+    end_time: datetime
+    note: Optional[str]
+
+
+RECORD_TYPES: Dict[str, Any] = {
+    "tasks": TaskRecord,
+    "events": EventRecord,
+    "homework": HomeworkRecord,
+    "time_entries": TimeEntryRecord,
+}
+
+INTERNED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "tasks": (),
+    "events": ("type",),
+    "homework": ("course",),
+    "time_entries": ("type",),
+}
+
+
+def from_model(name: str, model: Any) -> Any:
+    """Return the compact record for an API model of collection ``name``."""
+
+    values = dict(model.__dict__)
+    for field in INTERNED_FIELDS[name]:
+        values[field] = sys.intern(values[field])
+    return RECORD_TYPES[name](**values)
+
+
+def to_model(name: str, record: Any) -> Any:
+    """Return the API model for a stored record of collection ``name``."""
+
+    # Validating the field dict is cheaper in pydantic-core than
+    # model_construct(), and the record was validated when it was stored.
+    return READ_MODELS[name].model_validate(record._asdict())
+
+
+def read_models(name: str, first_id: int, payloads: Sequence[Any]) -> List[Any]:
+    """Return read models for create ``payloads`` numbered from ``first_id``."""
+
+    # One list validation in pydantic-core beats a model_construct() per item.
+    return _READ_LISTS[name].validate_python(
+        [{"id": first_id + offset, **payload.__dict__} for offset, payload in enumerate(payloads)]
+    )
+
+
+def patched(existing: Any, payload: Any) -> Any:
+    """Return read model ``existing`` with the fields set in update ``payload``."""
+
+    return existing.model_copy(update=payload.model_dump(exclude_unset=True))
+
+
+def check_time_order(record: Any) -> Any:
+    """Return ``record``, raising ``ValueError`` if it ends before it starts."""
+
+    if record.end_time <= record.start_time:
+        raise ValueError("end_time must be after start_time")
+    return record
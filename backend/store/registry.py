@@ -0,0 +1,204 @@
+"""Per-user store shards, opened lazily and evicted when idle.
+
+Requests that name a user (see ``backend.dependencies.get_store``) are served
+from that user's own store, so every index, lock and cache they touch holds
+only that user's records. ``StoreRegistry`` opens a shard on its first use
+and keeps at most ``max_resident`` of them open, closing the least recently
+used shards that no request is using. Closing writes the shard to disk
+(SQLite and ``DurableStore`` shards already live there; in-memory shards are
+spilled to a snapshot file) and the next request for that user reopens it.
+No shard is ever closed without being persisted first.
+
+Requests pin their shard for as long as they use it, so a shard is never
+closed under a running request; while every shard is pinned the registry
+may hold more than ``max_resident`` of them.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.store.memory_store import InMemoryStore
+from backend.store.persistence import DurableStore
+from backend.store.snapshot import SnapshotFile, write_snapshot
+from backend.store.sqlite_store import SqliteStore
+
+# User ids become file names, so they are limited to a safe alphabet.
+USER_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+OPEN_STRIPES = 64
+
+
+class StoreRegistry:
+    """Thread-safe LRU of open per-user stores; see the module docstring.
+
+    ``open_store(user_id)`` opens (or creates) a user's store and
+    ``close_store(user_id, store)`` persists and closes it. A shard is only
+    opened or closed while its user's stripe lock is held, so it is never
+    reopened before it has finished closing.
+    """
+
+    def __init__(
+        self,
+        open_store: Callable[[str], Any],
+        close_store: Optional[Callable[[str, Any], None]] = None,
+        max_resident: Optional[int] = None,
+    ) -> None:
+        self._open_store = open_store
+        self._close_store = close_store
+        # Shards that cannot be closed without losing data are never evicted.
+        self.max_resident = max_resident if close_store is not None else None
+        self._lock = Lock()
+        self._stripes = tuple(Lock() for _ in range(OPEN_STRIPES))
+        self._resident: "OrderedDict[str, Any]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+
+    def _stripe(self, user_id: str) -> Lock:
+        return self._stripes[hash(user_id) % OPEN_STRIPES]
+
+    def _pin_locked(self, user_id: str) -> Optional[Any]:
+        store = self._resident.get(user_id)
+        if store is not None:
+            self._resident.move_to_end(user_id)
+            self._pins[user_id] = self._pins.get(user_id, 0) + 1
+        return store
+
+    def pin(self, user_id: str) -> Optional[Any]:
+        """Pin and return ``user_id``'s store if it is open, without blocking."""
+
+        with self._lock:
+            return self._pin_locked(user_id)
+
+    def open(self, user_id: str) -> Any:
+        """Pin and return ``user_id``'s store, opening it first if needed.
+
+        Opening reads the shard from disk and may close idle ones, so callers
+        on an event loop should run this in a thread.
+        """
+
+        with self._stripe(user_id):
+            with self._lock:
+                store = self._pin_locked(user_id)
+            if store is None:
+                store = self._open_store(user_id)
+                with self._lock:
+                    self._resident[user_id] = store
+                    self._pins[user_id] = self._pins.get(user_id, 0) + 1
+        self._evict()
+        return store
+
+    def release(self, user_id: str) -> None:
+        """Unpin a store returned by ``pin()`` or ``open()``."""
+
+        with self._lock:
+            left = self._pins.get(user_id, 0) - 1
+            if left > 0:
+                self._pins[user_id] = left
+            else:
+                self._pins.pop(user_id, None)
+
+    def _victim(self) -> Optional[str]:
+        if self.max_resident is None or len(self._resident) <= self.max_resident:
+            return None
+        return next((uid for uid in self._resident if uid not in self._pins), None)
+
+    def _evict(self) -> None:
+        while True:
+            with self._lock:
+                victim = self._victim()
+            if victim is None:
+                return
+            with self._stripe(victim):
+                with self._lock:
+                    # It may have been pinned or evicted since it was picked.
+                    if victim != self._victim():
+                        continue
+                    store = self._resident.pop(victim)
+                self._close_store(victim, store)  # type: ignore[misc]
+
+    def resident(self) -> List[str]:
+        """Ids of the users whose stores are open, least recently used first."""
+
+        with self._lock:
+            return list(self._resident)
+
+    def close(self) -> None:
+        """Close every open store, pinned or not (for shutdown and tests)."""
+
+        with self._lock:
+            resident, self._resident = self._resident, OrderedDict()
+            self._pins.clear()
+        if self._close_store is not None:
+            for user_id, store in resident.items():
+                self._close_store(user_id, store)
+
+
+def _close(_user_id: str, store: Any) -> None:
+    store.close()
+
+
+def sqlite_registry(directory: str, max_resident: Optional[int]) -> StoreRegistry:
+    """Shards kept as ``<directory>/<user id>.db`` SQLite databases."""
+
+    def open_store(user_id: str) -> SqliteStore:
+        os.makedirs(directory, exist_ok=True)
+        return SqliteStore(os.path.join(directory, f"{user_id}.db"))
+
+    return StoreRegistry(open_store, _close, max_resident)
+
+
+def durable_registry(directory: str, max_resident: Optional[int]) -> StoreRegistry:
+    """Shards kept as ``DurableStore`` data directories under ``directory``."""
+
+    def open_store(user_id: str) -> DurableStore:
+        return DurableStore(os.path.join(directory, user_id))
+
+    return StoreRegistry(open_store, _close, max_resident)
+
+
+def memory_registry(spill_dir: Optional[str], max_resident: Optional[int]) -> StoreRegistry:
+    """In-memory shards, spilled to ``<spill_dir>/<user id>.bin`` when evicted.
+
+    Without ``spill_dir`` shards spill to a temporary directory that lasts
+    as long as the registry, like the in-memory data itself.
+    """
+
+    temporary = None
+    if spill_dir is None:
+        # Referenced by close_store() below, so it outlives every spilled shard.
+        temporary = tempfile.TemporaryDirectory(prefix="backend-users-")
+        spill_dir = temporary.name
+
+    # Per user, the snapshot file a store was loaded from and the store version
+    # right after loading; unchanged stores are not rewritten.
+    loaded: Dict[str, Tuple[SnapshotFile, int]] = {}
+
+    def path(user_id: str) -> str:
+        return os.path.join(spill_dir, f"{user_id}.bin")
+
+    def open_store(user_id: str) -> InMemoryStore:
+        store = InMemoryStore()
+        if os.path.exists(path(user_id)):
+            source = SnapshotFile(path(user_id))
+            store.attach_snapshot(source)
+            loaded[user_id] = (source, store.snapshot().version)
+        return store
+
+    def close_store(user_id: str, store: InMemoryStore, _keep: Any = temporary) -> None:
+        source, version = loaded.pop(user_id, (None, None))
+        try:
+            snapshot = store.snapshot()
+            if version != snapshot.version:
+                os.makedirs(spill_dir, exist_ok=True)
+                next_ids = dict(store._next_ids)  # pylint: disable=protected-access
+                write_snapshot(path(user_id), snapshot, next_ids)
+        finally:
+            # Any new snapshot was written (from this mapping) before it is unmapped.
+            if source is not None:
+                source.close()
+
+    return StoreRegistry(open_store, close_store, max_resident)
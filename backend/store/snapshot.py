@@ -0,0 +1,498 @@
+"""Compact binary store snapshots that are opened with ``mmap``.
+
+Each collection is stored as fixed-width columns: record ids, time fields as
+epoch microseconds (ordinal days for dates) plus a column holding the UTC
+offset, booleans as single bytes, and every text field as an index into one
+de-duplicated string table shared by the whole file. Rows are ordered by
+``(time key, id)``, so the time column doubles as the primary index; each
+indexed field also gets one list of row positions per value. Collections of
+intervals (events, time entries) add a max segment tree over the largest end
+time of every block of ``SPAN_BLOCK`` rows, so overlap queries skip the
+blocks that end before the window opens.
+
+Opening a snapshot maps the file and wraps every section in a ``memoryview``
+without reading it. A row is only decoded into a store record when a read
+touches it, so opening costs a few page faults regardless of size.
+``InMemoryStore.attach_snapshot()`` layers a store on top of an opened file,
+and ``DurableStore`` writes this format when it compacts its log.
+
+File layout::
+
+    b"RLOSNAP1"        magic
+    sections           8-byte aligned columns, partitions and string table
+    header             JSON describing every section
+    <u64 u64>          header offset and length
+
+Sections use the byte order of the machine that wrote them (recorded in the
+header). From the command line::
+
+    python -m backend.store.snapshot dump DATA_DIR OUT   # DurableStore dir -> OUT
+    python -m backend.store.snapshot load PATH           # open PATH and describe it
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.store.indexes import build_max_tree, max_tree_leaves, sort_key
+from backend.store.memory_store import READ_MODELS, InMemoryStore, StoreSnapshot
+from backend.store.records import INTERNED_FIELDS, RECORD_TYPES, to_model
+
+MAGIC = b"RLOSNAP1"
+# 2: interval collections always carry a span tree.
+FORMAT = 2
+SPAN_BLOCK = 64
+
+_TRAILER = struct.Struct("<QQ")
+_NAIVE = -(2**31)
+_NO_STRING = 2**32 - 1
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_KINDS = {
+    str: "str",
+    Optional[str]: "optstr",
+    datetime: "datetime",
+    date: "date",
+    bool: "bool",
+}
+_TYPECODES = {"str": "I", "optstr": "I", "datetime": "q", "date": "q", "bool": "B"}
+
+
+def _fields(model: Any) -> List[Tuple[str, str]]:
+    return [
+        (field, _KINDS[info.annotation])
+        for field, info in model.model_fields.items()
+        if field != "id"
+    ]
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _SectionWriter:
+    def __init__(self, handle: IO[bytes]) -> None:
+        self._handle = handle
+        self.offset = handle.write(MAGIC)
+
+    def add(self, data: array) -> List[Any]:
+        """Write one aligned section and return its ``[offset, typecode, count]``."""
+
+        self.offset += self._handle.write(b"\0" * (-self.offset % 8))
+        offset = self.offset
+        self.offset += self._handle.write(data.tobytes())
+        return [offset, data.typecode, len(data)]
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self._index)
+        return index
+
+    def write(self, writer: _SectionWriter) -> Dict[str, Any]:
+        offsets, blob = array("Q", [0]), bytearray()
+        for value in self._index:
+            blob += value.encode()
+            offsets.append(len(blob))
+        return {
+            "offsets": writer.add(offsets),
+            "blob": writer.add(array("B", blob)),
+        }
+
+
+def _write_collection(
+    writer: _SectionWriter, strings: _StringTable, collection: Any, model: Any
+) -> Dict[str, Any]:
+    fields = _fields(model)
+    ids = array("q")
+    columns = {field: array(_TYPECODES[kind]) for field, kind in fields}
+    offsets = {field: array("i") for field, kind in fields if kind == "datetime"}
+    groups: Dict[str, Dict[Any, array]] = {field: {} for field in collection.by_field}
+
+    for pos, record in enumerate(collection.ordered()):
+        ids.append(record.id)
+        for field, kind in fields:
+            value = getattr(record, field)
+            if kind == "datetime":
+                columns[field].append(sort_key(value))
+                utc_offset = value.utcoffset()
+                offsets[field].append(
+                    _NAIVE if utc_offset is None else int(utc_offset.total_seconds())
+                )
+            elif kind == "date":
+                columns[field].append(value.toordinal())
+            elif kind == "bool":
+                columns[field].append(value)
+            else:
+                columns[field].append(strings.add(value))
+        for field, partitions in groups.items():
+            value = getattr(record, field)
+            partition = partitions.get(value)
+            if partition is None:
+                partition = partitions[value] = array("I")
+            partition.append(pos)
+
+    span = None
+    if collection.end_key:
+        ends = columns[collection.end_key]
+        tree, leaves = build_max_tree(
+            [max(ends[i : i + SPAN_BLOCK]) for i in range(0, len(ends), SPAN_BLOCK)]
+        )
+        span = {
+            "field": collection.end_key,
+            "block": SPAN_BLOCK,
+            "leaves": leaves,
+            "tree": writer.add(array("q", tree)),
+        }
+
+    by_id = sorted(range(len(ids)), key=ids.__getitem__)
+    return {
+        "count": len(ids),
+        "time_key": collection.time_key,
+        "fields": fields,
+        "ids": writer.add(ids),
+        "sorted_ids": writer.add(array("q", (ids[pos] for pos in by_id))),
+        "sorted_pos": writer.add(array("I", by_id)),
+        "columns": {field: writer.add(column) for field, column in columns.items()},
+        "utc_offsets": {field: writer.add(column) for field, column in offsets.items()},
+        "partitions": {
+            field: [[value, writer.add(positions)] for value, positions in partitions.items()]
+            for field, partitions in groups.items()
+        },
+        "span": span,
+    }
+
+
+def write_snapshot(
+    path: str,
+    snapshot: StoreSnapshot,
+    next_ids: Dict[str, int],
+    *,
+    wal_segment: int = 0,
+) -> None:
+    """Atomically write ``snapshot`` to ``path`` in the binary format.
+
+    ``wal_segment`` is the first write-ahead log segment that is not covered
+    by the snapshot (``DurableStore`` replays from there on startup).
+    """
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        writer = _SectionWriter(handle)
+        strings = _StringTable()
+        collections = {
+            name: _write_collection(writer, strings, getattr(snapshot, name), model)
+            for name, model in READ_MODELS.items()
+        }
+        header = {
+            "format": FORMAT,
+            "byteorder": sys.byteorder,
+            "version": snapshot.version,
+            "next_ids": next_ids,
+            "wal_segment": wal_segment,
+            "collections": collections,
+            "strings": strings.write(writer),
+        }
+        raw = json.dumps(header).encode()
+        handle.write(raw)
+        handle.write(_TRAILER.pack(writer.offset, len(raw)))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(path) or ".")
+
+
+class SnapshotCollection:
+    """Read-only, lazily decoded view of one collection in a snapshot file.
+
+    It implements the base-mapping protocol ``ChunkedMap`` expects (``get``,
+    ``__contains__``, ``__len__``, ``items``) plus the range scans the store's
+    collections merge with their in-memory indexes.
+    """
+
+    def __init__(self, file: "SnapshotFile", name: str, spec: Dict[str, Any]) -> None:
+        self.record_type = RECORD_TYPES[name]
+        self.time_key = spec["time_key"]
+        self._file = file
+        self._count = spec["count"]
+        self._ids = file.section(spec["ids"])
+        self._sorted_ids = file.section(spec["sorted_ids"])
+        self._sorted_pos = file.section(spec["sorted_pos"])
+        columns = {field: file.section(s) for field, s in spec["columns"].items()}
+        utc_offsets = {field: file.section(s) for field, s in spec["utc_offsets"].items()}
+        self._keys = columns[self.time_key]
+        self._decoders = [
+            (field, kind, columns[field], utc_offsets.get(field))
+            for field, kind in spec["fields"]
+        ]
+        self._interned = INTERNED_FIELDS[name]
+        self._partitions = {
+            field: {value: section for value, section in partitions}
+            for field, partitions in spec["partitions"].items()
+        }
+        span = spec.get("span")
+        self._span: Optional[Tuple[Any, int, int, Any]] = None
+        if span is not None:
+            self._span = (
+                columns[span["field"]],
+                span["block"],
+                span["leaves"],
+                file.section(span["tree"]),
+            )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _position(self, record_id: int) -> Optional[int]:
+        idx = bisect_left(self._sorted_ids, record_id)
+        if idx < self._count and self._sorted_ids[idx] == record_id:
+            return self._sorted_pos[idx]
+        return None
+
+    def __contains__(self, record_id: int) -> bool:
+        return self._position(record_id) is not None
+
+    def get(self, record_id: int, default: Any = None) -> Any:
+        pos = self._position(record_id)
+        return default if pos is None else self.record(pos)
+
+    def items(self) -> Iterator[Tuple[int, Any]]:
+        for pos in range(self._count):
+            yield self._ids[pos], self.record(pos)
+
+    def record(self, pos: int) -> Any:
+        """Decode the record stored at row ``pos``."""
+
+        values: Dict[str, Any] = {"id": self._ids[pos]}
+        strings = self._file.string
+        for field, kind, column, utc_offsets in self._decoders:
+            raw = column[pos]
+            if kind == "datetime":
+                utc_offset = utc_offsets[pos]
+                if utc_offset == _NAIVE:
+                    value: Any = _NAIVE_EPOCH + timedelta(microseconds=raw)
+                else:
+                    tzinfo = timezone(timedelta(seconds=utc_offset))
+                    value = (_UTC_EPOCH + timedelta(microseconds=raw)).astimezone(tzinfo)
+            elif kind == "date":
+                value = date.fromordinal(raw)
+            elif kind == "bool":
+                value = bool(raw)
+            else:
+                value = None if raw == _NO_STRING else strings(raw)
+            values[field] = value
+        for field in self._interned:
+            values[field] = sys.intern(values[field])
+        return self.record_type(**values)
+
+    def partition(self, field: str, value: Any) -> Sequence[int]:
+        """Row positions whose ``field`` equals ``value``, in row order."""
+
+        section = self._partitions[field].get(value)
+        return () if section is None else self._file.section(section)
+
+    def entries(
+        self,
+        lower: Optional[int] = None,
+        upper: Optional[int] = None,
+        *,
+        after: Optional[Tuple[int, int]] = None,
+        positions: Optional[Sequence[int]] = None,
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(sort key, id, row)`` for rows with ``lower <= key <= upper``.
+
+        Bounds are ``sort_key()`` integers. ``after`` resumes strictly after a
+        ``(sort key, id)`` entry, and ``positions`` restricts the scan to a
+        partition returned by ``partition()``.
+        """
+
+        keys, ids = self._keys, self._ids
+        count = self._count if positions is None else len(positions)
+        for idx in range(self._first(lower, after, positions), count):
+            pos = idx if positions is None else positions[idx]
+            key = keys[pos]
+            if upper is not None and key > upper:
+                return
+            yield key, ids[pos], pos
+
+    def _first(
+        self,
+        lower: Optional[int],
+        after: Optional[Tuple[int, int]],
+        positions: Optional[Sequence[int]] = None,
+    ) -> int:
+        """Index of the first row (of ``positions``, if given) past both bounds."""
+
+        if after is not None and (lower is None or after[0] >= lower):
+            probe: Tuple[int, ...] = (after[0], after[1] + 1)
+        elif lower is not None:
+            probe = (lower,)
+        else:
+            return 0
+        keys, ids = self._keys, self._ids
+        start = 0
+        high = self._count if positions is None else len(positions)
+        while start < high:
+            mid = (start + high) // 2
+            pos = mid if positions is None else positions[mid]
+            if (keys[pos], ids[pos]) < probe:
+                start = mid + 1
+            else:
+                high = mid
+        return start
+
+    def overlapping(
+        self,
+        low: Optional[int] = None,
+        high: Optional[int] = None,
+        *,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(sort key, id, row)`` for rows with ``start < high`` and ``end > low``.
+
+        Bounds are ``sort_key()`` integers and either may be ``None``;
+        ``after`` resumes as in ``entries()``. Only available for collections
+        written with an end field.
+        """
+
+        if self._span is None:
+            raise TypeError(f"{self.record_type.__name__} has no end field")
+        ends, block, leaves, tree = self._span
+        keys, ids = self._keys, self._ids
+        first = self._first(None, after)
+        stop = self._count if high is None else self._first(high, None)
+        if first >= stop:
+            return
+        for leaf in max_tree_leaves(tree, leaves, first // block, (stop - 1) // block, low):
+            for pos in range(max(leaf * block, first), min((leaf + 1) * block, stop)):
+                if low is None or ends[pos] > low:
+                    yield keys[pos], ids[pos], pos
+
+
+class SnapshotFile:
+    """A snapshot file mapped into memory."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._sections: Dict[Tuple[int, int], memoryview] = {}
+        if bytes(self._view[: len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a store snapshot")
+        offset, length = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        header = json.loads(bytes(self._view[offset : offset + length]))
+        if header["format"] != FORMAT or header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written in an unsupported format")
+        self.version: int = header["version"]
+        self.next_ids: Dict[str, int] = header["next_ids"]
+        self.wal_segment: int = header["wal_segment"]
+        self._string_offsets = self.section(header["strings"]["offsets"])
+        self._blob = self.section(header["strings"]["blob"])
+        self._collections = {
+            name: SnapshotCollection(self, name, spec)
+            for name, spec in header["collections"].items()
+        }
+
+    def section(self, spec: List[Any]) -> memoryview:
+        """Return the typed, zero-copy view described by ``[offset, typecode, count]``."""
+
+        offset, typecode, count = spec
+        # Empty sections share their offset with the next one.
+        view = self._sections.get((offset, count))
+        if view is None:
+            size = struct.calcsize(typecode) * count
+            view = self._view[offset : offset + size].cast(typecode)
+            self._sections[(offset, count)] = view
+        return view
+
+    def string(self, index: int) -> str:
+        offsets = self._string_offsets
+        return str(self._blob[offsets[index] : offsets[index + 1]], "utf-8")
+
+    def collection(self, name: str) -> SnapshotCollection:
+        return self._collections[name]
+
+    def close(self) -> None:
+        """Unmap the file; records decoded earlier stay usable."""
+
+        for view in self._sections.values():
+            view.release()
+        self._sections.clear()
+        self._view.release()
+        self._mmap.close()
+
+
+def load_store(path: str) -> InMemoryStore:
+    """Return an ``InMemoryStore`` whose data is the snapshot at ``path``."""
+
+    store = InMemoryStore()
+    store.attach_snapshot(SnapshotFile(path))
+    return store
+
+
+def _peak_rss_mb() -> float:
+    import resource  # pylint: disable=import-outside-toplevel
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv: List[str]) -> int:
+    """Command-line entry point; see the module docstring."""
+
+    if len(argv) == 3 and argv[0] == "dump":
+        # Imported here: persistence itself depends on this module.
+        from backend.store.persistence import (  # pylint: disable=import-outside-toplevel
+            DurableStore,
+        )
+
+        store = DurableStore(argv[1])
+        try:
+            write_snapshot(argv[2], store.snapshot(), dict(store._next_ids))  # pylint: disable=protected-access
+        finally:
+            store.close()
+        print(f"wrote {argv[2]} ({os.path.getsize(argv[2])} bytes)")
+        return 0
+    if len(argv) == 2 and argv[0] == "load":
+        started = time.perf_counter()
+        snapshot = SnapshotFile(argv[1])
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"opened {argv[1]} in {elapsed:.1f} ms (version {snapshot.version})")
+        for name in READ_MODELS:
+            collection = snapshot.collection(name)
+            first = "-"
+            if len(collection):
+                first = to_model(name, collection.record(0)).model_dump_json()
+            print(f"  {name:<13} {len(collection):>9} records  first: {first}")
+        print(f"peak RSS {_peak_rss_mb():.1f} MB")
+        return 0
+    print(__doc__.rsplit("From the command line::", 1)[1].rstrip(), file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,691 @@
+"""SQLite-backed store with the same method surface as ``InMemoryStore``.
+
+Records live in one table per resource. Every table has a ``sort_key`` integer
+column derived from its time field (epoch microseconds for datetimes, ordinal
+days for dates) and indexes on ``(sort_key, id)`` plus one per equality filter,
+so filtering, ordering, ``LIMIT``/``OFFSET`` and keyset cursors all run inside
+SQLite. Events and time entries also keep an ``end_key`` column (the same
+encoding of ``end_time``) for overlap queries.
+
+An overlap query still walks ``(sort_key, id)``, so it is bounded below by
+the longest span (``end_key - sort_key``) ever written to the table, which
+triggers keep in ``max_spans``: a record ending after the window starts must
+have started less than that span before it. A window therefore visits the
+rows starting within one longest span of it, not every earlier row. Spans
+only grow until ``reset()``, so a single very long record widens every
+later overlap scan.
+
+Each thread gets its own connection (SQLite connections are not shareable
+across threads) and relies on the connection's statement cache, so the fixed
+set of SQL strings built here are prepared once per thread and reused. The
+database runs in WAL journal mode so readers never block the single writer.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring,too-many-arguments
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.models.data_models import (
+    EventCreate,
+    EventRead,
+    EventUpdate,
+    HomeworkCreate,
+    HomeworkRead,
+    HomeworkUpdate,
+    TaskCreate,
+    TaskRead,
+    TaskUpdate,
+    TimeEntryCreate,
+    TimeEntryRead,
+    TimeEntryUpdate,
+)
+from backend.store.columns import TimeEntryColumns, TimeEntryFrame
+from backend.store.indexes import sort_key
+from backend.store.records import READ_MODELS, check_time_order, patched, read_models
+from backend.store.rollups import Rollup, TimeEntryRollups
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    sort_key INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_time ON tasks (sort_key, id);
+CREATE INDEX IF NOT EXISTS tasks_by_completed ON tasks (completed, sort_key, id);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    sort_key INTEGER NOT NULL,
+    end_key INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (sort_key, id);
+CREATE INDEX IF NOT EXISTS events_by_type ON events (type, sort_key, id);
+CREATE INDEX IF NOT EXISTS events_by_completed ON events (completed, sort_key, id);
+
+CREATE TABLE IF NOT EXISTS homework (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course TEXT NOT NULL,
+    due_date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    sort_key INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS homework_by_time ON homework (sort_key, id);
+CREATE INDEX IF NOT EXISTS homework_by_course ON homework (course, sort_key, id);
+CREATE INDEX IF NOT EXISTS homework_by_completed ON homework (completed, sort_key, id);
+
+CREATE TABLE IF NOT EXISTS time_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    note TEXT,
+    sort_key INTEGER NOT NULL,
+    end_key INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS time_entries_by_time ON time_entries (sort_key, id);
+CREATE INDEX IF NOT EXISTS time_entries_by_type ON time_entries (type, sort_key, id);
+
+CREATE TABLE IF NOT EXISTS write_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS max_spans (
+    name TEXT PRIMARY KEY,
+    span INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS store_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO store_info (key, value)
+    VALUES ('instance_id', lower(hex(randomblob(8))));
+"""
+
+# Bumps write_versions for every change to a table, including changes made by
+# other connections and processes.
+_VERSION_TRIGGERS = """
+INSERT OR IGNORE INTO write_versions (name, version) VALUES ('{table}', 0);
+CREATE TRIGGER IF NOT EXISTS {table}_insert_version AFTER INSERT ON {table} BEGIN
+    UPDATE write_versions SET version = version + 1 WHERE name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_update_version AFTER UPDATE ON {table} BEGIN
+    UPDATE write_versions SET version = version + 1 WHERE name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_delete_version AFTER DELETE ON {table} BEGIN
+    UPDATE write_versions SET version = version + 1 WHERE name = '{table}';
+END;
+"""
+
+# Keeps max_spans at the longest end_key - sort_key written to a table with
+# an end_key; existing rows seed it when the table is first set up.
+_SPAN_TRIGGERS = """
+INSERT OR IGNORE INTO max_spans (name, span)
+    SELECT '{table}', coalesce(max(end_key - sort_key), 0) FROM {table};
+CREATE TRIGGER IF NOT EXISTS {table}_insert_span AFTER INSERT ON {table}
+WHEN NEW.end_key - NEW.sort_key > (SELECT span FROM max_spans WHERE name = '{table}')
+BEGIN
+    UPDATE max_spans SET span = NEW.end_key - NEW.sort_key WHERE name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_update_span AFTER UPDATE ON {table}
+WHEN NEW.end_key - NEW.sort_key > (SELECT span FROM max_spans WHERE name = '{table}')
+BEGIN
+    UPDATE max_spans SET span = NEW.end_key - NEW.sort_key WHERE name = '{table}';
+END;
+"""
+
+
+@dataclass(frozen=True)
+class _Table:
+    name: str
+    time_field: str
+    fields: Tuple[str, ...]
+    end_field: Optional[str] = None
+
+    @property
+    def model(self) -> Any:
+        return READ_MODELS[self.name]
+
+    @property
+    def columns(self) -> str:
+        return ", ".join(("id",) + self.fields)
+
+    @property
+    def key_columns(self) -> Tuple[str, ...]:
+        return ("sort_key", "end_key") if self.end_field else ("sort_key",)
+
+
+_TABLES = {
+    "tasks": _Table("tasks", "due_date", ("title", "due_date", "completed")),
+    "events": _Table(
+        "events",
+        "start_time",
+        ("name", "type", "start_time", "end_time", "completed"),
+        "end_time",
+    ),
+    "homework": _Table(
+        "homework", "due_date", ("course", "due_date", "description", "completed")
+    ),
+    "time_entries": _Table(
+        "time_entries", "start_time", ("type", "start_time", "end_time", "note"), "end_time"
+    ),
+}
+
+
+def _row_fields(table: _Table, row: Tuple[Any, ...]) -> Dict[str, Any]:
+    """A row's fields as stored: the API's JSON values, with booleans restored."""
+
+    fields = dict(zip(("id",) + table.fields, row))
+    if "completed" in fields:
+        fields["completed"] = bool(fields["completed"])
+    return fields
+
+
+class SqliteStore:
+    """SQLite repository for all domain resources."""
+
+    BLOCKING_READS = True
+    BLOCKING_WRITES = True
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Per builder: (time_entries write version, what it built).
+        self._time_entry_cache: Dict[Callable[..., Any], Tuple[int, Any]] = {}
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Processes opening the database together (several server workers)
+        # set it up one at a time. executescript() would commit an already
+        # open transaction, so the script opens its own.
+        try:
+            conn.executescript(
+                "BEGIN IMMEDIATE;"
+                + _SCHEMA
+                + "".join(_VERSION_TRIGGERS.format(table=table) for table in _TABLES)
+                + "".join(
+                    _SPAN_TRIGGERS.format(table=name)
+                    for name, table in _TABLES.items()
+                    if table.end_field
+                )
+            )
+            self.instance_id: str = conn.execute(
+                "SELECT value FROM store_info WHERE key = 'instance_id'"
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    # ---- Connections ----
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only the owning thread uses a connection; close() may run elsewhere.
+            conn = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                cached_statements=256,
+                timeout=30,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this store."""
+
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        """Reset all resources (intended for tests/dev)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in _TABLES:
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("DELETE FROM sqlite_sequence")
+            conn.execute("UPDATE max_spans SET span = 0")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def write_version(self, name: str) -> int:
+        """Count of writes to table ``name``; see ``InMemoryStore.write_version``."""
+
+        row = self._conn().execute(
+            "SELECT version FROM write_versions WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0]
+
+    def record_version(self, name: str, record_id: int) -> Optional[int]:
+        """Version of one record, or ``None`` if it does not exist.
+
+        Rows carry no version of their own, so this is the table's write
+        version: coarser than ``InMemoryStore``'s, but it still changes
+        whenever the record does.
+        """
+
+        row = self._conn().execute(
+            "SELECT (SELECT version FROM write_versions WHERE name = ?)"
+            f" FROM {_TABLES[name].name} WHERE id = ?",
+            (name, record_id),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def export_records(self, names: Sequence[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(name, fields)`` for every row of each table in ``names``.
+
+        The rows are read in one transaction on a connection of their own, so
+        the export sees a single snapshot of the database however long the
+        caller takes to consume it. Values are returned as stored (times as
+        ISO strings), without building API models.
+        """
+
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("BEGIN")
+        # A deferred transaction only pins its snapshot at the first read.
+        conn.execute("SELECT 1 FROM write_versions LIMIT 1").fetchall()
+        return self._export(conn, names)
+
+    @staticmethod
+    def _export(
+        conn: sqlite3.Connection, names: Sequence[str]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        try:
+            for name in names:
+                table = _TABLES[name]
+                rows = conn.execute(
+                    f"SELECT {table.columns} FROM {table.name} ORDER BY sort_key, id"
+                )
+                for row in rows:
+                    yield name, _row_fields(table, row)
+        finally:
+            conn.close()
+
+    def snapshot(self) -> "SqliteStore":
+        """Return a reader for the homepage; each query sees committed data."""
+
+        return self
+
+    def _time_entries_built(self, build: Callable[[Iterator[Any]], Any]) -> Any:
+        """``build`` applied to every time entry, cached until the table changes.
+
+        The result is keyed on the table's write version, read in the same
+        transaction as the rows. Any write, from any process sharing the
+        database, invalidates it: the next call scans and validates the whole
+        table again, so this only saves work while reads outnumber writes.
+        """
+
+        conn = self._conn()
+        cached = self._time_entry_cache.get(build)
+        if cached is not None and cached[0] == self.write_version("time_entries"):
+            return cached[1]
+        table = _TABLES["time_entries"]
+        conn.execute("BEGIN")
+        try:
+            version = conn.execute(
+                "SELECT version FROM write_versions WHERE name = 'time_entries'"
+            ).fetchone()[0]
+            rows = conn.execute(f"SELECT {table.columns} FROM {table.name}").fetchall()
+        finally:
+            conn.execute("COMMIT")
+        built = build(self._row_to_model(table, row) for row in rows)
+        self._time_entry_cache[build] = (version, built)
+        return built
+
+    def time_entry_frame(self) -> TimeEntryFrame:
+        """Load every time entry into columns for analytics.
+
+        The columns are cached until the next time entry write; see
+        ``_time_entries_built()``.
+        """
+
+        return self._time_entries_built(TimeEntryColumns.from_records).frame()
+
+    def time_entry_rollups(
+        self,
+        period: str,
+        *,
+        type_: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Rollup]:
+        """Total every time entry per ``period``; see ``InMemoryStore``.
+
+        The counters are cached until the next time entry write, like the
+        analytics columns.
+        """
+
+        rollups = self._time_entries_built(TimeEntryRollups.from_records)
+        return rollups.rows(period, type_=type_, start=start, end=end)
+
+    # ---- Generic operations ----
+    def _row_to_model(self, table: _Table, row: Tuple[Any, ...]) -> Any:
+        return table.model.model_validate(dict(zip(("id",) + table.fields, row)))
+
+    def _list(
+        self,
+        table: _Table,
+        *,
+        lower: Optional[Any],
+        upper: Optional[Any],
+        match: Dict[str, Any],
+        limit: int,
+        offset: int,
+        after: Optional[Tuple[Any, int]],
+        raw: bool = False,
+        overlaps: Optional[Tuple[Optional[Any], Optional[Any]]] = None,
+    ) -> List[Any]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for field, value in match.items():
+            if value is not None:
+                clauses.append(f"{field} = ?")
+                params.append(int(value) if isinstance(value, bool) else value)
+        if lower is not None:
+            clauses.append("sort_key >= ?")
+            params.append(sort_key(lower))
+        if upper is not None:
+            clauses.append("sort_key <= ?")
+            params.append(sort_key(upper))
+        if after is not None:
+            clauses.append("(sort_key, id) > (?, ?)")
+            params.extend((sort_key(after[0]), after[1]))
+        if overlaps is not None:
+            low, high = overlaps
+            if high is not None:
+                clauses.append("sort_key < ?")
+                params.append(sort_key(high))
+            if low is not None:
+                # The first clause bounds the index range; the second is exact.
+                clauses.append(
+                    "sort_key > ? - (SELECT span FROM max_spans WHERE name = ?)"
+                )
+                clauses.append("end_key > ?")
+                params.extend((sort_key(low), table.name, sort_key(low)))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT {table.columns} FROM {table.name}{where}"
+            " ORDER BY sort_key, id LIMIT ? OFFSET ?"
+        )
+        params.extend((max(limit, 0), max(offset, 0)))
+        rows = self._conn().execute(sql, params).fetchall()
+        if raw:
+            return [_row_fields(table, row) for row in rows]
+        return [self._row_to_model(table, row) for row in rows]
+
+    def _get(self, table: _Table, record_id: int) -> Optional[Any]:
+        row = self._conn().execute(
+            f"SELECT {table.columns} FROM {table.name} WHERE id = ?", (record_id,)
+        ).fetchone()
+        return None if row is None else self._row_to_model(table, row)
+
+    def _values(self, table: _Table, model: Any) -> List[Any]:
+        data = model.model_dump(mode="json")
+        values = [data[field] for field in table.fields]
+        values.append(sort_key(getattr(model, table.time_field)))
+        if table.end_field:
+            values.append(sort_key(getattr(model, table.end_field)))
+        return values
+
+    def _create(self, table: _Table, payload: Any) -> Any:
+        columns = table.fields + table.key_columns
+        placeholders = ", ".join("?" * len(columns))
+        cursor = self._conn().execute(
+            f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})",
+            self._values(table, payload),
+        )
+        return table.model(id=cursor.lastrowid, **payload.model_dump())
+
+    def create_many(self, name: str, payloads: Sequence[Any]) -> List[Any]:
+        """Insert one row per create model in one transaction; see ``InMemoryStore``.
+
+        Ids are assigned up front, continuing from the ``AUTOINCREMENT``
+        sequence, so the whole batch goes through a single ``executemany``.
+        """
+
+        if not payloads:
+            return []
+        table = _TABLES[name]
+        columns = ("id",) + table.fields + table.key_columns
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first_id = conn.execute(
+                "SELECT max(coalesce((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),"
+                f" coalesce((SELECT max(id) FROM {table.name}), 0)) + 1",
+                (table.name,),
+            ).fetchone()[0]
+            created = read_models(name, first_id, payloads)
+            conn.executemany(
+                f"INSERT INTO {table.name} ({', '.join(columns)})"
+                f" VALUES ({', '.join('?' * len(columns))})",
+                [[record.id] + self._values(table, record) for record in created],
+            )
+            conn.execute("COMMIT")
+            return created
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _update(
+        self, table: _Table, record_id: int, apply: Callable[[Any], Any]
+    ) -> Optional[Any]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._get(table, record_id)
+            if existing is None:
+                conn.execute("ROLLBACK")
+                return None
+            updated = apply(existing)
+            assignments = ", ".join(f"{field} = ?" for field in table.fields + table.key_columns)
+            conn.execute(
+                f"UPDATE {table.name} SET {assignments} WHERE id = ?",
+                self._values(table, updated) + [record_id],
+            )
+            conn.execute("COMMIT")
+            return updated
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _delete(self, table: _Table, record_id: int) -> bool:
+        cursor = self._conn().execute(
+            f"DELETE FROM {table.name} WHERE id = ?", (record_id,)
+        )
+        return cursor.rowcount > 0
+
+    # ---- Tasks ----
+    def list_tasks(
+        self,
+        *,
+        completed: Optional[bool] = None,
+        due_before: Optional[datetime] = None,
+        due_after: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
+    ) -> List[TaskRead]:
+        return self._list(
+            _TABLES["tasks"],
+            lower=due_after,
+            upper=due_before,
+            match={"completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+        )
+
+    def get_task(self, task_id: int) -> Optional[TaskRead]:
+        return self._get(_TABLES["tasks"], task_id)
+
+    def create_task(self, payload: TaskCreate) -> TaskRead:
+        return self._create(_TABLES["tasks"], payload)
+
+    def update_task(self, task_id: int, payload: TaskUpdate) -> Optional[TaskRead]:
+        return self._update(_TABLES["tasks"], task_id, lambda task: patched(task, payload))
+
+    def delete_task(self, task_id: int) -> bool:
+        return self._delete(_TABLES["tasks"], task_id)
+
+    # ---- Events ----
+    def list_events(
+        self,
+        *,
+        type_: Optional[str] = None,
+        completed: Optional[bool] = None,
+        start_after: Optional[datetime] = None,
+        start_before: Optional[datetime] = None,
+        overlaps_start: Optional[datetime] = None,
+        overlaps_end: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
+    ) -> List[EventRead]:
+        overlaps = None
+        if overlaps_start is not None or overlaps_end is not None:
+            overlaps = (overlaps_start, overlaps_end)
+        return self._list(
+            _TABLES["events"],
+            lower=start_after,
+            upper=start_before,
+            match={"type": type_, "completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+            overlaps=overlaps,
+        )
+
+    def get_event(self, event_id: int) -> Optional[EventRead]:
+        return self._get(_TABLES["events"], event_id)
+
+    def create_event(self, payload: EventCreate) -> EventRead:
+        return self._create(_TABLES["events"], payload)
+
+    def update_event(self, event_id: int, payload: EventUpdate) -> Optional[EventRead]:
+        return self._update(
+            _TABLES["events"],
+            event_id,
+            lambda event: check_time_order(patched(event, payload)),
+        )
+
+    def delete_event(self, event_id: int) -> bool:
+        return self._delete(_TABLES["events"], event_id)
+
+    # ---- Homework ----
+    def list_homework(
+        self,
+        *,
+        course: Optional[str] = None,
+        due_before: Optional[date] = None,
+        due_after: Optional[date] = None,
+        completed: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[Tuple[date, int]] = None,
+        raw: bool = False,
+    ) -> List[HomeworkRead]:
+        return self._list(
+            _TABLES["homework"],
+            lower=due_after,
+            upper=due_before,
+            match={"course": course, "completed": completed},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+        )
+
+    def get_homework(self, homework_id: int) -> Optional[HomeworkRead]:
+        return self._get(_TABLES["homework"], homework_id)
+
+    def create_homework(self, payload: HomeworkCreate) -> HomeworkRead:
+        return self._create(_TABLES["homework"], payload)
+
+    def update_homework(
+        self, homework_id: int, payload: HomeworkUpdate
+    ) -> Optional[HomeworkRead]:
+        return self._update(
+            _TABLES["homework"], homework_id, lambda hw: patched(hw, payload)
+        )
+
+    def delete_homework(self, homework_id: int) -> bool:
+        return self._delete(_TABLES["homework"], homework_id)
+
+    # ---- Time Entries ----
+    def list_time_entries(
+        self,
+        *,
+        type_: Optional[str] = None,
+        start_after: Optional[datetime] = None,
+        start_before: Optional[datetime] = None,
+        overlaps_start: Optional[datetime] = None,
+        overlaps_end: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0,
+        after: Optional[Tuple[datetime, int]] = None,
+        raw: bool = False,
+    ) -> List[TimeEntryRead]:
+        overlaps = None
+        if overlaps_start is not None or overlaps_end is not None:
+            overlaps = (overlaps_start, overlaps_end)
+        return self._list(
+            _TABLES["time_entries"],
+            lower=start_after,
+            upper=start_before,
+            match={"type": type_},
+            limit=limit,
+            offset=offset,
+            after=after,
+            raw=raw,
+            overlaps=overlaps,
+        )
+
+    def get_time_entry(self, entry_id: int) -> Optional[TimeEntryRead]:
+        return self._get(_TABLES["time_entries"], entry_id)
+
+    def create_time_entry(self, payload: TimeEntryCreate) -> TimeEntryRead:
+        return self._create(_TABLES["time_entries"], payload)
+
+    def update_time_entry(
+        self, entry_id: int, payload: TimeEntryUpdate
+    ) -> Optional[TimeEntryRead]:
+        return self._update(
+            _TABLES["time_entries"],
+            entry_id,
+            lambda entry: check_time_order(patched(entry, payload)),
+        )
+
+    def delete_time_entry(self, entry_id: int) -> bool:
+        return self._delete(_TABLES["time_entries"], entry_id)
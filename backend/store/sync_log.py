@@ -0,0 +1,166 @@
+"""Log of recent writes, for answering "what changed since version N".
+
+Every write the in-memory store publishes is logged per collection as a
+``(version, key)`` pair: ``version`` is the store version that published it,
+which grows with every publish, and ``key`` is the record id, or ``~id``
+(negative) for a delete. A tombstone therefore costs the same two machine
+integers as any other entry, and nothing else of the record is kept.
+
+``changed_since(since, view)`` walks the entries after ``since`` and reports,
+per collection, the ids whose last write was a create or update and the ids
+whose last write was a delete. Entries are kept for ``retention_seconds``
+and at most ``max_entries`` per collection; dropping older ones raises the
+log's ``floor``, and a ``since`` below the floor (or from before the data
+was last replaced) gets ``None``: the caller must send everything.
+"""
+
+from __future__ import annotations
+
+# pylint: disable=missing-function-docstring
+
+import time
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+RETENTION_SECONDS = 7 * 24 * 3600
+MAX_ENTRIES = 1_000_000
+# Versions are tied to times at most this often, for the retention window.
+CHECKPOINT_SECONDS = 1.0
+
+
+class _Entries:
+    """Live log entries of one collection: ``versions[start:]``, ``keys[start:]``."""
+
+    def __init__(self) -> None:
+        self.versions = array("q")
+        self.keys = array("q")
+        self.start = 0
+
+    def __len__(self) -> int:
+        return len(self.versions) - self.start
+
+    def dropped_through(self, version: int) -> "_Entries":
+        """These entries without the ones written at ``version`` or earlier.
+
+        The dead prefix is copied away once it is half the arrays, so dropping
+        stays amortized O(1) per entry; views taken earlier keep the arrays
+        they were handed.
+        """
+
+        self.start = max(self.start, bisect_right(self.versions, version, self.start))
+        if self.start * 2 < len(self.versions):
+            return self
+        tail = _Entries()
+        tail.versions = self.versions[self.start :]
+        tail.keys = self.keys[self.start :]
+        return tail
+
+
+# The log as of one moment: its floor and, per collection, the entry arrays
+# with the bounds of the live part.
+LogView = Tuple[int, Dict[str, Tuple[array, array, int, int]]]
+
+
+class SyncLog:
+    """Per-collection write logs of one store; see the module docstring.
+
+    ``stage()`` and ``discard()`` for a collection must be called under that
+    collection's write lock; ``commit()``, ``reset()`` and ``view()`` under
+    the lock that orders the store's published versions, ``view()`` together
+    with taking the snapshot it will be matched with.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        retention_seconds: float = RETENTION_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.retention_seconds = retention_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[str, _Entries] = {name: _Entries() for name in names}
+        self._staged: Dict[str, array] = {name: array("q") for name in names}
+        # (time, version) pairs, oldest first, for dropping entries by age.
+        self._checkpoints: Deque[Tuple[float, int]] = deque()
+        self.floor = 0
+
+    def stage(self, name: str, record_id: int, deleted: bool) -> None:
+        self._staged[name].append(~record_id if deleted else record_id)
+
+    def discard(self, name: str) -> None:
+        del self._staged[name][:]
+
+    def commit(self, name: str, version: int) -> None:
+        """Log the writes staged for ``name`` as published at ``version``."""
+
+        staged = self._staged[name]
+        if not staged:
+            return
+        entries = self._entries[name]
+        if len(staged) == 1:
+            entries.versions.append(version)
+            entries.keys.append(staged[0])
+        else:
+            entries.versions.extend(array("q", [version]) * len(staged))
+            entries.keys.extend(staged)
+        del staged[:]
+
+        now = self._clock()
+        if not self._checkpoints or now - self._checkpoints[-1][0] >= CHECKPOINT_SECONDS:
+            self._checkpoints.append((now, version))
+        expired = self.floor
+        while self._checkpoints and self._checkpoints[0][0] < now - self.retention_seconds:
+            expired = max(expired, self._checkpoints.popleft()[1])
+        if len(entries) > self.max_entries:
+            newest_dropped = len(entries.versions) - self.max_entries - 1
+            expired = max(expired, entries.versions[newest_dropped])
+        if expired > self.floor:
+            self._drop_through(expired)
+
+    def _drop_through(self, version: int) -> None:
+        self.floor = version
+        for name, entries in self._entries.items():
+            self._entries[name] = entries.dropped_through(version)
+
+    def reset(self, version: int) -> None:
+        """Forget everything: all data was replaced at ``version``."""
+
+        self._entries = {name: _Entries() for name in self._entries}
+        self._checkpoints.clear()
+        self.floor = version
+
+    def view(self) -> LogView:
+        """Capture the log as it is now, for ``changed_since()``."""
+
+        return self.floor, {
+            name: (entries.versions, entries.keys, entries.start, len(entries.versions))
+            for name, entries in self._entries.items()
+        }
+
+
+def changed_since(
+    since: int, view: LogView
+) -> Optional[Dict[str, Tuple[List[int], List[int]]]]:
+    """``(changed ids, deleted ids)`` per collection after version ``since``.
+
+    ``view`` comes from ``SyncLog.view()``. Returns ``None`` if entries after
+    ``since`` may have been dropped.
+    """
+
+    floor, logs = view
+    if since < floor:
+        return None
+    result = {}
+    for name, (versions, keys, start, end) in logs.items():
+        latest: Dict[int, int] = {}
+        for key in keys[bisect_right(versions, since, start, end) : end]:
+            latest[key if key >= 0 else ~key] = key
+        result[name] = (
+            sorted(rid for rid, key in latest.items() if key >= 0),
+            sorted(rid for rid, key in latest.items() if key < 0),
+        )
+    return result
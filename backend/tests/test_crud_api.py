@@ -4,20 +4,33 @@ from __future__ import annotations
 
 # pylint: disable=redefined-outer-name
 
+import asyncio
+import json
+import os
+import time
 from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable
 
 import pytest
 from fastapi.testclient import TestClient
 
-from backend.dependencies import get_store
+from backend import dependencies
+from backend.dependencies import get_store, use_fast_json
 from backend.main import app
+from backend.routers import batch, homepage, imports
 from backend.store.memory_store import InMemoryStore
+from backend.store.registry import memory_registry
+from backend.store.sqlite_store import SqliteStore
 
 
-@pytest.fixture()
-def client() -> TestClient:
-    """FastAPI test client with an isolated in-memory store."""
-    store = InMemoryStore()
+@pytest.fixture(params=["memory", "sqlite"])
+def client(request: pytest.FixtureRequest, tmp_path: Path) -> TestClient:
+    """FastAPI test client with an isolated store of each backend kind."""
+    if request.param == "sqlite":
+        store = SqliteStore(str(tmp_path / "store.db"))
+    else:
+        store = InMemoryStore()
 
     def _override_store() -> InMemoryStore:
         return store
@@ -27,6 +40,8 @@ def client() -> TestClient:
         yield TestClient(app)
     finally:
         app.dependency_overrides.clear()
+        if isinstance(store, SqliteStore):
+            store.close()
 
 
 def test_tasks_crud_and_complete(client: TestClient) -> None:
@@ -199,6 +214,102 @@ def test_homepage_aggregates_from_store(client: TestClient) -> None:
     assert len(data["notifications"]) >= 1
 
 
+def test_homepage_cache_hits_until_a_write(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Repeated dashboard loads should hit the cache; writes should invalidate it."""
+    bucket = homepage._time_bucket(datetime.now())  # pylint: disable=protected-access
+    monkeypatch.setattr(homepage, "_time_bucket", lambda _now: bucket)
+    soon = datetime.now() + timedelta(days=1)
+
+    def _stats() -> dict:
+        return client.get("/homepage/cache-stats").json()
+
+    first = client.get("/homepage").json()
+    assert client.get("/homepage").json() == first
+    assert (_stats()["hits"], _stats()["misses"]) == (1, 1)
+
+    client.post("/tasks/", json={"title": "New", "due_date": soon.isoformat()})
+    assert [t["title"] for t in client.get("/homepage").json()["tasks"]] == ["New"]
+    client.patch("/tasks/1", json={"title": "Renamed"})
+    assert [t["title"] for t in client.get("/homepage").json()["tasks"]] == ["Renamed"]
+    assert _stats()["misses"] == 3
+
+    # Writes to collections the dashboard does not read keep it cached.
+    client.post(
+        "/homework/",
+        json={"course": "Math", "due_date": soon.date().isoformat(), "description": "x"},
+    )
+    client.get("/homepage")
+    assert (_stats()["hits"], _stats()["misses"]) == (2, 3)
+
+
+def test_homepage_cached_page_drops_events_that_have_started(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A page cached earlier in the bucket should not list events already under way."""
+    bucket = homepage._time_bucket(datetime.now())  # pylint: disable=protected-access
+    monkeypatch.setattr(homepage, "_time_bucket", lambda _now: bucket)
+    start = datetime.now() + timedelta(milliseconds=300)
+    client.post(
+        "/events/",
+        json={
+            "name": "Starting",
+            "type": "Work",
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+        },
+    )
+
+    before = client.get("/homepage")
+    assert [e["name"] for e in before.json()["events"]] == ["Starting"]
+    time.sleep(max((start - datetime.now()).total_seconds(), 0) + 0.05)
+    after = client.get("/homepage", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.json()["events"] == []
+    assert client.get("/homepage/cache-stats").json()["hits"] == 1
+
+
+def test_conditional_gets_return_304_until_a_write(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Lists and items should revalidate with ETags derived from write versions."""
+    bucket = homepage._time_bucket(datetime.now())  # pylint: disable=protected-access
+    monkeypatch.setattr(homepage, "_time_bucket", lambda _now: bucket)
+    start = datetime(2025, 3, 6, 9)
+    event = {
+        "name": "Standup",
+        "type": "Work",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(minutes=15)).isoformat(),
+    }
+    client.post("/events/", json=event)
+    client.post("/events/", json=event)
+
+    def _revalidate(path: str, etag: str) -> int:
+        return client.get(path, headers={"If-None-Match": etag}).status_code
+
+    paths = ("/events/", "/events/1", "/homepage")
+    tags = {path: client.get(path).headers["ETag"] for path in paths}
+    for path, etag in tags.items():
+        assert _revalidate(path, etag) == 304
+        assert _revalidate(path, f'W/{etag}, "other"') == 304
+        assert _revalidate(path, '"other"') == 200
+    not_modified = client.get("/events/1", headers={"If-None-Match": tags["/events/1"]})
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == tags["/events/1"]
+
+    client.patch("/events/1", json={"completed": True})
+    assert _revalidate("/events/", tags["/events/"]) == 200
+    assert _revalidate("/events/1", tags["/events/1"]) == 200
+    assert client.get("/events/1").json()["completed"] is True
+    client.post("/tasks/", json={"title": "t", "due_date": datetime.now().isoformat()})
+    assert _revalidate("/events/", client.get("/events/").headers["ETag"]) == 304
+
+    client.delete("/events/2")
+    assert client.get("/events/2", headers={"If-None-Match": "*"}).status_code == 404
+
+
 def test_events_day_range_filtering_by_start_time(client: TestClient) -> None:
     """Events list should filter by start_after/start_before for a single day."""
 
@@ -251,3 +362,637 @@ def test_events_day_range_filtering_by_start_time(client: TestClient) -> None:
 
     assert id_prev not in ids
     assert id_next not in ids
+
+
+def test_batch_create_modes(client: TestClient) -> None:
+    """Batches should be all-or-nothing by default and skip bad items in best_effort."""
+    day = datetime(2025, 3, 4)
+
+    def _event(hour: int, end_hour: int) -> dict:
+        return {
+            "name": f"Batch {hour}",
+            "type": "Work" if hour % 2 else "Home",
+            "start_time": (day + timedelta(hours=hour)).isoformat(),
+            "end_time": (day + timedelta(hours=end_hour)).isoformat(),
+        }
+
+    client.post("/events/", json=_event(0, 1))
+    items = [_event(hour, hour + 1) for hour in range(1, 6)]
+    items[1] = _event(3, 2)
+    items[3] = {"name": "No times"}
+
+    atomic = client.post("/events/batch", json=items)
+    assert atomic.status_code == 422
+    assert [error["index"] for error in atomic.json()["detail"]] == [1, 3]
+    assert len(client.get("/events/").json()) == 1
+
+    best_effort = client.post("/events/batch", params={"mode": "best_effort"}, json=items)
+    assert best_effort.status_code == 201
+    result = best_effort.json()
+    assert (result["created"], result["first_id"]) == (3, 2)
+    assert [error["index"] for error in result["errors"]] == [1, 3]
+    assert result["errors"][1]["errors"][0]["loc"] == ["type"]
+
+    created = client.post("/events/batch", json=[_event(hour, 9) for hour in range(6, 9)])
+    assert created.json() == {"created": 3, "first_id": 5, "errors": []}
+    listed = client.get("/events/", params={"type": "Work"}).json()
+    assert [(e["id"], e["name"]) for e in listed] == [
+        (2, "Batch 1"),
+        (3, "Batch 3"),
+        (4, "Batch 5"),
+        (6, "Batch 7"),
+    ]
+    assert client.get("/events/7").json()["name"] == "Batch 8"
+
+    tasks = client.post(
+        "/tasks/batch",
+        json=[{"title": f"Task {i}", "due_date": day.isoformat()} for i in range(3)],
+    )
+    assert tasks.json()["first_id"] == 1
+    assert client.post("/tasks/batch", json={"title": "Not a list"}).status_code == 422
+    assert client.post("/homework/batch", json=[]).json()["created"] == 0
+    assert client.post("/time-entries/batch", params={"mode": "all"}, json=[]).status_code == 422
+
+
+def test_batch_limits_apply_before_validation(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Oversized batches should be refused by size, not validated item by item."""
+    monkeypatch.setattr(batch, "MAX_BATCH_SIZE", 2)
+    invalid = [{"title": i} for i in range(3)]
+    resp = client.post("/tasks/batch", json=invalid)
+    assert resp.status_code == 413 and "2 items" in resp.json()["detail"]
+    assert client.post("/tasks/batch", json=invalid[:2]).status_code == 422
+
+    monkeypatch.setattr(batch, "MAX_BATCH_BYTES", 16)
+    resp = client.post("/tasks/batch", content=b"[" + b" " * 32 + b"]")
+    assert resp.status_code == 413 and "16 bytes" in resp.json()["detail"]
+
+    def _chunks():  # type: ignore[no-untyped-def]
+        yield b"["
+        yield b" " * 32
+        yield b"]"
+
+    # Without a Content-Length the body is cut off as it arrives.
+    assert client.post("/tasks/batch", content=_chunks()).status_code == 413
+    assert client.get("/tasks/").json() == []
+
+
+def test_ndjson_import_streams_in_chunks(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """POST /import should commit chunk by chunk and report bad lines by number."""
+    monkeypatch.setattr(imports, "CHUNK_LINES", 3)
+    monkeypatch.setattr(imports, "MAX_LINE_BYTES", 300)
+    day = datetime(2025, 3, 4)
+    lines = [
+        {"kind": "task", "record": {"title": "Import me", "due_date": day.isoformat()}},
+        {
+            "kind": "event",
+            "record": {
+                "name": "Standup",
+                "type": "Work",
+                "start_time": day.isoformat(),
+                "end_time": (day + timedelta(minutes=15)).isoformat(),
+            },
+        },
+        {
+            "kind": "homework",
+            "record": {"course": "Math", "due_date": "2025-03-05", "description": "Set 1"},
+        },
+        {"kind": "note", "record": {}},
+        {
+            "kind": "time_entry",
+            "record": {
+                "type": "Work",
+                "start_time": day.isoformat(),
+                "end_time": (day - timedelta(hours=1)).isoformat(),
+            },
+        },
+        {"kind": "task", "record": {"title": "x" * 400, "due_date": day.isoformat()}},
+    ]
+    lines += [
+        {
+            "kind": "homework",
+            "record": {"course": "CIS", "due_date": f"2025-03-{d:02d}", "description": "Read"},
+        }
+        for d in range(10, 15)
+    ]
+    body = "\n".join(json.dumps(line) for line in lines[:3]) + "\n\n"
+    body += "\n".join(json.dumps(line) for line in lines[3:]) + "\n"
+
+    def _pieces():
+        # Uneven pieces, so lines arrive split across reads.
+        encoded = body.encode()
+        for start in range(0, len(encoded), 97):
+            yield encoded[start : start + 97]
+
+    resp = client.post(
+        "/import",
+        params={"import_id": "test-import"},
+        content=_pieces(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["done"] is True
+    assert (result["lines"], result["failed"]) == (11, 3)
+    assert result["created"] == {"task": 1, "event": 1, "homework": 6, "time_entry": 0}
+    # The blank line keeps its number, so the rejected lines are 5, 6 and 7.
+    assert [error["line"] for error in result["errors"]] == [5, 6, 7]
+    assert result["errors"][2]["errors"][0]["type"] == "too_long"
+
+    assert client.get("/import/test-import").json() == result
+    assert client.get("/import/missing").status_code == 404
+    # Progress belongs to the user whose store the import wrote to.
+    other = {"X-User-Id": "someone-else"}
+    assert client.get("/import/test-import", headers=other).status_code == 404
+    homework = client.get("/homework/", params={"course": "CIS"}).json()
+    assert [hw["due_date"] for hw in homework] == [f"2025-03-{d:02d}" for d in range(10, 15)]
+    assert client.get("/events/1").json()["name"] == "Standup"
+
+
+def test_export_streams_records_and_round_trips_through_import(client: TestClient) -> None:
+    """Exports should match the list routes and import back as the same records."""
+    day = datetime(2025, 3, 4)
+    client.post("/tasks/", json={"title": "Export me", "due_date": day.isoformat()})
+    client.post(
+        "/events/batch",
+        json=[
+            {
+                "name": f"Event {hour}",
+                "type": "Work",
+                "start_time": (day + timedelta(hours=hour)).isoformat(),
+                "end_time": (day + timedelta(hours=hour, minutes=30)).isoformat(),
+                "completed": hour == 3,
+            }
+            for hour in (5, 3, 9)
+        ],
+    )
+    client.post(
+        "/time-entries/",
+        json={
+            "type": "Work",
+            "start_time": day.isoformat(),
+            "end_time": (day + timedelta(hours=1)).isoformat(),
+        },
+    )
+
+    events = client.get("/export/events")
+    assert events.headers["content-type"] == "application/x-ndjson"
+    listed = client.get("/events/").json()
+    assert [json.loads(line) for line in events.text.splitlines()] == listed
+    assert client.get("/export/events", params={"format": "json"}).json() == listed
+    assert client.get("/export/homework", params={"format": "json"}).json() == []
+    assert client.get("/export/time-entries").text.count("\n") == 1
+    assert client.get("/export/notes").status_code == 404
+
+    everything = client.get("/export", params={"format": "json"}).json()
+    assert everything["events"] == listed
+    assert (everything["homework"], len(everything["tasks"])) == ([], 1)
+    assert set(everything) == {"tasks", "events", "homework", "time-entries"}
+    assert len(everything["time-entries"]) == 1
+
+    exported = client.get("/export").content
+    kinds = [json.loads(line)["kind"] for line in exported.splitlines()]
+    assert kinds == ["task", "event", "event", "event", "time_entry"]
+    client.post("/tasks/", json={"title": "Shift the ids", "due_date": day.isoformat()})
+    imported = client.post("/import", content=exported).json()
+    assert imported["created"] == {"task": 1, "event": 3, "homework": 0, "time_entry": 1}
+    copies = client.get("/events/", params={"limit": 10}).json()
+    assert [e["id"] for e in copies] == [2, 4, 1, 5, 3, 6]
+    assert [{**e, "id": 0} for e in copies[::2]] == [{**e, "id": 0} for e in listed]
+
+
+def test_fast_json_lists_match_the_validated_path(client: TestClient) -> None:
+    """Opting into fast JSON should change neither bodies, headers nor the schema."""
+    day = datetime(2025, 3, 4)
+    for hour in (3, 1, 2, 1):
+        start = day + timedelta(hours=hour)
+        client.post("/tasks/", json={"title": f"Task {hour}", "due_date": start.isoformat()})
+        client.post(
+            "/homework/",
+            json={"course": "Math", "due_date": start.date().isoformat(), "description": "Read"},
+        )
+        for path in ("/events/", "/time-entries/"):
+            client.post(
+                path,
+                json={
+                    "name": f"Event {hour}",
+                    "type": "Work",
+                    "start_time": start.isoformat(),
+                    "end_time": (start + timedelta(minutes=30)).isoformat(),
+                    "note": None if hour == 1 else "noted",
+                },
+            )
+    schema = client.get("/openapi.json").json()
+
+    def _pages(path: str) -> list:
+        pages, cursor = [], None
+        while True:
+            params = {"limit": 3} if cursor is None else {"limit": 3, "cursor": cursor}
+            resp = client.get(path, params=params)
+            assert resp.status_code == 200
+            assert resp.headers["content-type"] == "application/json"
+            pages.append((resp.json(), resp.headers["etag"]))
+            cursor = resp.headers.get("x-next-cursor")
+            if cursor is None:
+                return pages
+
+    paths = ("/tasks/", "/events/", "/homework/", "/time-entries/")
+    validated = {path: _pages(path) for path in paths}
+    app.dependency_overrides[use_fast_json] = lambda: True
+    try:
+        assert {path: _pages(path) for path in paths} == validated
+        # The second pass is served from the in-memory store's JSON cache.
+        assert {path: _pages(path) for path in paths} == validated
+        assert client.get("/openapi.json").json() == schema
+    finally:
+        del app.dependency_overrides[use_fast_json]
+    assert [len(page) for page, _ in validated["/events/"]] == [3, 1]
+    stats = client.get("/fast-json/cache-stats")
+    if isinstance(app.dependency_overrides[get_store](), SqliteStore):
+        assert stats.status_code == 404
+    else:
+        assert stats.json()["hits"] == stats.json()["misses"] == 16
+
+
+def test_events_mix_naive_and_aware_times(client: TestClient) -> None:
+    """Naive times count as UTC, so they should index and page beside aware ones."""
+    day = datetime(2025, 3, 4)
+    for name, hour, zone in [("aware", 9, "+00:00"), ("naive", 8, ""), ("later", 10, "+01:00")]:
+        start = (day + timedelta(hours=hour)).isoformat() + zone
+        end = (day + timedelta(hours=hour + 2)).isoformat() + zone
+        resp = client.post(
+            "/events/", json={"name": name, "type": "Work", "start_time": start, "end_time": end}
+        )
+        assert resp.status_code == 201
+
+    def _names(**params: str) -> list:
+        resp = client.get("/events/", params=params)
+        assert resp.status_code == 200
+        return [e["name"] for e in resp.json()]
+
+    # "later" starts at 09:00 UTC too, after "aware" by id.
+    assert _names() == ["naive", "aware", "later"]
+    assert _names(start_after=(day + timedelta(hours=9)).isoformat()) == ["aware", "later"]
+    assert _names(start_before=(day + timedelta(hours=8, minutes=30)).isoformat() + "Z") == [
+        "naive"
+    ]
+    assert _names(overlaps_start=(day + timedelta(hours=10)).isoformat() + "+00:00") == [
+        "aware",
+        "later",
+    ]
+    first = client.get("/events/", params={"limit": 1})
+    rest = client.get("/events/", params={"cursor": first.headers["x-next-cursor"]})
+    assert [e["name"] for e in rest.json()] == ["aware", "later"]
+    moved = (day + timedelta(hours=9, minutes=30)).isoformat()
+    assert client.patch("/events/2", json={"start_time": moved}).status_code == 200
+    assert _names() == ["aware", "later", "naive"]
+
+
+def test_events_overlap_window(client: TestClient) -> None:
+    """overlaps_start/overlaps_end should return events intersecting the window."""
+    day = datetime(2025, 3, 4)
+    spans = [(6, 8), (7, 12), (9, 10), (11, 13), (12, 14), (0, 24)]
+    for start, end in spans:
+        client.post(
+            "/events/",
+            json={
+                "name": f"{start}-{end}",
+                "type": "Work",
+                "start_time": (day + timedelta(hours=start)).isoformat(),
+                "end_time": (day + timedelta(hours=end)).isoformat(),
+            },
+        )
+
+    def _names(**params: str) -> list:
+        resp = client.get("/events/", params=params)
+        assert resp.status_code == 200
+        return [e["name"] for e in resp.json()]
+
+    window = {
+        "overlaps_start": (day + timedelta(hours=8)).isoformat(),
+        "overlaps_end": (day + timedelta(hours=11)).isoformat(),
+    }
+    # Touching the window's edges (6-8 ends at 8, 11-13 starts at 11) is not overlap.
+    assert _names(**window) == ["0-24", "7-12", "9-10"]
+    assert _names(overlaps_start=(day + timedelta(hours=13)).isoformat()) == ["0-24", "12-14"]
+    assert _names(overlaps_end=(day + timedelta(hours=7)).isoformat()) == ["0-24", "6-8"]
+    assert _names(**window, start_after=(day + timedelta(hours=1)).isoformat()) == [
+        "7-12",
+        "9-10",
+    ]
+
+
+def test_event_conflicts_and_conflict_checks(client: TestClient) -> None:
+    """Conflict groups and X-Event-Conflicts should follow overlapping events."""
+    day = datetime(2025, 3, 5)
+
+    def _post(name: str, start: int, end: int, **params: str):
+        return client.post(
+            "/events/",
+            params=params,
+            json={
+                "name": name,
+                "type": "Work",
+                "start_time": (day + timedelta(hours=start)).isoformat(),
+                "end_time": (day + timedelta(hours=end)).isoformat(),
+            },
+        )
+
+    _post("standup", 9, 10)
+    _post("review", 9, 11)
+    _post("lunch", 12, 13)
+    clash = _post("call", 10, 12, check_conflicts="true")
+    assert clash.status_code == 201
+    assert clash.headers["X-Event-Conflicts"] == "2"
+    assert "X-Event-Conflicts" not in _post("gym", 18, 19, check_conflicts="true").headers
+
+    window = {"start": day.isoformat(), "end": (day + timedelta(days=1)).isoformat()}
+    resp = client.get("/events/conflicts", params=window)
+    assert resp.status_code == 200
+    groups = resp.json()
+    assert [[e["name"] for e in g["events"]] for g in groups] == [
+        ["standup", "review", "call"]
+    ]
+    assert groups[0]["end_time"] == (day + timedelta(hours=12)).isoformat()
+
+    moved = client.patch(
+        "/events/4",
+        params={"check_conflicts": "true"},
+        json={
+            "start_time": (day + timedelta(hours=12, minutes=30)).isoformat(),
+            "end_time": (day + timedelta(hours=14)).isoformat(),
+        },
+    )
+    assert moved.headers["X-Event-Conflicts"] == "3"
+    groups = client.get("/events/conflicts", params=window).json()
+    assert [[e["name"] for e in g["events"]] for g in groups] == [
+        ["standup", "review"],
+        ["lunch", "call"],
+    ]
+    backwards = {**window, "end": window["start"]}
+    assert client.get("/events/conflicts", params=backwards).status_code == 422
+
+
+def test_time_entries_cursor_pagination_walks_all_pages(client: TestClient) -> None:
+    """Following X-Next-Cursor should return every entry exactly once, in order."""
+    start = datetime(2025, 3, 1, 8, 0, 0)
+    for i in range(7):
+        # Two entries share each start time so the id tie-breaker is exercised.
+        entry_start = start + timedelta(hours=i // 2)
+        resp = client.post(
+            "/time-entries/",
+            json={
+                "type": "Work",
+                "start_time": entry_start.isoformat(),
+                "end_time": (entry_start + timedelta(minutes=30)).isoformat(),
+            },
+        )
+        assert resp.status_code == 201
+
+    seen = []
+    params = {"limit": 3}
+    while True:
+        resp = client.get("/time-entries/", params=params)
+        assert resp.status_code == 200
+        seen.extend(e["id"] for e in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params = {"limit": 3, "cursor": cursor}
+    assert seen == [1, 2, 3, 4, 5, 6, 7]
+
+    assert client.get("/time-entries/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_time_entry_analytics_follow_writes(client: TestClient) -> None:
+    """Analytics should split minutes across hours and reflect later writes."""
+    day = datetime(2025, 3, 3)
+
+    def _post(type_: str, start: datetime, minutes: int) -> int:
+        resp = client.post(
+            "/time-entries/",
+            json={
+                "type": type_,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=minutes)).isoformat(),
+            },
+        )
+        return resp.json()["id"]
+
+    _post("Work", day.replace(hour=9, minute=30), 90)
+    _post("Work", day.replace(hour=23, minute=30), 75)
+    study = _post("Study", day.replace(hour=14), 20)
+    assert client.get("/time-entries/analytics").json()["entries"] == 3
+
+    client.patch(
+        f"/time-entries/{study}",
+        json={"end_time": day.replace(hour=14, minute=40).isoformat()},
+    )
+    client.delete(f"/time-entries/{_post('Other', day.replace(hour=8), 10)}")
+
+    resp = client.get("/time-entries/analytics", params={"bin_minutes": 30, "max_minutes": 120})
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["total_minutes_by_type"] == {"Work": 165.0, "Study": 40.0}
+    work = report["hour_of_day_minutes"]["Work"]
+    assert (work[0], work[9], work[10], work[23]) == (45.0, 30.0, 60.0, 30.0)
+    assert sum(work) == 165.0
+    assert report["duration_histogram"] == [0, 1, 1, 1, 0]
+
+    filtered = client.get(
+        "/time-entries/analytics", params={"type": "Study", "start_after": day.isoformat()}
+    ).json()
+    assert filtered["entries"] == 1
+    assert list(filtered["hour_of_day_minutes"]) == ["Study"]
+
+
+def test_time_entry_rollups_split_across_days(client: TestClient) -> None:
+    """Rollups should split entries at midnight and follow updates and deletes."""
+    sunday = datetime(2025, 3, 9)
+
+    def _post(type_: str, start: datetime, minutes: int) -> int:
+        resp = client.post(
+            "/time-entries/",
+            json={
+                "type": type_,
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=minutes)).isoformat(),
+            },
+        )
+        return resp.json()["id"]
+
+    _post("Work", sunday.replace(hour=23), 120)  # Sunday 23:00 -> Monday 01:00
+    study = _post("Study", sunday.replace(hour=10), 30)
+    _post("Work", datetime(2025, 3, 31, 23, 30), 60)  # crosses into April
+
+    days = client.get("/time-entries/rollups", params={"period": "day", "type": "Work"}).json()
+    assert [(r["period_start"], r["minutes"], r["entries"]) for r in days] == [
+        ("2025-03-09", 60.0, 1),
+        ("2025-03-10", 60.0, 1),
+        ("2025-03-31", 30.0, 1),
+        ("2025-04-01", 30.0, 1),
+    ]
+    weeks = client.get("/time-entries/rollups", params={"end": "2025-03-20"}).json()
+    assert [(r["type"], r["period_start"], r["minutes"]) for r in weeks] == [
+        ("Study", "2025-03-03", 30.0),
+        ("Work", "2025-03-03", 60.0),
+        ("Work", "2025-03-10", 60.0),
+    ]
+
+    client.patch(f"/time-entries/{study}", json={"type": "Work"})
+    client.delete("/time-entries/3")
+    months = client.get("/time-entries/rollups", params={"period": "month"}).json()
+    assert months == [
+        {"type": "Work", "period_start": "2025-03-01", "minutes": 150.0, "entries": 2}
+    ]
+    assert client.get("/time-entries/rollups", params={"period": "year"}).status_code == 422
+
+
+def test_user_header_selects_a_separate_store(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Each X-User-Id should see only its own records, even across evictions."""
+    monkeypatch.setattr(dependencies, "_USERS", memory_registry(str(tmp_path), max_resident=1))
+    client = TestClient(app)
+    due = datetime(2025, 3, 4).isoformat()
+    for user in ("alice", "bob", "alice"):
+        resp = client.post(
+            "/tasks/", json={"title": f"{user} task", "due_date": due}, headers={"X-User-Id": user}
+        )
+        assert resp.status_code == 201
+
+    def _titles(user: str) -> list:
+        resp = client.get("/tasks/", headers={"X-User-Id": user})
+        return [(task["id"], task["title"]) for task in resp.json()]
+
+    assert _titles("alice") == [(1, "alice task"), (2, "alice task")]
+    assert _titles("bob") == [(1, "bob task")]
+    assert _titles("carol") == []
+    assert os.path.exists(tmp_path / "alice.bin")
+    assert client.get("/tasks/", headers={"X-User-Id": "../etc"}).status_code == 422
+    dependencies._USERS.close()  # pylint: disable=protected-access
+
+
+def _read_stream(path: str, headers: dict, frames: int, during: Callable[[], None]) -> tuple:
+    """GET ``path`` from the app, run ``during()`` once it answers, and read ``frames``.
+
+    Returns the status and the text received. TestClient waits for a response
+    to end, so the never-ending stream is driven over ASGI directly.
+    """
+
+    async def _run() -> tuple:
+        messages: asyncio.Queue = asyncio.Queue()
+        done = asyncio.Event()
+        requested = False
+
+        async def receive() -> dict:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        task = asyncio.create_task(app(scope, receive, messages.put))
+        status = (await messages.get())["status"]
+        # The writes block this loop; their changes are delivered once they return.
+        during()
+        text = ""
+        while status == 200 and text.count("\n\n") < frames:
+            text += (await asyncio.wait_for(messages.get(), 5))["body"].decode()
+        done.set()
+        await task
+        while not messages.empty():
+            text += messages.get_nowait().get("body", b"").decode()
+        return status, text
+
+    return asyncio.run(_run())
+
+
+def test_change_stream_pushes_writes_and_resumes(client: TestClient) -> None:
+    """GET /changes/stream should push committed writes and resume after Last-Event-ID."""
+    due = (datetime.now() + timedelta(days=1)).isoformat()
+
+    def _writes() -> None:
+        client.post("/tasks/", json={"title": "Streamed", "due_date": due})
+        client.patch("/tasks/1", json={"title": "Renamed"})
+        client.delete("/tasks/1")
+
+    status, text = _read_stream("/changes/stream", {}, 5, _writes)
+    if isinstance(app.dependency_overrides[get_store](), SqliteStore):
+        assert status == 404
+        return
+    assert status == 200
+    # The retry hint, the starting resume point, then one frame per write.
+    blocks = text.split("\n\n")
+    assert blocks[0] == "retry: 1000" and blocks[1].startswith("id: ")
+    events = [dict(line.split(": ", 1) for line in block.split("\n")) for block in blocks[2:5]]
+    assert [event["event"] for event in events] == ["create", "update", "delete"]
+    data = [json.loads(event["data"]) for event in events]
+    assert data[1]["resource"] == "tasks" and data[1]["id"] == 1
+    assert data[1]["payload"]["title"] == "Renamed"
+    assert data[2]["payload"] is None
+    assert data[2]["version"] > data[1]["version"] > data[0]["version"]
+
+    # Reconnecting after the first change replays the two after it.
+    _, text = _read_stream(
+        "/changes/stream", {"Last-Event-ID": events[0]["id"]}, 3, lambda: None
+    )
+    assert [line for line in text.split("\n") if line.startswith("event: ")] == [
+        "event: update",
+        "event: delete",
+    ]
+    _, text = _read_stream("/changes/stream", {"Last-Event-ID": "stale-9"}, 2, lambda: None)
+    assert "event: reset" in text
+    # Disconnected streams unsubscribe.
+    assert app.dependency_overrides[get_store]().change_feed().subscriber_count() == 0
+
+
+def test_sync_returns_deltas_since_a_version(client: TestClient) -> None:
+    """GET /sync should send everything once, then only changes and tombstones."""
+    due = (datetime.now() + timedelta(days=1)).isoformat()
+    for title in ("One", "Two", "Three"):
+        client.post("/tasks/", json={"title": title, "due_date": due})
+    resp = client.get("/sync")
+    if isinstance(app.dependency_overrides[get_store](), SqliteStore):
+        assert resp.status_code == 404
+        return
+    full = resp.json()
+    assert full["full"] is True
+    assert [task["title"] for task in full["changes"]["tasks"]] == ["One", "Two", "Three"]
+    assert set(full["changes"]) == {"tasks", "events", "homework", "time-entries"}
+
+    client.patch("/tasks/1", json={"title": "Renamed"})
+    client.delete("/tasks/2")
+    cursor = {"since": full["version"], "instance": full["instance_id"]}
+    delta = client.get("/sync", params=cursor).json()
+    assert delta["full"] is False
+    assert [task["title"] for task in delta["changes"]["tasks"]] == ["Renamed"]
+    assert delta["deleted"] == {"tasks": [2], "events": [], "homework": [], "time-entries": []}
+    assert delta["version"] > full["version"]
+
+    again = client.get("/sync", params={**cursor, "since": delta["version"]}).json()
+    assert again["full"] is False and again["changes"]["tasks"] == []
+    # Another instance's versions mean nothing here, and neither do unclaimed ones.
+    other = client.get("/sync", params={**cursor, "instance": "elsewhere"}).json()
+    assert other["full"] is True and len(other["changes"]["tasks"]) == 2
+    bare = client.get("/sync", params={"since": delta["version"]}).json()
+    assert bare["full"] is True and len(bare["changes"]["tasks"]) == 2
+    assert client.get("/sync", params={"since": -1}).status_code == 422
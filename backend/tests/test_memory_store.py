@@ -0,0 +1,616 @@
+"""Unit tests for the in-memory store and its indexes."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.models.data_models import (
+    EventCreate,
+    EventRead,
+    EventUpdate,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from backend.store.changes import RESET
+from backend.store.columns import TimeEntryColumns
+from backend.store.conflicts import conflict_groups
+from backend.store.indexes import IntervalIndex, SortedIndex, sort_key
+from backend.store.json_cache import JsonRows, RecordJsonCache
+from backend.store.memory_store import InMemoryStore
+from backend.store.records import EventRecord
+from backend.store.rollups import TimeEntryRollups
+from backend.store.sync_log import SyncLog, changed_since
+
+BASE = datetime(2025, 1, 1)
+
+
+def _event(offset_hours: int, type_: str = "Work") -> EventCreate:
+    start = BASE + timedelta(hours=offset_hours)
+    return EventCreate(
+        name=f"Event {offset_hours}",
+        type=type_,
+        start_time=start,
+        end_time=start + timedelta(minutes=30),
+    )
+
+
+def test_sorted_index_matches_sorted_list_through_adds_and_removes() -> None:
+    """The bucketed index should behave like a plain sorted list."""
+    rng = random.Random(7)
+    index = SortedIndex(load=4)
+    expected = []
+    for item_id in range(300):
+        key = rng.randint(0, 50)
+        index.add(key, item_id)
+        expected.append((key, item_id))
+    for key, item_id in rng.sample(expected, 120):
+        assert index.remove(key, item_id)
+        expected.remove((key, item_id))
+    assert not index.remove(999, 999)
+
+    expected.sort()
+    assert len(index) == len(expected)
+    assert list(index.irange()) == expected
+    assert list(index.irange(10, 20)) == [
+        (key, item_id) for key, item_id in expected if 10 <= key <= 20
+    ]
+
+
+def test_interval_index_overlaps_match_brute_force() -> None:
+    """Overlap queries should return exactly the intervals crossing the window."""
+    rng = random.Random(9)
+    index = IntervalIndex(load=4)
+    intervals = {}
+    for item_id in range(400):
+        start = rng.randint(0, 1000)
+        intervals[item_id] = (start, start + rng.choice([1, 5, 20, 400]))
+        index.add(start, item_id, intervals[item_id][1])
+    for item_id in rng.sample(sorted(intervals), 150):
+        start, end = intervals.pop(item_id)
+        assert index.remove(start, item_id, end)
+    copy = index.copy()
+    copy.add(0, 999, 5000)
+    assert 999 not in {entry[1] for entry in index.overlapping()}
+
+    for low, high in [(None, None), (100, 200), (None, 50), (900, None), (300, 301)]:
+        expected = sorted(
+            (start, item_id, end)
+            for item_id, (start, end) in intervals.items()
+            if (high is None or start < high) and (low is None or end > low)
+        )
+        assert list(index.overlapping(low, high)) == expected
+        if len(expected) > 3:
+            after = expected[2][:2]
+            assert list(index.overlapping(low, high, after=after)) == expected[3:]
+
+
+def test_conflict_groups_match_pairwise_overlaps() -> None:
+    """Sweep-line groups should be the connected components of pairwise overlaps."""
+    rng = random.Random(4)
+    store = InMemoryStore()
+    for _ in range(300):
+        start = BASE + timedelta(minutes=rng.randrange(0, 20_000))
+        store.create_event(
+            EventCreate(
+                name="e",
+                type="Work",
+                start_time=start,
+                end_time=start + timedelta(minutes=rng.choice([15, 30, 60, 120])),
+            )
+        )
+    events = store.list_events(limit=1000)
+    rng.shuffle(events)
+    groups = conflict_groups(events)
+
+    group_of = {event.id: i for i, group in enumerate(groups) for event in group}
+    for a in events:
+        for b in events:
+            if a.id < b.id and a.start_time < b.end_time and b.start_time < a.end_time:
+                assert group_of[a.id] == group_of[b.id]
+    for group in groups:
+        assert len(group) > 1
+        for i in range(1, len(group)):
+            assert group[i].start_time < max(e.end_time for e in group[:i])
+
+
+def test_list_events_window_and_filters_match_brute_force() -> None:
+    """Indexed range scans should agree with filtering and sorting everything."""
+    rng = random.Random(3)
+    store = InMemoryStore()
+    created = [
+        store.create_event(_event(rng.randint(0, 500), rng.choice(["Work", "Home"])))
+        for _ in range(400)
+    ]
+    for event in rng.sample(created, 50):
+        shifted = EventUpdate(
+            start_time=event.start_time + timedelta(hours=3),
+            end_time=event.end_time + timedelta(hours=3),
+        )
+        store.update_event(event.id, shifted)
+    for event in rng.sample(created, 50):
+        store.delete_event(event.id)
+
+    lower, upper = BASE + timedelta(hours=100), BASE + timedelta(hours=300)
+    everything = store.list_events(limit=10_000)
+    expected = [
+        e for e in everything if lower <= e.start_time <= upper and e.type == "Home"
+    ]
+    assert [e.start_time for e in everything] == sorted(e.start_time for e in everything)
+
+    page = store.list_events(
+        type_="Home", start_after=lower, start_before=upper, limit=10, offset=5
+    )
+    assert page == expected[5:15]
+
+
+def test_create_many_matches_one_at_a_time_creates() -> None:
+    """Batches, bulk-indexed or not, should leave the same store as single creates."""
+    rng = random.Random(11)
+    payloads = [
+        _event(rng.randint(0, 500), rng.choice(["Work", "Home", "Gym"])) for _ in range(600)
+    ]
+    single, batched = InMemoryStore(), InMemoryStore()
+    for payload in payloads:
+        single.create_event(payload)
+    # 300 and 200 rebuild the indexes; the batches of 3 add to them one by one.
+    sizes = [300, 3, 3, 3, 200, 3, 88]
+    position = 0
+    for size in sizes:
+        created = batched.create_many("events", payloads[position : position + size])
+        assert [e.id for e in created] == list(range(position + 1, position + size + 1))
+        position += size
+    assert batched.create_many("events", []) == []
+
+    window = {
+        "overlaps_start": BASE + timedelta(hours=90),
+        "overlaps_end": BASE + timedelta(hours=95),
+    }
+    for query in ({}, {"type_": "Home"}, {"type_": "Gym", "completed": False}, window):
+        assert batched.list_events(limit=10_000, **query) == single.list_events(
+            limit=10_000, **query
+        )
+    assert batched.create_event(_event(1)).id == len(payloads) + 1
+
+
+def test_json_cache_serves_fragments_until_records_change() -> None:
+    """Raw listings should reuse cached JSON, drop it on writes and stay bounded."""
+    store = InMemoryStore()
+    for hour in range(5):
+        store.create_event(_event(hour))
+
+    def _listed() -> list:
+        rows = store.list_events(limit=100, raw=True)
+        assert isinstance(rows, JsonRows)
+        assert [record.id for record in rows] == [1, 2, 3, 4, 5]
+        return json.loads(rows.json())
+
+    expected = [event.model_dump(mode="json") for event in store.list_events(limit=100)]
+    assert _listed() == expected
+    assert _listed() == expected
+    stats = store.json_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (5, 5, 5)
+    assert stats["hit_rate"] == 0.5
+
+    store.update_event(2, EventUpdate(name="Renamed"))
+    expected[1]["name"] = "Renamed"
+    assert _listed() == expected
+    assert store.json_cache_stats()["misses"] == 6
+
+    # Fragments of another snapshot's version of a record are never served.
+    cache = RecordJsonCache(max_bytes=1 << 20)
+    record = store.snapshot().events.by_id.get(2)
+    cache.fragments("events", [record], {2: 1})
+    assert cache.fragments("events", [record._replace(name="Old")], {})[0].count(b"Old") == 1
+    assert cache.stats()["misses"] == 2
+
+    # A small cap keeps only the most recently served records.
+    small = RecordJsonCache(max_bytes=600)
+    records = [store.snapshot().events.by_id.get(i) for i in range(1, 6)]
+    small.fragments("events", records, {})
+    stats = small.stats()
+    assert stats["evictions"] > 0 and stats["bytes"] <= 600
+    assert stats["entries"] == 5 - stats["evictions"]
+    small.fragments("events", records[-1:], {})
+    assert small.stats()["hits"] == 1
+
+
+def test_change_feed_pushes_commits_resumes_and_sheds() -> None:
+    """Subscribers should get committed writes in order, resume, and be shed when full."""
+    store = InMemoryStore()
+    feed = store.change_feed()
+
+    async def _run() -> None:
+        subscription, backlog = feed.subscribe()
+        assert backlog == []
+        start = feed.resume_point(feed.last_seq)
+        store.create_event(_event(0))
+        store.update_event(1, EventUpdate(name="Renamed"))
+        store.delete_event(1)
+        store.delete_event(1)  # Not a write: nothing to publish.
+        changes = await subscription.next_batch(timeout=1)
+        assert [(c.op, c.name, c.record_id) for c in changes] == [
+            ("create", "events", 1),
+            ("update", "events", 1),
+            ("delete", "events", 1),
+        ]
+        assert changes[-1].version == store.write_version("events")
+        assert json.loads(changes[1].record_json())["name"] == "Renamed"
+        assert changes[2].record_json() == b"null"
+        assert await subscription.next_batch(timeout=0.01) == []
+
+        # Resuming replays what came after the resume point.
+        resumed, backlog = feed.subscribe(start)
+        assert [c.seq for c in backlog] == [c.seq for c in changes]
+        _, backlog = feed.subscribe("another-feed-1")
+        assert [c.op for c in backlog] == [RESET]
+
+        # A batch larger than a subscriber's queue sheds it, but stays resumable.
+        before = feed.resume_point(feed.last_seq)
+        store.create_many("events", [_event(hour) for hour in range(feed.queue_size + 1)])
+        assert await subscription.next_batch(timeout=1) == []
+        assert subscription.shed and resumed.shed
+        assert feed.subscriber_count() == 0
+        _, backlog = feed.subscribe(before)
+        assert len(backlog) == feed.queue_size + 1
+        assert {c.op for c in backlog} == {"create"}
+
+        store.reset()
+        _, backlog = feed.subscribe(before)
+        assert backlog[-1].op == RESET
+
+    asyncio.run(_run())
+
+
+def test_changes_since_returns_writes_and_tombstones_until_compacted() -> None:
+    """Delta reads should cover writes after a version until the log drops them."""
+    store = InMemoryStore()
+    for hour in range(3):
+        store.create_event(_event(hour))
+    start = store.snapshot().version
+    store.update_event(1, EventUpdate(name="Renamed"))
+    store.delete_event(2)
+    store.create_event(_event(5))
+    store.delete_event(4)  # Created and deleted since: only a tombstone.
+
+    snapshot, changes = store.changes_since(start)
+    assert snapshot.version > start
+    changed, deleted = changes["events"]
+    assert [(fields["id"], fields["name"]) for fields in changed] == [(1, "Renamed")]
+    assert deleted == [2, 4]
+    assert changes["tasks"] == ([], [])
+    assert store.changes_since(snapshot.version)[1]["events"] == ([], [])
+    assert store.changes_since(snapshot.version + 1)[1] is None
+
+    store.reset()
+    assert store.changes_since(start)[1] is None
+
+    # Entries expire after the retention window or beyond the size cap, and
+    # versions they covered can no longer be answered.
+    now = [0.0]
+    log = SyncLog(["events"], retention_seconds=10, max_entries=4, clock=lambda: now[0])
+    for version in range(1, 4):
+        log.stage("events", version, deleted=False)
+        log.commit("events", version)
+    now[0] = 11.0
+    log.stage("events", 1, deleted=True)
+    log.commit("events", 4)
+    assert log.floor == 1
+    assert changed_since(0, log.view()) is None
+    assert changed_since(1, log.view()) == {"events": ([2, 3], [1])}
+    for version in range(5, 9):
+        log.stage("events", version, deleted=False)
+        log.commit("events", version)
+    assert log.floor == 4
+    assert changed_since(4, log.view()) == {"events": ([5, 6, 7, 8], [])}
+
+
+def test_field_indexes_follow_updates_and_deletes() -> None:
+    """Updating an indexed field should move the record between filter results."""
+    store = InMemoryStore()
+    first = store.create_event(_event(1, "Work"))
+    second = store.create_event(_event(2, "Work"))
+    store.create_event(_event(3, "Home"))
+
+    store.update_event(first.id, EventUpdate(type="Home", completed=True))
+    assert [e.id for e in store.list_events(type_="Work")] == [second.id]
+    assert [e.id for e in store.list_events(type_="Home")] == [first.id, 3]
+    assert [e.id for e in store.list_events(type_="Home", completed=True)] == [first.id]
+
+    store.delete_event(second.id)
+    assert not store.list_events(type_="Work")
+    assert not store.list_events(type_="Missing")
+
+
+def test_snapshot_is_isolated_from_later_writes() -> None:
+    """A snapshot should keep returning the data it saw when it was taken."""
+    store = InMemoryStore()
+    kept = store.create_event(_event(1))
+    removed = store.create_event(_event(2))
+    snapshot = store.snapshot()
+
+    store.update_event(kept.id, EventUpdate(name="Renamed", type="Home"))
+    store.delete_event(removed.id)
+    store.create_event(_event(3))
+
+    assert [e.id for e in snapshot.list_events()] == [kept.id, removed.id]
+    assert snapshot.get_event(kept.id).name == kept.name
+    assert [e.id for e in snapshot.list_events(type_="Work")] == [kept.id, removed.id]
+    assert store.snapshot().version > snapshot.version
+    assert [e.id for e in store.list_events()] == [kept.id, 3]
+
+
+def test_reads_stay_consistent_while_writers_run() -> None:
+    """Lock-free readers should never see torn or partially indexed state."""
+    store = InMemoryStore()
+    for hour in range(200):
+        store.create_event(_event(hour))
+    stop = threading.Event()
+    errors = []
+
+    def _writer() -> None:
+        rng = random.Random(11)
+        while not stop.is_set():
+            created = store.create_event(_event(rng.randint(0, 400)))
+            store.delete_event(created.id)
+
+    def _reader() -> None:
+        try:
+            for _ in range(300):
+                snapshot = store.snapshot()
+                events = snapshot.list_events(limit=1000)
+                # Every snapshot holds the 200 seed events plus at most one
+                # in-flight create per writer, and stays sorted.
+                assert 200 <= len(events) <= 202
+                keys = [(e.start_time, e.id) for e in events]
+                assert keys == sorted(keys)
+        except AssertionError as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    writers = [threading.Thread(target=_writer) for _ in range(2)]
+    readers = [threading.Thread(target=_reader) for _ in range(4)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    stop.set()
+    for thread in writers:
+        thread.join()
+    assert not errors
+
+
+def test_concurrent_writers_across_collections_get_unique_ids() -> None:
+    """Per-collection locks should still hand out unique, contiguous ids."""
+    store = InMemoryStore()
+
+    def _writer() -> None:
+        for hour in range(100):
+            event = store.create_event(_event(hour))
+            store.update_event(event.id, EventUpdate(completed=True))
+            store.create_time_entry(
+                TimeEntryCreate(
+                    type="Work",
+                    start_time=BASE + timedelta(hours=hour),
+                    end_time=BASE + timedelta(hours=hour + 1),
+                )
+            )
+
+    threads = [threading.Thread(target=_writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    events = store.list_events(limit=1000)
+    assert sorted(e.id for e in events) == list(range(1, 401))
+    assert all(e.completed for e in events)
+    entries = store.list_time_entries(limit=1000)
+    assert sorted(e.id for e in entries) == list(range(1, 401))
+
+    store.reset()
+    assert not store.list_events()
+    assert store.create_event(_event(1)).id == 1
+
+
+def test_store_holds_compact_records_and_returns_models() -> None:
+    """Stored events should be tuples sharing one copy of each type string."""
+    store = InMemoryStore()
+    body = (
+        '{"name": "%s", "type": "Work", "start_time": "2025-01-01T09:00:00",'
+        ' "end_time": "2025-01-01T10:00:00"}'
+    )
+    first = store.create_event(EventCreate.model_validate_json(body % "a"))
+    store.create_event(EventCreate.model_validate_json(body % "b"))
+    store.update_event(first.id, EventUpdate.model_validate_json('{"type": "Work"}'))
+
+    records = list(store.snapshot().events.by_id.values())
+    assert all(isinstance(record, EventRecord) for record in records)
+    assert records[0].type is records[1].type
+    assert isinstance(store.get_event(first.id), EventRead)
+    assert store.list_events()[0] == first
+
+
+def test_time_entry_columns_track_writes_like_brute_force() -> None:
+    """The columnar mirror should agree with totals computed from the entries."""
+    rng = random.Random(9)
+    store = InMemoryStore()
+
+    def _entry() -> TimeEntryCreate:
+        start = BASE + timedelta(minutes=rng.randint(0, 10_000))
+        return TimeEntryCreate(
+            type=rng.choice(["Work", "Study", "Gym"]),
+            start_time=start,
+            end_time=start + timedelta(minutes=rng.randint(1, 600)),
+            note=rng.choice([None, "a", "b"]),
+        )
+
+    for _ in range(100):
+        store.create_time_entry(_entry())
+    store.time_entry_frame()  # builds the mirror; later writes update it
+    for _ in range(100):
+        store.create_time_entry(_entry())
+    for entry_id in rng.sample(range(1, 201), 40):
+        store.update_time_entry(entry_id, TimeEntryUpdate(type="Work", note=None))
+    for entry_id in rng.sample(range(1, 201), 60):
+        store.delete_time_entry(entry_id)
+
+    entries = store.list_time_entries(limit=1000)
+    expected_totals: dict = {}
+    expected_hours: dict = {}
+    for entry in entries:
+        minutes = (entry.end_time - entry.start_time).total_seconds() / 60
+        expected_totals[entry.type] = expected_totals.get(entry.type, 0) + minutes
+        hours = expected_hours.setdefault(entry.type, [0.0] * 24)
+        moment = entry.start_time
+        while moment < entry.end_time:
+            hours[moment.hour] += 1
+            moment += timedelta(minutes=1)
+
+    frame = store.time_entry_frame()
+    assert len(frame) == len(entries)
+    assert frame.total_minutes_by_type() == pytest.approx(expected_totals)
+    for type_, minutes in frame.hour_of_day_minutes().items():
+        assert minutes == pytest.approx(expected_hours[type_])
+
+
+def test_time_entry_rollups_track_writes_like_brute_force() -> None:
+    """Rollup counters should match totals recomputed from the entries."""
+    rng = random.Random(6)
+    store = InMemoryStore()
+
+    def _entry() -> TimeEntryCreate:
+        start = BASE + timedelta(minutes=15 * rng.randint(0, 4000))
+        return TimeEntryCreate(
+            type=rng.choice(["Work", "Study"]),
+            start_time=start,
+            end_time=start + timedelta(minutes=rng.choice([30, 240, 1500, 3000])),
+        )
+
+    for _ in range(80):
+        store.create_time_entry(_entry())
+    store.time_entry_rollups("day")  # builds the counters; later writes adjust them
+    for _ in range(80):
+        store.create_time_entry(_entry())
+    for entry_id in rng.sample(range(1, 161), 30):
+        store.update_time_entry(
+            entry_id, TimeEntryUpdate(type="Gym", end_time=BASE + timedelta(days=50))
+        )
+    for entry_id in rng.sample(range(1, 161), 40):
+        store.delete_time_entry(entry_id)
+
+    starts = {
+        "day": lambda moment: moment.date(),
+        "week": lambda moment: moment.date() - timedelta(days=moment.weekday()),
+        "month": lambda moment: moment.date().replace(day=1),
+    }
+    for period, first_day in starts.items():
+        expected: dict = {}
+        for entry in store.list_time_entries(limit=1000):
+            touched = set()
+            moment = entry.start_time
+            while moment < entry.end_time:
+                key = (entry.type, first_day(moment))
+                expected[key] = expected.get(key, 0) + 900
+                touched.add(key)
+                moment += timedelta(minutes=15)
+            for key in touched:
+                expected[key + ("entries",)] = expected.get(key + ("entries",), 0) + 1
+        rows = store.time_entry_rollups(period)
+        assert {(t, d): s for t, d, s, _ in rows} == {
+            key: value for key, value in expected.items() if len(key) == 2
+        }
+        assert {(t, d, "entries"): n for t, d, _, n in rows} == {
+            key: value for key, value in expected.items() if len(key) == 3
+        }
+        assert [r[1] for r in rows] == sorted(r[1] for r in rows)
+
+
+def test_time_entry_mirrors_ignore_aborted_writes(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A write that fails to publish should leave the columns and rollups untouched."""
+    store = InMemoryStore()
+    start = BASE + timedelta(hours=1)
+    store.create_time_entry(
+        TimeEntryCreate(type="Work", start_time=start, end_time=start + timedelta(hours=2))
+    )
+    frame = store.time_entry_frame()
+    rows = store.time_entry_rollups("day")
+
+    def _fail(name):  # type: ignore[no-untyped-def]
+        raise RuntimeError(f"cannot publish {name}")
+
+    monkeypatch.setattr(store, "_on_publish", _fail)
+    with pytest.raises(RuntimeError):
+        store.create_time_entry(
+            TimeEntryCreate(type="Gym", start_time=start, end_time=start + timedelta(hours=1))
+        )
+    with pytest.raises(RuntimeError):
+        store.create_many(
+            "time_entries",
+            [TimeEntryCreate(type="Study", start_time=start, end_time=start + timedelta(hours=3))],
+        )
+    with pytest.raises(RuntimeError):
+        store.update_time_entry(1, TimeEntryUpdate(type="Gym"))
+    with pytest.raises(RuntimeError):
+        store.delete_time_entry(1)
+    monkeypatch.undo()
+
+    assert store.time_entry_frame().total_minutes_by_type() == frame.total_minutes_by_type()
+    assert store.time_entry_rollups("day") == rows
+    store.update_time_entry(1, TimeEntryUpdate(type="Gym"))
+    assert store.time_entry_frame().total_minutes_by_type() == {"Gym": 120}
+    assert [row[0] for row in store.time_entry_rollups("day")] == ["Gym"]
+
+
+def test_time_entry_mirrors_build_without_blocking_writers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Writes made while a mirror is being built should not wait, nor be lost."""
+    store = InMemoryStore()
+    for hour in range(20):
+        start = BASE + timedelta(hours=5 * hour)
+        store.create_time_entry(
+            TimeEntryCreate(type="Work", start_time=start, end_time=start + timedelta(hours=2))
+        )
+
+    def _write_during(build):  # type: ignore[no-untyped-def]
+        def _build(records):  # type: ignore[no-untyped-def]
+            built = build(records)
+
+            def _writes() -> None:
+                # Runs during both builds; the second replaces the entry the first created.
+                store.update_time_entry(1, TimeEntryUpdate(type="Gym"))
+                store.delete_time_entry(2)
+                store.delete_time_entry(21)
+                start = BASE + timedelta(days=30)
+                store.create_time_entry(
+                    TimeEntryCreate(
+                        type="Study", start_time=start, end_time=start + timedelta(hours=1)
+                    )
+                )
+
+            writer = threading.Thread(target=_writes)
+            writer.start()
+            writer.join(timeout=5)
+            assert not writer.is_alive(), "writer blocked behind the build"
+            return built
+
+        return classmethod(lambda cls, records: _build(records))
+
+    for mirror in (TimeEntryColumns, TimeEntryRollups):
+        monkeypatch.setattr(mirror, "from_records", _write_during(mirror.from_records))
+    frame = store.time_entry_frame()
+    rows = store.time_entry_rollups("month")
+    monkeypatch.undo()
+
+    entries = store.list_time_entries(limit=100)
+    assert len(frame) == len(entries) == 20
+    expected = TimeEntryRollups.from_records(store.snapshot().time_entries.ordered())
+    assert rows == expected.rows("month")
+    assert frame.total_minutes_by_type() == pytest.approx(
+        {"Work": 18 * 120, "Gym": 120, "Study": 60}
+    )
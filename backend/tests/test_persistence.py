@@ -0,0 +1,595 @@
+"""Tests for the on-disk store modes (write-ahead log, snapshots, SQLite)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pytest
+
+from backend.models.data_models import (
+    EventCreate,
+    EventUpdate,
+    HomeworkCreate,
+    TaskCreate,
+    TaskUpdate,
+    TimeEntryCreate,
+    TimeEntryUpdate,
+)
+from backend.store.async_store import AsyncStore
+from backend.store.memory_store import InMemoryStore
+from backend.store.persistence import SNAPSHOT_NAME, DurableStore
+from backend.store.registry import durable_registry, memory_registry, sqlite_registry
+from backend.store.snapshot import load_store, write_snapshot
+from backend.store.sqlite_store import SqliteStore
+
+BASE = datetime(2025, 1, 1, 9, 0, 0)
+
+
+def _event(hour: int, type_: str = "Work") -> EventCreate:
+    start = BASE + timedelta(hours=hour)
+    return EventCreate(
+        name=f"Event {hour}", type=type_, start_time=start, end_time=start + timedelta(hours=1)
+    )
+
+
+def _wal_files(data_dir: Path) -> list:
+    return sorted(p for p in os.listdir(data_dir) if p.startswith("wal-"))
+
+
+def test_restart_replays_log(tmp_path: Path) -> None:
+    """Creates, updates and deletes should all survive a restart."""
+    store = DurableStore(str(tmp_path))
+    first = store.create_event(_event(1))
+    second = store.create_event(_event(2))
+    store.update_event(first.id, EventUpdate(type="Home"))
+    store.delete_event(second.id)
+    task = store.create_task(TaskCreate(title="Persist me", due_date=BASE))
+    store.update_task(task.id, TaskUpdate(completed=True))
+    store.close()
+
+    reopened = DurableStore(str(tmp_path))
+    assert [(e.id, e.type) for e in reopened.list_events()] == [(first.id, "Home")]
+    assert reopened.list_events(type_="Home")[0].id == first.id
+    assert reopened.get_task(task.id).completed is True
+    # Ids keep counting from where the previous process stopped.
+    assert reopened.create_event(_event(3)).id == 3
+    reopened.close()
+
+
+def test_batch_creates_survive_restart(tmp_path: Path) -> None:
+    """Every record of a batch should be logged and replayed with its id."""
+    store = DurableStore(str(tmp_path))
+    store.create_event(_event(1))
+    store.create_many("events", [_event(hour, "Home") for hour in range(2, 12)])
+    store.close()
+
+    reopened = DurableStore(str(tmp_path))
+    assert [e.id for e in reopened.list_events(type_="Home")] == list(range(2, 12))
+    assert reopened.create_event(_event(13)).id == 12
+    reopened.close()
+
+
+def test_writes_become_visible_only_once_fsynced(tmp_path: Path) -> None:
+    """Nothing a crash could lose should reach readers or the change feed."""
+    store = DurableStore(str(tmp_path))
+    wal = store._wal  # pylint: disable=protected-access
+    sync = wal.sync
+    feed = store.change_feed()
+    start = feed.last_seq
+    seen = []
+
+    def _sync(lsn=None):  # type: ignore[no-untyped-def]
+        visible = [event.id for event in store.snapshot().events.ordered()]
+        seen.append((visible, feed.last_seq - start))
+        sync(lsn)
+
+    wal.sync = _sync
+    store.create_event(_event(1))
+    store.create_many("events", [_event(hour) for hour in range(2, 5)])
+    store.reset()
+    assert seen == [([], 0), ([1], 1), ([1, 2, 3, 4], 4)]
+    assert store.list_events() == []
+    store.close()
+
+
+def test_compaction_writes_snapshot_and_drops_old_segments(tmp_path: Path) -> None:
+    """Compaction should bound replay to the snapshot plus the newest segment."""
+    store = DurableStore(str(tmp_path), snapshot_every=10_000)
+    for hour in range(20):
+        store.create_event(_event(hour))
+    store.delete_event(20)
+    store.compact()
+    store.create_event(_event(30))
+    store.close()
+
+    assert (tmp_path / SNAPSHOT_NAME).exists()
+    assert _wal_files(tmp_path) == ["wal-000002.log"]
+
+    reopened = DurableStore(str(tmp_path))
+    ids = [e.id for e in reopened.list_events(limit=100)]
+    assert ids == list(range(1, 20)) + [21]
+    assert reopened.create_event(_event(31)).id == 22
+    reopened.close()
+
+
+def test_close_waits_for_background_compaction_and_unmaps_snapshot(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Closing should not leave a compaction running over the directory."""
+    store = DurableStore(str(tmp_path))
+    store.create_event(_event(0))
+    store.compact()
+    store.close()
+
+    reopened = DurableStore(str(tmp_path), snapshot_every=2)
+    base = reopened._base  # pylint: disable=protected-access
+    writing = threading.Event()
+
+    def _slow_write(*args, **kwargs):  # type: ignore[no-untyped-def]
+        writing.set()
+        time.sleep(0.2)
+        return write_snapshot(*args, **kwargs)
+
+    monkeypatch.setattr("backend.store.persistence.write_snapshot", _slow_write)
+    reopened.create_event(_event(1))
+    reopened.create_event(_event(2))
+    assert writing.wait(5)
+    reopened.close()
+    assert _wal_files(tmp_path) == ["wal-000003.log"]
+    assert base is not None and base._mmap.closed  # pylint: disable=protected-access
+
+    again = DurableStore(str(tmp_path))
+    assert [e.id for e in again.list_events()] == [1, 2, 3]
+    again.close()
+
+
+def test_recovery_ignores_torn_tail_after_crash(tmp_path: Path) -> None:
+    """A record cut off mid-write should be dropped and the log stay appendable."""
+    store = DurableStore(str(tmp_path))
+    store.create_event(_event(1))
+    store.create_event(_event(2))
+    store.close()
+
+    wal_path = tmp_path / _wal_files(tmp_path)[-1]
+    data = wal_path.read_bytes()
+    last_line_start = data.rstrip(b"\n").rfind(b"\n") + 1
+    # Simulate a crash halfway through writing the second record.
+    wal_path.write_bytes(data[: last_line_start + (len(data) - last_line_start) // 2])
+
+    recovered = DurableStore(str(tmp_path))
+    assert [e.id for e in recovered.list_events()] == [1]
+    assert recovered.create_event(_event(3)).id == 2
+    recovered.close()
+
+    again = DurableStore(str(tmp_path))
+    assert [e.name for e in again.list_events()] == ["Event 1", "Event 3"]
+    again.close()
+
+
+def test_corrupt_record_stops_replay(tmp_path: Path) -> None:
+    """A checksum mismatch should be treated like the end of the log."""
+    store = DurableStore(str(tmp_path))
+    for hour in range(3):
+        store.create_event(_event(hour))
+    store.close()
+
+    wal_path = tmp_path / _wal_files(tmp_path)[-1]
+    lines = wal_path.read_bytes().splitlines(keepends=True)
+    lines[1] = lines[1].replace(b"Event 1", b"Event X")
+    wal_path.write_bytes(b"".join(lines))
+
+    recovered = DurableStore(str(tmp_path))
+    assert [e.id for e in recovered.list_events()] == [1]
+    recovered.close()
+
+
+def test_binary_snapshot_round_trips_every_field(tmp_path: Path) -> None:
+    """Records decoded lazily from a snapshot should equal the originals."""
+    source = InMemoryStore()
+    aware = datetime(2025, 3, 1, 8, 30, tzinfo=timezone(timedelta(hours=-5)))
+    source.create_task(
+        TaskCreate(title="UTC ✓", due_date=aware.astimezone(timezone.utc), completed=True)
+    )
+    source.create_task(TaskCreate(title="Aware", due_date=aware))
+    source.create_homework(
+        HomeworkCreate(course="Math", due_date=date(2025, 2, 1), description="Ch. 3")
+    )
+    end = BASE + timedelta(minutes=45)
+    source.create_time_entry(TimeEntryCreate(type="Work", start_time=BASE, end_time=end))
+    source.create_time_entry(
+        TimeEntryCreate(type="Work", start_time=BASE, end_time=end, note="notes")
+    )
+    source.create_event(_event(1))
+    path = str(tmp_path / "store.snap")
+    next_ids = {"tasks": 3, "events": 2, "homework": 2, "time_entries": 3}
+    write_snapshot(path, source.snapshot(), next_ids)
+
+    loaded = load_store(path)
+    assert loaded.list_tasks() == source.list_tasks()
+    assert loaded.get_task(2).due_date.utcoffset() == timedelta(hours=-5)
+    assert loaded.list_homework(course="Math") == source.list_homework()
+    assert [e.note for e in loaded.list_time_entries()] == [None, "notes"]
+    assert loaded.get_event(1) == source.get_event(1)
+    assert loaded.get_event(2) is None
+    assert loaded.create_task(TaskCreate(title="Next", due_date=BASE)).id == 3
+
+
+def test_writes_on_top_of_snapshot_match_plain_store(tmp_path: Path) -> None:
+    """Writes layered over a snapshot should list exactly like a plain store."""
+    rng = random.Random(11)
+    plain = InMemoryStore()
+    for _ in range(300):
+        plain.create_event(_event(rng.randint(0, 200), rng.choice(["Work", "Home"])))
+    path = str(tmp_path / "store.snap")
+    next_ids = {"tasks": 1, "events": 301, "homework": 1, "time_entries": 1}
+    write_snapshot(path, plain.snapshot(), next_ids)
+    layered = load_store(path)
+
+    for store in (plain, layered):
+        op_rng = random.Random(5)
+        for event_id in op_rng.sample(range(1, 301), 60):
+            store.update_event(
+                event_id, EventUpdate(type="Gym", completed=op_rng.random() < 0.5)
+            )
+        for event_id in op_rng.sample(range(1, 301), 40):
+            store.delete_event(event_id)
+        for _ in range(50):
+            store.create_event(_event(op_rng.randint(0, 200), "Home"))
+
+    window = {
+        "start_after": BASE + timedelta(hours=40),
+        "start_before": BASE + timedelta(hours=160),
+    }
+    for filters in ({}, {"type_": "Home"}, {"type_": "Gym", "completed": True}, window):
+        assert layered.list_events(limit=1000, **filters) == plain.list_events(
+            limit=1000, **filters
+        )
+    last = plain.list_events(limit=100)[-1]
+    after = (last.start_time, last.id)
+    assert layered.list_events(after=after, limit=50) == plain.list_events(
+        after=after, limit=50
+    )
+    assert sorted(e.id for e in layered.snapshot().events.by_id.values()) == sorted(
+        e.id for e in plain.list_events(limit=1000)
+    )
+
+
+def test_overlap_queries_over_snapshot_match_brute_force(tmp_path: Path) -> None:
+    """Overlap listings should agree with a brute-force scan in every store mode."""
+    rng = random.Random(13)
+    plain = InMemoryStore()
+    payloads = []
+    for _ in range(400):
+        start = BASE + timedelta(minutes=rng.randint(0, 20_000))
+        payloads.append(
+            TimeEntryCreate(
+                type=rng.choice(["Work", "Study"]),
+                start_time=start,
+                end_time=start + timedelta(minutes=rng.choice([5, 60, 600, 5000])),
+            )
+        )
+    for payload in payloads:
+        plain.create_time_entry(payload)
+    path = str(tmp_path / "store.snap")
+    next_ids = {"tasks": 1, "events": 1, "homework": 1, "time_entries": 401}
+    write_snapshot(path, plain.snapshot(), next_ids)
+    layered = load_store(path)
+    sqlite = SqliteStore(str(tmp_path / "store.db"))
+    sqlite.create_many("time_entries", payloads)
+    stores = (plain, layered, sqlite)
+    for store in stores:
+        op_rng = random.Random(2)
+        for entry_id in op_rng.sample(range(1, 401), 50):
+            store.update_time_entry(
+                entry_id,
+                TimeEntryUpdate(end_time=BASE + timedelta(minutes=op_rng.randint(20_000, 30_000))),
+            )
+        for entry_id in op_rng.sample(range(1, 401), 50):
+            store.delete_time_entry(entry_id)
+
+    everything = plain.list_time_entries(limit=1000)
+    for low, high in [(0, 10), (5000, 5060), (None, 3000), (19_000, None)]:
+        window = {
+            "overlaps_start": None if low is None else BASE + timedelta(minutes=low),
+            "overlaps_end": None if high is None else BASE + timedelta(minutes=high),
+        }
+        expected = [
+            e
+            for e in everything
+            if (high is None or e.start_time < window["overlaps_end"])
+            and (low is None or e.end_time > window["overlaps_start"])
+        ]
+        for store in stores:
+            assert store.list_time_entries(limit=1000, **window) == expected
+            study = [e for e in expected if e.type == "Study"]
+            assert store.list_time_entries(limit=1000, type_="Study", **window) == study
+            if len(expected) > 4:
+                after = (expected[3].start_time, expected[3].id)
+                assert store.list_time_entries(after=after, limit=2, **window) == expected[4:6]
+    sqlite.close()
+
+
+def test_durable_store_updates_records_loaded_from_snapshot(tmp_path: Path) -> None:
+    """Changes to records loaded from a snapshot should survive another restart."""
+    store = DurableStore(str(tmp_path))
+    for hour in range(5):
+        store.create_event(_event(hour))
+    store.compact()
+    store.close()
+
+    reopened = DurableStore(str(tmp_path))
+    reopened.update_event(2, EventUpdate(type="Home"))
+    reopened.delete_event(3)
+    reopened.close()
+
+    again = DurableStore(str(tmp_path))
+    assert [e.id for e in again.list_events()] == [1, 2, 4, 5]
+    assert [e.id for e in again.list_events(type_="Home")] == [2]
+    again.close()
+
+
+def test_sqlite_store_survives_reopen_and_uses_indexes(tmp_path: Path) -> None:
+    """SQLite data should persist, and filtered lists should hit an index."""
+    path = str(tmp_path / "store.db")
+    store = SqliteStore(path)
+    for hour in range(5):
+        store.create_event(_event(hour, "Work" if hour % 2 else "Home"))
+    store.delete_event(5)
+    store.close()
+
+    reopened = SqliteStore(path)
+    window = reopened.list_events(
+        type_="Home", start_after=BASE, start_before=BASE + timedelta(hours=3)
+    )
+    assert [e.id for e in window] == [1, 3]
+    assert reopened.create_event(_event(9)).id == 6
+
+    plan = reopened._conn().execute(  # pylint: disable=protected-access
+        "EXPLAIN QUERY PLAN SELECT id FROM events WHERE type = ? AND sort_key >= ?"
+        " ORDER BY sort_key, id LIMIT 10",
+        ("Home", 0),
+    ).fetchall()
+    assert "events_by_type" in str(plan)
+    reopened.close()
+
+
+def test_sqlite_time_entry_rollups_are_cached_until_a_write(tmp_path: Path) -> None:
+    """Analytics reads between writes should not rescan the table."""
+    store = SqliteStore(str(tmp_path / "store.db"))
+    entry = store.create_time_entry(
+        TimeEntryCreate(type="Work", start_time=BASE, end_time=BASE + timedelta(hours=2))
+    )
+    first = store.time_entry_rollups("day")
+    assert store.time_entry_rollups("week") and store.time_entry_frame()
+    cache = store._time_entry_cache  # pylint: disable=protected-access
+    cached = {build: built for build, (_, built) in cache.items()}
+    assert store.time_entry_rollups("day") == first
+    assert {build: built for build, (_, built) in cache.items()} == cached
+
+    store.update_time_entry(entry.id, TimeEntryUpdate(type="Study"))
+    assert store.time_entry_rollups("day") == [("Study", BASE.date(), 7200, 1)]
+    assert store.time_entry_frame().total_minutes_by_type() == {"Study": 120.0}
+    store.close()
+
+
+def test_exports_read_one_snapshot_while_writes_continue(tmp_path: Path) -> None:
+    """An export in progress should not see writes made after it started."""
+    for store in (SqliteStore(str(tmp_path / "store.db")), DurableStore(str(tmp_path / "wal"))):
+        for hour in range(3):
+            store.create_event(_event(hour))
+        store.create_task(TaskCreate(title="Exported", due_date=BASE))
+
+        records = store.export_records(("events", "tasks"))
+        first = next(records)
+        store.create_event(_event(1))
+        store.delete_task(1)
+        store.update_event(3, EventUpdate(type="Home"))
+        rest = list(records)
+
+        assert [(name, fields["id"]) for name, fields in [first, *rest]] == [
+            ("events", 1),
+            ("events", 2),
+            ("events", 3),
+            ("tasks", 1),
+        ]
+        assert rest[1][1]["type"] == "Work"
+        assert rest[2][1]["completed"] is False
+        store.close()
+
+
+def test_async_store_offloads_only_blocking_calls(tmp_path: Path) -> None:
+    """Calls that may block go to the threadpool; the rest run on the loop."""
+    for store in (
+        InMemoryStore(),
+        DurableStore(str(tmp_path / "wal")),
+        SqliteStore(str(tmp_path / "store.db")),
+    ):
+        facade = AsyncStore(store)
+
+        async def _run() -> tuple:
+            created = await asyncio.gather(*(facade.create_event(_event(h)) for h in range(20)))
+            listed = await facade.list_events(limit=100, type_="Work")
+            loop_thread = threading.get_ident()
+            read_inline = await facade.read(threading.get_ident) == loop_thread
+            write_inline = await facade.write(("events",), threading.get_ident) == loop_thread
+            return sorted(e.id for e in created), len(listed), read_inline, write_inline
+
+        ids, listed, read_inline, write_inline = asyncio.run(_run())
+        assert ids == list(range(1, 21)) and listed == 20
+        assert (read_inline, write_inline) == {
+            InMemoryStore: (True, True),
+            DurableStore: (True, False),
+            SqliteStore: (False, False),
+        }[type(store)]
+        assert asyncio.run(facade.record_version("events", 21)) is None
+        with pytest.raises(AttributeError):
+            facade.reset  # pylint: disable=pointless-statement
+        if type(store) is not InMemoryStore:
+            store.close()
+
+
+def test_store_registry_evicts_idle_shards_to_disk(tmp_path: Path) -> None:
+    """Idle user shards should close to disk and reopen with their data."""
+    for registry in (
+        memory_registry(str(tmp_path / "spill"), max_resident=1),
+        sqlite_registry(str(tmp_path / "sqlite"), max_resident=1),
+        durable_registry(str(tmp_path / "durable"), max_resident=1),
+    ):
+        alice = registry.open("alice")
+        alice.create_event(_event(1))
+        registry.release("alice")
+        bob = registry.open("bob")
+        assert registry.resident() == ["bob"]
+        assert bob.list_events() == []
+
+        # Bob is pinned, so opening Carol cannot close him.
+        carol = registry.open("carol")
+        assert registry.resident() == ["bob", "carol"]
+        registry.release("carol")
+        registry.release("bob")
+
+        alice = registry.open("alice")
+        assert [e.name for e in alice.list_events()] == ["Event 1"]
+        assert alice.create_event(_event(2)).id == 2
+        assert registry.pin("bob") is None and registry.resident() == ["alice"]
+        registry.release("alice")
+        registry.close()
+
+
+def test_memory_registry_unmaps_spilled_shards_and_spills_by_default(
+    tmp_path: Path,
+) -> None:
+    """Evicted shards should release their snapshot file, and keep data without a spill dir."""
+    spilling = memory_registry(str(tmp_path), max_resident=1)
+    spilling.open("alice").create_event(_event(1))
+    spilling.release("alice")
+    spilling.open("bob")
+    spilling.release("bob")
+    alice = spilling.open("alice")
+    source = alice.snapshot().events.base._file  # pylint: disable=protected-access
+    spilling.release("alice")
+    spilling.open("bob")
+    spilling.release("bob")
+    assert source._mmap.closed  # pylint: disable=protected-access
+    spilling.close()
+
+    default = memory_registry(None, max_resident=2)
+    for user in ("alice", "bob", "carol"):
+        default.open(user).create_event(_event(1))
+        default.release(user)
+    assert default.resident() == ["bob", "carol"]
+    assert [e.name for e in default.open("alice").list_events()] == ["Event 1"]
+    default.release("alice")
+    default.close()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_workers_share_the_sqlite_store(tmp_path: Path) -> None:
+    """Separate server processes over one database should read each other's writes."""
+    env = dict(os.environ, BACKEND_DATABASE=str(tmp_path / "shared.db"), WEB_CONCURRENCY="3")
+    env.pop("BACKEND_DATA_DIR", None)
+    ports = [_free_port() for _ in range(3)]
+    # What uvicorn --workers 3 runs, but on known ports so each can be addressed.
+    workers = [
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port)],
+            cwd=Path(__file__).resolve().parents[2],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for port in ports
+    ]
+    clients = [httpx.Client(base_url=f"http://127.0.0.1:{port}") for port in ports]
+    try:
+        deadline = time.monotonic() + 30
+        for worker, client in zip(workers, clients):
+            while True:
+                assert worker.poll() is None, "worker exited during startup"
+                try:
+                    client.get("/tasks/").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    assert time.monotonic() < deadline, "worker did not start"
+                    time.sleep(0.1)
+
+        first, second, third = clients
+        etag = second.get("/tasks/").headers["etag"]
+        home = second.get("/homepage").json()
+        due = (datetime.now() + timedelta(days=1)).isoformat()
+        created = first.post("/tasks/", json={"title": "Shared", "due_date": due}).json()
+        assert third.get(f"/tasks/{created['id']}").json() == created
+        assert second.get("/tasks/", headers={"If-None-Match": etag}).status_code == 200
+        assert [t["title"] for t in second.get("/homepage").json()["tasks"]] == ["Shared"]
+        assert home["tasks"] == []
+
+        etag = first.get(f"/tasks/{created['id']}").headers["etag"]
+        resp = third.get(f"/tasks/{created['id']}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        ids: list = []
+
+        def create(client: httpx.Client) -> None:
+            for i in range(20):
+                ids.append(client.post("/tasks/", json={"title": f"T{i}", "due_date": due}))
+
+        threads = [threading.Thread(target=create, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({resp.json()["id"] for resp in ids}) == 60
+        assert all(len(client.get("/tasks/?limit=100").json()) == 61 for client in clients)
+    finally:
+        for client in clients:
+            client.close()
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait(timeout=10)
+
+
+def test_workers_flag_without_shared_store_is_refused() -> None:
+    """``--workers`` without WEB_CONCURRENCY should still require BACKEND_DATABASE."""
+    env = dict(os.environ)
+    for name in ("BACKEND_DATABASE", "BACKEND_DATA_DIR", "WEB_CONCURRENCY"):
+        env.pop(name, None)
+    # A uvicorn worker process inherits the server's command line.
+    script = (
+        "import sys; sys.argv = ['uvicorn', 'backend.main:app', '--workers', '2']; "
+        "import backend.dependencies"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).resolve().parents[2],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode != 0
+    assert "2 server workers" in result.stderr and "BACKEND_DATABASE" in result.stderr
+
+
+def test_durable_store_refuses_a_second_user(tmp_path: Path) -> None:
+    """Two stores over one data directory would interleave their logs."""
+    store = DurableStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        DurableStore(str(tmp_path))
+    store.close()
+    DurableStore(str(tmp_path)).close()
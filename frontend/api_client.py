@@ -1,13 +1,26 @@
-"""Frontend HTTP client helpers for calling the backend API."""
+"""Frontend HTTP client helpers for calling the backend API.
+
+GET helpers remember each response's ``ETag`` together with its raw body and
+``X-Next-Cursor`` header, and send the tag back as ``If-None-Match``. When the
+backend answers ``304 Not Modified`` the remembered body and cursor are used
+instead of downloading them again; the 304 itself carries no cursor.
+"""
 
 from __future__ import annotations
 
+import json
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Optional
 
 import httpx
 
 API_BASE_URL = "http://127.0.0.1:8000"
+MAX_CACHED_RESPONSES = 128
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Request URL -> (ETag, body, next cursor), least recently used first.
+_validated: "OrderedDict[str, tuple[str, bytes, Optional[str]]]" = OrderedDict()
 
 
 def _maybe_iso(value: Optional[datetime]) -> Optional[str]:
@@ -16,12 +29,48 @@ def _maybe_iso(value: Optional[datetime]) -> Optional[str]:
     return value.isoformat()
 
 
+async def _get_json(
+    client: httpx.AsyncClient, path: str, params: Optional[dict[str, Any]] = None
+) -> Any:
+    """GET ``path`` as JSON, revalidating a previously cached body with its ETag."""
+
+    data, _ = await _get_json_page(client, path, params)
+    return data
+
+
+async def _get_json_page(
+    client: httpx.AsyncClient, path: str, params: Optional[dict[str, Any]] = None
+) -> tuple[Any, Optional[str]]:
+    """Like :func:`_get_json`, also returning the ``X-Next-Cursor`` header.
+
+    The cursor is cached alongside the body, so a page revalidated with a 304
+    still points at the page after it.
+    """
+
+    request = client.build_request("GET", path, params=params)
+    url = str(request.url)
+    cached = _validated.get(url)
+    if cached is not None:
+        request.headers["If-None-Match"] = cached[0]
+    r = await client.send(request)
+    if r.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+        _validated.move_to_end(url)
+        return json.loads(cached[1]), cached[2]
+    r.raise_for_status()
+    etag = r.headers.get("ETag")
+    next_cursor = r.headers.get(NEXT_CURSOR_HEADER)
+    if etag is not None:
+        _validated[url] = (etag, r.content, next_cursor)
+        _validated.move_to_end(url)
+        while len(_validated) > MAX_CACHED_RESPONSES:
+            _validated.popitem(last=False)
+    return r.json(), next_cursor
+
+
 async def get_homepage() -> dict[str, Any]:
     """Fetch homepage aggregation data from the backend."""
     async with httpx.AsyncClient(base_url=API_BASE_URL) as client:
-        r = await client.get("/homepage")
-        r.raise_for_status()
-        return r.json()
+        return await _get_json(client, "/homepage")
 
 
 async def complete_task(task_id: int) -> dict[str, Any]:
@@ -55,9 +104,7 @@ async def get_events(
         params["start_before"] = _maybe_iso(start_before)
 
     async with httpx.AsyncClient(base_url=API_BASE_URL) as client:
-        r = await client.get("/events/", params=params)
-        r.raise_for_status()
-        return r.json()
+        return await _get_json(client, "/events/", params)
 
 
 async def set_event_completed(event_id: int, completed: bool) -> dict[str, Any]:
@@ -109,6 +156,4 @@ async def get_time_entries(
         params["start_before"] = _maybe_iso(start_before)
 
     async with httpx.AsyncClient(base_url=API_BASE_URL) as client:
-        r = await client.get("/time-entries/", params=params)
-        r.raise_for_status()
-        return r.json()
+        return await _get_json(client, "/time-entries/", params)
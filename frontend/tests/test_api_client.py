@@ -0,0 +1,59 @@
+"""Unit tests for the frontend API client's conditional GETs."""
+
+from __future__ import annotations
+
+# pylint: disable=protected-access
+
+import asyncio
+
+import httpx
+
+from frontend import api_client
+
+
+def test_get_json_reuses_cached_body_on_304() -> None:
+    """A 304 answer should be served from the body cached with its ETag."""
+    seen = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=[{"id": 1}], headers={"ETag": '"v1"'})
+
+    async def _fetch_twice() -> list:
+        transport = httpx.MockTransport(_handler)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await api_client._get_json(client, "/events/", {"limit": 5})
+            first[0]["id"] = 99  # callers may mutate what they get back
+            second = await api_client._get_json(client, "/events/", {"limit": 5})
+            return [first, second]
+
+    api_client._validated.clear()
+    first, second = asyncio.run(_fetch_twice())
+    assert seen == [None, '"v1"']
+    assert first == [{"id": 99}]
+    assert second == [{"id": 1}]
+
+
+def test_get_json_page_keeps_next_cursor_on_304() -> None:
+    """A revalidated page should still report the cursor of the page after it."""
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(
+            200, json=[{"id": 1}], headers={"ETag": '"v1"', "X-Next-Cursor": "abc"}
+        )
+
+    async def _fetch_twice() -> list:
+        transport = httpx.MockTransport(_handler)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await api_client._get_json_page(client, "/events/", {"limit": 1})
+            second = await api_client._get_json_page(client, "/events/", {"limit": 1})
+            return [first, second]
+
+    api_client._validated.clear()
+    first, second = asyncio.run(_fetch_twice())
+    assert first == ([{"id": 1}], "abc")
+    assert second == ([{"id": 1}], "abc")
@@ -4,7 +4,13 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 BASE_URL="${BASE_URL:-http://127.0.0.1:8000}"
 
 echo "Starting FastAPI server..."
-fastapi dev backend/main.py &
+# WEB_CONCURRENCY=N runs N workers, which need the shared SQLite store
+# (BACKEND_DATABASE); the backend refuses to start them without it.
+if [ "${WEB_CONCURRENCY:-1}" -gt 1 ]; then
+  fastapi run backend/main.py --workers "$WEB_CONCURRENCY" &
+else
+  fastapi dev backend/main.py &
+fi
 SERVER_PID=$!
 
 echo "Waiting for server to be ready..."